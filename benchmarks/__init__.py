@@ -0,0 +1 @@
+"""Benchmark di sviluppo (non inclusi nei pacchetti distribuiti)."""
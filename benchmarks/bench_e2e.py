@@ -0,0 +1,253 @@
+"""Benchmark end-to-end di analyze, sanitize e _sanitize_zip su fascicoli sintetici.
+
+Uso:
+    python -m benchmarks.bench_e2e --scale 0.1 --output risultati.json
+    python -m benchmarks.bench_e2e --baseline baseline.json --time-threshold 0.15
+
+Ogni misura gira in un processo separato (spawn), così il picco RSS non risente delle misure precedenti.
+Exit code: 0 nessuna regressione, 1 regressioni rispetto alla baseline, 2 baseline non confrontabile.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.dossier import DEFAULT_SEED, SCENARIOS, generate_dossier
+from core.config import load_config, resolve_profile
+from core.sanitizer import _sanitize_zip, analyze, sanitize
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+RESULTS_SCHEMA = 1
+OP_ANALYZE = "analyze"
+OP_SANITIZE = "sanitize"
+OP_SANITIZE_ZIP = "sanitize_zip"
+OPERATIONS = (OP_ANALYZE, OP_SANITIZE, OP_SANITIZE_ZIP)
+
+DEFAULT_TIME_THRESHOLD = 0.20
+DEFAULT_RSS_THRESHOLD = 0.25
+# sotto questa differenza assoluta (secondi) il rumore del sistema domina: nessuna regressione
+DEFAULT_MIN_DELTA = 0.05
+
+
+def peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux riporta KiB, macOS byte
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def _op_analyze(root: Path, work: Path, profile: dict) -> tuple[int, int]:
+    summary = analyze(root, profile)
+    return len(summary.files), sum(item.source.stat().st_size for item in summary.files)
+
+
+def _op_sanitize(root: Path, work: Path, profile: dict) -> tuple[int, int]:
+    _, summary = sanitize(root, profile, output_mode="custom", custom_output_dir=work)
+    return len(summary.files), sum(item.source.stat().st_size for item in summary.files)
+
+
+def _op_sanitize_zip(root: Path, work: Path, profile: dict) -> tuple[int, int]:
+    files = total = 0
+    for index, src in enumerate(sorted(root.rglob("*.zip"))):
+        with zipfile.ZipFile(src) as zf:
+            files += len(zf.infolist())
+        total += src.stat().st_size
+        _sanitize_zip(src, work / f"{index}.zip", profile)
+    return files, total
+
+
+_OPERATIONS: dict[str, Callable[[Path, Path, dict], tuple[int, int]]] = {
+    OP_ANALYZE: _op_analyze,
+    OP_SANITIZE: _op_sanitize,
+    OP_SANITIZE_ZIP: _op_sanitize_zip,
+}
+
+
+def measure(operation: str, root: Path, work: Path, profile: dict) -> dict:
+    """Esegue una volta l'operazione nel processo corrente e ne restituisce le metriche."""
+    work.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    files, total = _OPERATIONS[operation](root, work, profile)
+    elapsed = time.perf_counter() - started
+    shutil.rmtree(work, ignore_errors=True)
+    return {
+        "files": files,
+        "bytes": total,
+        "seconds": round(elapsed, 4),
+        "files_s": round(files / elapsed, 1) if elapsed else None,
+        "mb_s": round(total / (1024 * 1024) / elapsed, 1) if elapsed else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _measure_child(queue, operation: str, root: str, work: str, profile: dict) -> None:
+    try:
+        queue.put(("ok", measure(operation, Path(root), Path(work), profile)))
+    except BaseException as exc:  # pragma: no cover - riportato al processo padre
+        queue.put(("error", f"{type(exc).__name__}: {exc}"))
+
+
+def measure_isolated(operation: str, root: Path, work: Path, profile: dict) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_measure_child, args=(queue, operation, str(root), str(work), profile))
+    proc.start()
+    status, payload = queue.get()
+    proc.join()
+    if status != "ok":
+        raise RuntimeError(f"{operation} su {root}: {payload}")
+    return payload
+
+
+def run_suite(
+    scenarios: list[str],
+    operations: list[str],
+    profile: dict,
+    workdir: Path,
+    scale: float = 1.0,
+    seed: int = DEFAULT_SEED,
+    repeat: int = 1,
+    isolated: bool = True,
+    log: Callable[[str], None] | None = None,
+) -> dict:
+    """Genera i fascicoli e misura ogni coppia scenario/operazione; tiene il tempo migliore su repeat."""
+    results: list[dict] = []
+    runner = measure_isolated if isolated else measure
+    for scenario in scenarios:
+        dossier = generate_dossier(workdir / scenario, scenario, scale=scale, seed=seed)
+        for operation in operations:
+            if operation == OP_SANITIZE_ZIP and not dossier.zips:
+                continue
+            runs = [runner(operation, dossier.root, workdir / f"out_{scenario}_{operation}", profile) for _ in range(max(1, repeat))]
+            best = min(runs, key=lambda run: run["seconds"])
+            rss = [run["peak_rss_mb"] for run in runs if run["peak_rss_mb"] is not None]
+            row = {"case": f"{scenario}/{operation}", "scenario": scenario, "operation": operation, **best}
+            row["peak_rss_mb"] = max(rss) if rss else None
+            results.append(row)
+            if log:
+                log(format_row(row))
+    return {
+        "schema": RESULTS_SCHEMA,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": scale,
+        "seed": seed,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def format_row(row: dict) -> str:
+    rss = f"{row['peak_rss_mb']} MB" if row["peak_rss_mb"] is not None else "n/d"
+    return (
+        f"{row['case']:<32} {row['seconds']:>9}s {row['files']:>7} file {row['files_s']:>10} file/s "
+        f"{row['mb_s']:>9} MB/s  picco RSS {rss}"
+    )
+
+
+def compare_results(
+    baseline: dict,
+    current: dict,
+    time_threshold: float = DEFAULT_TIME_THRESHOLD,
+    rss_threshold: float = DEFAULT_RSS_THRESHOLD,
+    min_delta: float = DEFAULT_MIN_DELTA,
+) -> list[str]:
+    """Regressioni di current rispetto a baseline; i casi assenti in uno dei due vengono ignorati.
+
+    Solleva ValueError se le due esecuzioni non sono confrontabili (scala o seed diversi).
+    """
+    for key in ("scale", "seed"):
+        if baseline.get(key) != current.get(key):
+            raise ValueError(f"Baseline non confrontabile: {key} {baseline.get(key)} != {current.get(key)}")
+
+    previous = {row["case"]: row for row in baseline.get("results", [])}
+    regressions: list[str] = []
+    for row in current.get("results", []):
+        base = previous.get(row["case"])
+        if base is None:
+            continue
+        delta = row["seconds"] - base["seconds"]
+        if delta > min_delta and row["seconds"] > base["seconds"] * (1 + time_threshold):
+            regressions.append(f"{row['case']}: tempo {base['seconds']}s -> {row['seconds']}s (+{delta / base['seconds']:.0%})")
+        if row.get("peak_rss_mb") and base.get("peak_rss_mb") and row["peak_rss_mb"] > base["peak_rss_mb"] * (1 + rss_threshold):
+            regressions.append(f"{row['case']}: picco RSS {base['peak_rss_mb']} MB -> {row['peak_rss_mb']} MB")
+    return regressions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark end-to-end su fascicoli sintetici")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="Ripetibile; default tutti")
+    parser.add_argument("--operation", action="append", choices=OPERATIONS, help="Ripetibile; default tutte")
+    parser.add_argument("--scale", type=float, default=1.0, help="Moltiplicatore dimensioni (10 = scansioni multi-GB)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--repeat", type=int, default=1, help="Ripetizioni per caso; vale il tempo migliore")
+    parser.add_argument("--profile", default="standard")
+    parser.add_argument("--workdir", type=Path, help="Cartella per i fascicoli generati (default temporanea)")
+    parser.add_argument("--keep", action="store_true", help="Non cancella i fascicoli generati")
+    parser.add_argument("--in-process", action="store_true", help="Misura senza processo separato (RSS meno accurato)")
+    parser.add_argument("--output", type=Path, help="Scrive i risultati in JSON")
+    parser.add_argument("--baseline", type=Path, help="Confronta con risultati JSON precedenti")
+    parser.add_argument("--time-threshold", type=float, default=DEFAULT_TIME_THRESHOLD, help="Rallentamento tollerato (0.2 = +20%%)")
+    parser.add_argument("--rss-threshold", type=float, default=DEFAULT_RSS_THRESHOLD, help="Crescita RSS tollerata")
+    parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA, help="Differenza minima in secondi considerata")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    profile = resolve_profile(load_config(None), args.profile)
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="gdlex_bench_e2e_"))
+    try:
+        current = run_suite(
+            args.scenario or list(SCENARIOS),
+            args.operation or list(OPERATIONS),
+            profile,
+            workdir,
+            scale=args.scale,
+            seed=args.seed,
+            repeat=args.repeat,
+            isolated=not args.in_process,
+            log=print,
+        )
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        args.output.write_text(json.dumps(current, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"Risultati: {args.output}")
+
+    if not args.baseline:
+        return 0
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    try:
+        regressions = compare_results(baseline, current, args.time_threshold, args.rss_threshold, args.min_delta)
+    except ValueError as exc:
+        print(str(exc))
+        return 2
+    for line in regressions:
+        print(f"REGRESSIONE {line}")
+    if not regressions:
+        print("Nessuna regressione rispetto alla baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
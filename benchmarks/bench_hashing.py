@@ -0,0 +1,87 @@
+"""Throughput del motore di hash (GB/s) su file già in page cache.
+
+Uso:
+    python -m benchmarks.bench_hashing
+    python -m benchmarks.bench_hashing --files 16 --size-mb 256
+
+Confronta il ciclo storico (read() da 1 MB e update) con sha256_file (hashlib.file_digest) e con
+l'impronta fast_digest (xxh3 con l'extra fast-hash), verificando che gli SHA-256 coincidano.
+Un primo passaggio di lettura porta i file in cache: si misura l'hash, non il disco.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from core.fs_ops import FAST_DIGEST_AVAILABLE, fast_digest, sha256_file
+
+DEFAULT_FILES = 8
+DEFAULT_SIZE_MB = 128
+BLOCK = 1024 * 1024
+
+
+def _legacy_sha256_file(path: Path) -> str:
+    """Implementazione precedente, come riferimento."""
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_files(directory: Path, count: int, size_mb: int) -> list[Path]:
+    block = os.urandom(BLOCK)
+    paths = []
+    for index in range(count):
+        path = directory / f"scansione_{index:02d}.pdf"
+        with path.open("wb") as handle:
+            for offset in range(size_mb):
+                # blocchi diversi tra file e posizioni: niente contenuti identici
+                handle.write(index.to_bytes(4, "little") + offset.to_bytes(4, "little") + block[8:])
+        paths.append(path)
+    return paths
+
+
+def _measure(func: Callable[[], list[str]], total_bytes: int) -> tuple[float, list[str]]:
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    return total_bytes / elapsed / 1e9, result
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="bench_hashing", description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=DEFAULT_FILES, help=f"File generati (default: {DEFAULT_FILES})")
+    parser.add_argument("--size-mb", type=int, default=DEFAULT_SIZE_MB, help=f"Dimensione di ogni file (default: {DEFAULT_SIZE_MB})")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="gdlex-bench-hash-") as tmp:
+        paths = write_files(Path(tmp), args.files, args.size_mb)
+        total = sum(path.stat().st_size for path in paths)
+        for path in paths:
+            _legacy_sha256_file(path)
+        print(f"{len(paths)} file, {total / 1e9:.2f} GB, fast_digest: {'xxh3' if FAST_DIGEST_AVAILABLE else 'sha256 (xxhash non installato)'}")
+
+        cases = (
+            ("read() 1 MB (storico)", lambda: [_legacy_sha256_file(path) for path in paths]),
+            ("sha256_file", lambda: [sha256_file(path) for path in paths]),
+            ("fast_digest", lambda: [fast_digest(path) for path in paths]),
+        )
+        results = [(label, *_measure(func, total)) for label, func in cases]
+
+    reference = results[0][2]
+    if results[1][2] != reference:
+        print("ERRORE: SHA-256 diversi dall'implementazione di riferimento")
+        return 1
+    for label, speed, _ in results:
+        print(f"  {label:28} {speed:6.2f} GB/s  x{speed / results[0][1]:4.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,121 @@
+"""Microbenchmark di core.normalizer su nomi di file realistici di un fascicolo italiano.
+
+Uso:
+    python -m benchmarks.bench_normalizer
+    python -m benchmarks.bench_normalizer --count 200000 --seed 7
+
+Confronta l'implementazione storica (NFKD e tre re.sub per ogni chiamata) con sanitize_filename
+(cache LRU e percorso veloce per i nomi ASCII già conformi) e con normalize_many, verificando che
+i risultati coincidano.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from core.normalizer import normalize_many, sanitize_filename, strip_accents
+
+DEFAULT_COUNT = 1_000_000
+DEFAULT_SEED = 2026
+
+_ATTI = [
+    "Atto di citazione",
+    "Comparsa di costituzione e risposta",
+    "Memoria difensiva ex art. 183",
+    "Procura alle liti",
+    "Nota di iscrizione a ruolo",
+    "Ricorso per decreto ingiuntivo",
+    "Verbale d'udienza",
+    "Perizia tecnica d'ufficio",
+    "Relazione di notifica",
+    "Istanza di visibilità",
+    "Precisazione delle conclusioni",
+    "Ricevuta PEC",
+]
+_PARTI = ["Rossi", "Bianchi S.r.l.", "Condominio Via Roma", "Esposito", "De Luca", "Società Agricola Sant'Antonio"]
+_ALLEGATI = ["all", "doc", "allegato", "Doc.", "ALL"]
+_EXT = [".pdf", ".pdf", ".pdf", ".p7m", ".pdf.p7m", ".zip", ".eml", ".jpg", ".xml"]
+_CLEAN = ["atto_citazione.pdf", "procura.pdf", "nota_iscrizione_ruolo.pdf", "doc_01.pdf", "ricevuta_accettazione.eml"]
+
+
+def _legacy_sanitize_filename(name: str, max_len: int = 80) -> str:
+    """Implementazione precedente, come riferimento per tempi e risultati."""
+    path = Path(name)
+    extension = path.suffix
+    stem = path.stem
+    cleaned = strip_accents(stem)
+    cleaned = cleaned.replace(" ", "_")
+    cleaned = re.sub(r"[^a-zA-Z0-9._-]", "_", cleaned)
+    cleaned = re.sub(r"_+", "_", cleaned).strip("._-") or "file"
+
+    budget = max_len - len(extension)
+    if budget < 1:
+        budget = 1
+    cleaned = cleaned[:budget]
+    return f"{cleaned}{extension}"
+
+
+def generate_names(count: int, seed: int = DEFAULT_SEED) -> list[str]:
+    """Nomi come arrivano dagli studi: accenti, spazi, date, numerazioni, firme; un quinto già conformi."""
+    rng = random.Random(seed)
+    names: list[str] = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.2:
+            names.append(rng.choice(_CLEAN) if rng.random() < 0.5 else f"doc_{rng.randint(1, 400):03d}.pdf")
+            continue
+        parts = [rng.choice(_ATTI)]
+        if roll < 0.6:
+            parts.append(rng.choice(_PARTI))
+        if roll < 0.4:
+            parts.append(f"{rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.{rng.randint(2018, 2026)}")
+        if roll > 0.8:
+            parts.insert(0, f"{rng.choice(_ALLEGATI)} {rng.randint(1, 60)}")
+        stem = " - ".join(parts) if rng.random() < 0.5 else " ".join(parts)
+        if rng.random() < 0.25:
+            stem += rng.choice(["_signed", " firmato", "(1)", " (copia)"])
+        names.append(stem + rng.choice(_EXT))
+    return names
+
+
+def _time(func: Callable[[], object]) -> float:
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="bench_normalizer", description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=DEFAULT_COUNT, help=f"Nomi generati (default: {DEFAULT_COUNT})")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--max-len", type=int, default=80)
+    args = parser.parse_args(argv)
+
+    names = generate_names(args.count, args.seed)
+    print(f"{len(names)} nomi, {len(set(names))} distinti")
+
+    expected: list[str] = []
+    legacy = _time(lambda: expected.extend(_legacy_sanitize_filename(name, args.max_len) for name in names))
+    sanitize_filename.cache_clear()
+    cached: list[str] = []
+    single = _time(lambda: cached.extend(sanitize_filename(name, args.max_len) for name in names))
+    info = sanitize_filename.cache_info()
+    sanitize_filename.cache_clear()
+    batch: list[str] = []
+    many = _time(lambda: batch.extend(normalize_many(names, args.max_len)))
+
+    if cached != expected or batch != expected:
+        print("ERRORE: risultati diversi dall'implementazione di riferimento")
+        return 1
+    for label, seconds in (("riferimento", legacy), ("sanitize_filename", single), ("normalize_many", many)):
+        print(f"  {label:18} {seconds:7.3f} s  {len(names) / seconds / 1e6:6.2f} M nomi/s  x{legacy / seconds:5.1f}")
+    print(f"  cache LRU: {info.hits} hit, {info.misses} miss")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
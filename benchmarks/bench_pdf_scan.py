@@ -0,0 +1,69 @@
+"""Confronta validate_pdf in streaming con la lettura completa del file.
+
+Uso: python -m benchmarks.bench_pdf_scan --size-mb 700
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from core.validators import validate_pdf
+
+BLOCK = b"0 0 m 595 842 l S\n" * 4096
+
+
+def write_synthetic_pdf(path: Path, size_mb: int, signed: bool = True) -> Path:
+    target = size_mb * 1024 * 1024
+    with path.open("wb") as handle:
+        handle.write(b"%PDF-1.7\n1 0 obj\n<< /Type /Catalog >>\nendobj\n")
+        written = handle.tell()
+        while written < target:
+            written += handle.write(BLOCK)
+        if signed:
+            handle.write(b"\n9 0 obj\n<< /ByteRange [0 1 2 3] /Contents <00> >>\nendobj\n")
+        handle.write(b"trailer\n<< >>\n%%EOF\n")
+    return path
+
+
+def _legacy_validate_pdf(path: Path) -> bool:
+    blob = path.read_bytes()
+    return b"/Encrypt" in blob or (b"/ByteRange" in blob and b"/Contents" in blob)
+
+
+def _measure(label: str, func, path: Path) -> dict:
+    tracemalloc.start()
+    started = time.perf_counter()
+    func(path)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size = path.stat().st_size
+    return {
+        "label": label,
+        "seconds": round(elapsed, 4),
+        "mb_s": round(size / (1024 * 1024) / elapsed, 1) if elapsed else None,
+        "peak_mb": round(peak / (1024 * 1024), 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark validate_pdf streaming vs read_bytes")
+    parser.add_argument("--size-mb", type=int, default=256, help="Dimensione del PDF sintetico")
+    parser.add_argument("--skip-legacy", action="store_true", help="Non misura la lettura completa in memoria")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="gdlex_bench_pdf_") as tmp:
+        pdf = write_synthetic_pdf(Path(tmp) / "scan.pdf", args.size_mb)
+        rows = [_measure("streaming", validate_pdf, pdf)]
+        if not args.skip_legacy:
+            rows.append(_measure("read_bytes", _legacy_validate_pdf, pdf))
+
+    for row in rows:
+        print(f"{row['label']:>10}: {row['seconds']:>8}s  {row['mb_s']:>8} MB/s  picco {row['peak_mb']} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Tempo di avvio di `gdlex-check --analyze` su un singolo file, contro un budget in millisecondi.
+
+Uso:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --repeat 20 --budget-ms 250 --import-time
+
+Ogni esecuzione è un processo nuovo (`python -m cli.main`), come da terminale o da script di deposito:
+conta la mediana, meno sensibile del minimo alle cache calde e del massimo al rumore della macchina.
+Exit code: 0 entro il budget, 1 budget superato.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+DEFAULT_BUDGET_MS = 300.0
+DEFAULT_REPEAT = 10
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _command(target: Path, extra: list[str]) -> list[str]:
+    return [sys.executable, "-m", "cli.main", str(target), "--analyze", *extra]
+
+
+def _env() -> dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH")]))
+    # la cache analisi renderebbe la misura dipendente dalle esecuzioni precedenti
+    env.pop("GDLEX_CACHE", None)
+    return env
+
+
+def measure_startup(target: Path, repeat: int = DEFAULT_REPEAT, extra: list[str] | None = None) -> list[float]:
+    """Secondi di ogni esecuzione completa della CLI (avvio interprete, import, analisi, uscita)."""
+    command = _command(target, extra or [])
+    env = _env()
+    # un giro a vuoto: popola i .pyc e la page cache come in un uso reale
+    subprocess.run(command, env=env, cwd=ROOT, stdout=subprocess.DEVNULL, check=False)
+    samples: list[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(command, env=env, cwd=ROOT, stdout=subprocess.DEVNULL, check=False)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def slowest_imports(limit: int = 10) -> list[tuple[int, str]]:
+    """Moduli con il tempo di import cumulativo più alto (microsecondi), da `python -X importtime`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import cli.main"],
+        env=_env(),
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    rows: list[tuple[int, str]] = []
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="bench_startup", description=__doc__.splitlines()[0])
+    parser.add_argument("--file", type=Path, help="File da analizzare (default: PDF minimo generato al volo)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help=f"Esecuzioni misurate (default: {DEFAULT_REPEAT})")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help=f"Budget sulla mediana (default: {DEFAULT_BUDGET_MS:g})")
+    parser.add_argument("--import-time", action="store_true", help="Mostra anche i moduli più lenti da importare")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="gdlex_bench_startup_") as tmp:
+        target = args.file
+        if target is None:
+            target = Path(tmp) / "atto.pdf"
+            target.write_bytes(b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog >>\nendobj\n%%EOF\n")
+        samples = measure_startup(target, args.repeat)
+
+    median_ms = statistics.median(samples) * 1000
+    print(f"gdlex-check --analyze ({args.repeat} esecuzioni)")
+    print(f"  mediana {median_ms:.1f} ms  min {min(samples) * 1000:.1f} ms  max {max(samples) * 1000:.1f} ms")
+    if args.import_time:
+        print("Import più lenti (cumulativo):")
+        for micros, module in slowest_imports():
+            print(f"  {micros / 1000:7.1f} ms  {module}")
+    if median_ms > args.budget_ms:
+        print(f"BUDGET SUPERATO: {median_ms:.1f} ms > {args.budget_ms:g} ms")
+        return 1
+    print(f"Entro il budget di {args.budget_ms:g} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,129 @@
+"""Ricostruzione ZIP (_sanitize_zip) su un archivio misto realistico: CPU e tempo per politica di compressione.
+
+Uso:
+    python -m benchmarks.bench_zip_rebuild
+    python -m benchmarks.bench_zip_rebuild --size-mb 400 --jobs 8
+
+L'archivio sorgente è salvato in store (come lo esportano molti scanner e gestionali), quindi ogni
+entry va ricompressa. Il riferimento applica deflate al livello predefinito a tutte le entry in un solo
+thread, come la ricostruzione precedente; gli altri casi usano la politica per estensione del profilo,
+prima su un thread e poi su --jobs thread. Verifica che il contenuto delle entry coincida.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+import zipfile
+import zlib
+from pathlib import Path
+
+from core.config import DEFAULT_ZIP_DEFLATE_LEVEL, DEFAULT_ZIP_LEVELS
+from core.parallel import resolve_jobs
+from core.sanitizer import _sanitize_zip
+
+DEFAULT_SIZE_MB = 200
+DEFAULT_SEED = 2026
+
+ALLOWED = ["pdf", "p7m", "jpg", "mp4", "xml", "txt", "eml"]
+# quota del volume per formato: foto e video dominano i fascicoli con allegati multimediali
+_MIX = (("jpg", 0.35), ("mp4", 0.2), ("pdf", 0.3), ("p7m", 0.05), ("xml", 0.05), ("txt", 0.03), ("eml", 0.02))
+_WORDS = [b"ricorso", b"decreto", b"ingiuntivo", b"tribunale", b"udienza", b"memoria", b"allegato", b"parte", b"Rossi"]
+
+
+def _text(rng: random.Random, size: int) -> bytes:
+    words = []
+    total = 0
+    while total < size:
+        word = rng.choice(_WORDS)
+        words.append(word)
+        total += len(word) + 1
+    return b" ".join(words)[:size]
+
+
+def _pdf(rng: random.Random, size: int) -> bytes:
+    # PDF moderni: stream già FlateDecode (poco comprimibili) con un po' di struttura testuale
+    stream = zlib.compress(_text(rng, size * 3), 6)[: size * 4 // 5]
+    head = b"%PDF-1.7\n1 0 obj\n<< /Type /Catalog >>\nendobj\n2 0 obj\n<< /Filter /FlateDecode >>\nstream\n"
+    return head + stream + b"\nendstream\nendobj\n" + _text(rng, size // 5) + b"\n%%EOF\n"
+
+
+def _payload(rng: random.Random, ext: str, size: int) -> bytes:
+    if ext in {"jpg", "mp4", "p7m"}:
+        return rng.randbytes(size)
+    if ext == "pdf":
+        return _pdf(rng, size)
+    return _text(rng, size)
+
+
+def build_archive(path: Path, size_mb: int, seed: int = DEFAULT_SEED) -> int:
+    rng = random.Random(seed)
+    count = 0
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as zf:
+        for ext, share in _MIX:
+            budget = int(size_mb * 1024 * 1024 * share)
+            while budget > 0:
+                size = min(budget, rng.randint(20_000, 4 * 1024 * 1024))
+                info = zipfile.ZipInfo(f"allegati/{ext}_{count:05d}.{ext}", date_time=(2024, 1, 1, 0, 0, 0))
+                zf.writestr(info, _payload(rng, ext, size))
+                budget -= size
+                count += 1
+    return count
+
+
+def _contents(path: Path) -> list[tuple[str, int]]:
+    with zipfile.ZipFile(path) as zf:
+        return [(info.filename, info.CRC) for info in zf.infolist()]
+
+
+def _run(src: Path, dst: Path, profile: dict, jobs: int) -> dict:
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    _sanitize_zip(src, dst, profile, jobs=jobs)
+    return {
+        "wall": time.perf_counter() - wall,
+        "cpu": time.process_time() - cpu,
+        "size": dst.stat().st_size,
+        "contents": _contents(dst),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="bench_zip_rebuild", description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=DEFAULT_SIZE_MB, help=f"Volume non compresso (default: {DEFAULT_SIZE_MB})")
+    parser.add_argument("--jobs", type=int, default=0, help="Thread per la ricompressione (0 = uno per CPU)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args(argv)
+
+    jobs = resolve_jobs(args.jobs)
+    base = {"allowed_formats": ALLOWED, "warning_formats": [], "filename": {"max_length": 80}}
+    legacy = {**base, "zip": {"compression": {ext: DEFAULT_ZIP_DEFLATE_LEVEL for ext in ("default", *DEFAULT_ZIP_LEVELS)}}}
+
+    with tempfile.TemporaryDirectory(prefix="gdlex-bench-zip-") as tmp:
+        src = Path(tmp) / "misto.zip"
+        entries = build_archive(src, args.size_mb, args.seed)
+        print(f"{entries} entry, {src.stat().st_size / 1e6:.1f} MB in store")
+
+        cases = (
+            ("deflate ovunque, 1 thread", legacy, 1),
+            ("politica profilo, 1 thread", base, 1),
+            (f"politica profilo, {jobs} thread", base, jobs),
+        )
+        results = [(label, _run(src, Path(tmp) / f"out_{index}.zip", profile, case_jobs)) for index, (label, profile, case_jobs) in enumerate(cases)]
+
+    reference = results[0][1]
+    if any(result["contents"] != reference["contents"] for _, result in results):
+        print("ERRORE: contenuto delle entry diverso tra i casi")
+        return 1
+    for label, result in results:
+        saved = 1 - result["cpu"] / reference["cpu"]
+        print(
+            f"  {label:30} {result['wall']:7.2f} s  CPU {result['cpu']:7.2f} s ({saved:+6.1%} risparmiata)"
+            f"  output {result['size'] / 1e6:8.1f} MB"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
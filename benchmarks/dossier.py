@@ -0,0 +1,143 @@
+"""Generatore di fascicoli sintetici riproducibili per i benchmark.
+
+Stesso seed e stessa scala producono lo stesso albero, byte per byte (mtime dei file esclusi).
+"""
+from __future__ import annotations
+
+import random
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from benchmarks.bench_pdf_scan import write_synthetic_pdf
+
+DEFAULT_SEED = 20260101
+
+SCENARIO_SMALL_PDFS = "small_pdfs"
+SCENARIO_LARGE_SCANS = "large_scans"
+SCENARIO_DEEP_ZIP = "deep_zip"
+SCENARIO_PATHOLOGICAL_NAMES = "pathological_names"
+SCENARIOS = (SCENARIO_SMALL_PDFS, SCENARIO_LARGE_SCANS, SCENARIO_DEEP_ZIP, SCENARIO_PATHOLOGICAL_NAMES)
+
+# dimensioni a scala 1.0; --scale 10 porta le scansioni a più GB e lo ZIP a 500k entry
+SMALL_PDF_COUNT = 3000
+LARGE_SCAN_COUNT = 2
+LARGE_SCAN_MB = 256
+ZIP_ENTRIES = 50_000
+ZIP_DEPTH = 12
+PATHOLOGICAL_COUNT = 800
+
+_WORDS = ["atto", "citazione", "ricorso", "memoria", "allegato", "verbale", "procura", "nota", "deposito", "perizia"]
+_NASTY = [
+    "Atto   di   citazione",
+    "àèìòù ÀÈÌÒÙ ç",
+    "COPIA (1) [definitiva] {bis}",
+    "con#caratteri%speciali&vari",
+    "  spazi iniziali e finali  ",
+    "punti...multipli..",
+    "emoji_📄_documento",
+    "nome" + "_molto_lungo" * 12,
+    "CON",
+    "a:b*c?d\"e<f>g|h",
+    "tab\tnel\tnome",
+    "Ünïcödé NFD é",
+]
+
+
+@dataclass(slots=True)
+class Dossier:
+    scenario: str
+    root: Path
+    files: int
+    bytes: int
+    zips: list[Path]
+
+
+def _scaled(value: int, scale: float) -> int:
+    return max(1, int(value * scale))
+
+
+def _small_pdf(rng: random.Random) -> bytes:
+    body = b" ".join(rng.choice(_WORDS).encode("ascii") for _ in range(rng.randint(200, 2000)))
+    signed = b"/ByteRange [0 1 2 3] /Contents <00>\n" if rng.random() < 0.1 else b""
+    return b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog >>\nendobj\n" + body + b"\n" + signed + b"%%EOF\n"
+
+
+def _gen_small_pdfs(root: Path, rng: random.Random, scale: float) -> None:
+    for index in range(_scaled(SMALL_PDF_COUNT, scale)):
+        folder = root / f"sezione_{index % 20:02d}"
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"{rng.choice(_WORDS)}_{index:05d}.pdf").write_bytes(_small_pdf(rng))
+
+
+def _gen_large_scans(root: Path, rng: random.Random, scale: float) -> None:
+    size_mb = _scaled(LARGE_SCAN_MB, scale)
+    for index in range(LARGE_SCAN_COUNT):
+        write_synthetic_pdf(root / f"scansione_{index + 1}.pdf", size_mb, signed=bool(index % 2))
+    (root / "nota.txt").write_bytes(b"scansioni sintetiche\n")
+
+
+def _zip_write(zf: zipfile.ZipFile, name: str, payload: bytes) -> None:
+    # data fissa: l'archivio non dipende dall'ora di generazione
+    info = zipfile.ZipInfo(name, date_time=(2024, 1, 1, 0, 0, 0))
+    info.compress_type = zf.compression
+    zf.writestr(info, payload)
+
+
+def _gen_deep_zip(root: Path, rng: random.Random, scale: float) -> None:
+    path = root / "allegati.zip"
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for index in range(_scaled(ZIP_ENTRIES, scale)):
+            depth = rng.randint(1, ZIP_DEPTH)
+            folders = "/".join(f"livello{level}_{rng.choice(_WORDS)}" for level in range(depth))
+            ext = rng.choice(("pdf", "pdf", "txt", "xml"))
+            payload = _small_pdf(rng) if ext == "pdf" else rng.choice(_WORDS).encode("ascii") * rng.randint(1, 64)
+            _zip_write(zf, f"{folders}/{rng.choice(_WORDS)} {index}.{ext}", payload)
+    with zipfile.ZipFile(root / "piccolo.zip", "w", compression=zipfile.ZIP_STORED) as zf:
+        _zip_write(zf, "Thumbs.db", b"")
+        _zip_write(zf, "dentro/atto.pdf", _small_pdf(rng))
+
+
+def _gen_pathological_names(root: Path, rng: random.Random, scale: float) -> None:
+    root.mkdir(parents=True, exist_ok=True)
+    exts = ("pdf", "PDF", "txt", "p7m", "exe", "docx", "")
+    for index in range(_scaled(PATHOLOGICAL_COUNT, scale)):
+        stem = rng.choice(_NASTY).replace("/", "_")
+        for bad in ':*?"<>|\t':
+            # il filesystem di destinazione potrebbe rifiutarli: restano rappresentati da sostituti visibili
+            stem = stem.replace(bad, "¦")
+        ext = rng.choice(exts)
+        # i duplicati dopo la normalizzazione sono voluti: stressano ensure_unique
+        name = f"{stem}{index % 7}" + (f".{ext}" if ext else "")
+        folder = root / rng.choice(("", "sotto cartella", "ÀÈÌ", "a/b/c/d/e/f"))
+        folder.mkdir(parents=True, exist_ok=True)
+        target = folder / name
+        if not target.exists():
+            target.write_bytes(_small_pdf(rng) if ext.lower() == "pdf" else b"contenuto\n")
+    (root / ".DS_Store").write_bytes(b"\0")
+    (root / "~$bozza.docx").write_bytes(b"\0")
+
+
+_GENERATORS = {
+    SCENARIO_SMALL_PDFS: _gen_small_pdfs,
+    SCENARIO_LARGE_SCANS: _gen_large_scans,
+    SCENARIO_DEEP_ZIP: _gen_deep_zip,
+    SCENARIO_PATHOLOGICAL_NAMES: _gen_pathological_names,
+}
+
+
+def generate_dossier(root: Path, scenario: str, scale: float = 1.0, seed: int = DEFAULT_SEED) -> Dossier:
+    """Crea il fascicolo sintetico in root (che deve essere vuota o inesistente)."""
+    if scenario not in _GENERATORS:
+        raise ValueError(f"Scenario non supportato: {scenario} (disponibili: {', '.join(SCENARIOS)})")
+    root.mkdir(parents=True, exist_ok=True)
+    # seed distinto per scenario: aggiungere uno scenario non cambia gli altri
+    _GENERATORS[scenario](root, random.Random(f"{seed}:{scenario}"), scale)
+    files = [path for path in sorted(root.rglob("*")) if path.is_file()]
+    return Dossier(
+        scenario=scenario,
+        root=root,
+        files=len(files),
+        bytes=sum(path.stat().st_size for path in files),
+        zips=[path for path in files if path.suffix.lower() == ".zip"],
+    )
@@ -2,17 +2,54 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
+import sys
+from contextlib import closing
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from core.config import load_config, resolve_profile
-from core.sanitizer import analyze, sanitize
-from core.version import get_app_version
+from core.config import Profile, load_config, resolve_profile
+from core.constants import (
+    CACHE_ENV,
+    DEFAULT_DEBOUNCE,
+    DEFAULT_POLL_INTERVAL,
+    DUPLICATE_POLICIES,
+    DUPLICATES_KEEP,
+    MATERIALIZE_COPY,
+    MATERIALIZE_STRATEGIES,
+    SERVE_DEFAULT_HOST,
+    SERVE_DEFAULT_MAX_CONCURRENT,
+    SERVE_DEFAULT_PORT,
+    WATCH_AUTO,
+    WATCH_BACKENDS,
+)
+from core.parallel import BACKEND_PROCESS, BACKENDS
+from core.timings import StageTimings, format_timings
+
+if TYPE_CHECKING:
+    from core.cache import AnalysisCache
+
+
+class _LazyVersionAction(argparse.Action):
+    """--version risolto solo quando richiesto: le altre esecuzioni non pagano metadata, git describe e pyproject."""
+
+    def __init__(self, option_strings, dest=argparse.SUPPRESS, default=argparse.SUPPRESS, help="Mostra la versione ed esce"):
+        super().__init__(option_strings, dest=dest, default=default, nargs=0, help=help)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        from core.version import get_app_version
+
+        sys.stdout.write(f"{parser.prog} {get_app_version()}\n")
+        parser.exit()
 
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(prog="gdlex-check", description="Validazione conservativa PCT/PDUA")
-    parser.add_argument("--version", action="version", version=f"%(prog)s {get_app_version()}")
-    parser.add_argument("input_folder", type=Path, help="File o cartella di input")
+    parser.add_argument("--version", action=_LazyVersionAction)
+    parser.add_argument("input_folder", type=Path, nargs="?", help="File o cartella di input")
+    parser.add_argument("extra_inputs", type=Path, nargs="*", help="Altri fascicoli: attiva la modalità batch")
+    parser.add_argument("--batch-file", type=Path, help="File con un fascicolo per riga (- per stdin): modalità batch")
+    parser.add_argument("--jsonl", type=Path, help="In modalità batch scrive i record JSONL su file invece che su stdout")
     parser.add_argument("--output", type=Path, help="Cartella output custom")
     parser.add_argument("--profile", default="pdua_safe", help="Profilo regole (default: pdua_safe)")
     parser.add_argument("--analyze", action="store_true", help="Esegue solo analisi")
@@ -20,17 +57,126 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--report", action="store_true", help="Mostra report sintetico su stdout")
     parser.add_argument("--strict", action="store_true", help="Exit code 2 se presenti warning")
     parser.add_argument("--json", action="store_true", help="Output JSON")
+    parser.add_argument("--ndjson", action="store_true", help="Una riga JSON per file, stampata appena il file è elaborato")
     parser.add_argument("--dry-run", action="store_true", help="Simula senza scrivere file")
+    parser.add_argument("--incremental", action="store_true", help="Aggiorna l'output esistente riscrivendo solo i file modificati")
+    parser.add_argument(
+        "--materialize",
+        choices=MATERIALIZE_STRATEGIES,
+        default=MATERIALIZE_COPY,
+        help="Come creare i file di output: copy (default), auto/reflink, copy_file_range, hardlink (con fallback automatico)",
+    )
+    parser.add_argument(
+        "--duplicates",
+        choices=DUPLICATE_POLICIES,
+        default=DUPLICATES_KEEP,
+        help="File di output con contenuto identico: keep (solo segnalati, default), exclude o hardlink",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker paralleli per analisi e scrittura dell'output, o fascicoli in parallelo in modalità batch (0 = uno per CPU, default: 1)",
+    )
+    parser.add_argument("--backend", choices=BACKENDS, default="thread", help="Backend worker per --jobs (default: thread)")
+    parser.add_argument("--cache", action="store_true", help=f"Riusa le analisi salvate per i file non modificati (anche con {CACHE_ENV}=1)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignora la cache analisi per questa esecuzione")
+    parser.add_argument("--clear-cache", action="store_true", help="Svuota la cache analisi")
+    parser.add_argument("--cache-dir", type=Path, help="Cartella cache analisi custom")
+    parser.add_argument(
+        "--cache-content-keys",
+        action="store_true",
+        help="Con --cache riconosce per contenuto (impronta xxh3, extra fast-hash) i file toccati o ricopiati senza modifiche",
+    )
+    parser.add_argument("--timings", action="store_true", help="Misura i tempi per fase e mostra i file più lenti")
+    parser.add_argument("--watch", action="store_true", help="Resta in ascolto e rivalida solo i file creati o modificati")
+    parser.add_argument("--watch-backend", choices=WATCH_BACKENDS, default=WATCH_AUTO, help="inotify (Linux) o polling (default: auto)")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE, help="Secondi di quiete prima di rivalidare un file")
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL, help="Intervallo del polling in secondi")
+    parser.add_argument("--serve", action="store_true", help="Avvia il server locale residente (HTTP su localhost o socket Unix)")
+    parser.add_argument("--socket", type=Path, help="Con --serve: ascolta sul socket Unix indicato invece che in HTTP")
+    parser.add_argument("--host", default=SERVE_DEFAULT_HOST, help=f"Con --serve: indirizzo di ascolto (default: {SERVE_DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=SERVE_DEFAULT_PORT, help=f"Con --serve: porta HTTP (default: {SERVE_DEFAULT_PORT})")
+    parser.add_argument(
+        "--max-concurrent",
+        type=int,
+        default=SERVE_DEFAULT_MAX_CONCURRENT,
+        help=f"Con --serve: richieste elaborate in parallelo (default: {SERVE_DEFAULT_MAX_CONCURRENT})",
+    )
+    parser.add_argument("--token-file", type=Path, help="Con --serve: scrive qui (permessi 0600) il token richiesto ai client")
     return parser
 
 
-def main() -> int:
+def main(argv: list[str] | None = None) -> int:
     parser = build_parser()
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+
+    if args.clear_cache:
+        from core.cache import open_analysis_cache
+
+        cache = open_analysis_cache(args.cache_dir)
+        if cache is not None:
+            cache.clear()
+            cache.close()
+        if args.input_folder is None and args.batch_file is None:
+            print("Cache analisi svuotata")
+            return 0
+    if args.serve:
+        return _run_server(args)
+    batch_inputs = ([args.input_folder] if args.input_folder else []) + args.extra_inputs
+    if args.batch_file:
+        from core.batch import read_batch_file
+
+        batch_inputs += read_batch_file(args.batch_file)
+    if not batch_inputs:
+        parser.error("specificare file o cartella di input")
+    batch = len(batch_inputs) > 1 or args.batch_file is not None
+    if args.ndjson and (batch or args.json):
+        parser.error("--ndjson non è combinabile con --json o con la modalità batch")
+    if args.watch and (batch or args.sanitize or not args.input_folder.is_dir()):
+        parser.error("--watch richiede una sola cartella e la sola analisi")
 
     config = load_config()
     profile = resolve_profile(config, args.profile)
 
+    use_cache = False
+    if not args.no_cache and (args.cache or os.getenv(CACHE_ENV)):
+        from core.cache import cache_enabled_by_env
+
+        use_cache = args.cache or cache_enabled_by_env()
+    if use_cache and args.cache_content_keys:
+        from core.fs_ops import FAST_DIGEST_AVAILABLE
+
+        if not FAST_DIGEST_AVAILABLE:
+            print("Avviso: --cache-content-keys richiede xxhash (pip install 'gdlex-pct-validator[fast-hash]'): ignorato", file=sys.stderr)
+    cache = None
+    # nel batch a processi ogni worker apre la propria connessione alla cache
+    if use_cache and not (batch and args.backend == BACKEND_PROCESS):
+        from core.cache import open_analysis_cache
+
+        cache = open_analysis_cache(args.cache_dir, content_keys=args.cache_content_keys)
+
+    if args.watch:
+        return _run_watch(args, profile)
+
+    if batch:
+        try:
+            return _run_batch(args, batch_inputs, profile, cache, use_cache)
+        finally:
+            if cache is not None:
+                cache.close()
+
+    timings = StageTimings() if args.timings else None
+    if args.ndjson:
+        try:
+            return _run_ndjson(args, profile, cache, timings)
+        finally:
+            if cache is not None:
+                cache.close()
+
+    from core.batch import exit_code_for
+    from core.sanitizer import analyze, sanitize
+
     if args.sanitize:
         output_mode = "custom" if args.output else "sibling"
         output_dir, summary = sanitize(
@@ -39,10 +185,19 @@ def main() -> int:
             dry_run=args.dry_run,
             output_mode=output_mode,
             custom_output_dir=args.output,
+            jobs=args.jobs,
+            backend=args.backend,
+            cache=cache,
+            incremental=args.incremental,
+            materialization=args.materialize,
+            duplicates=args.duplicates,
+            timings=timings,
         )
     else:
-        summary = analyze(args.input_folder, profile)
+        summary = analyze(args.input_folder, profile, jobs=args.jobs, backend=args.backend, cache=cache, timings=timings)
         output_dir = None
+    if cache is not None:
+        cache.close()
 
     if args.json:
         payload = summary.to_dict()
@@ -53,6 +208,16 @@ def main() -> int:
             print(f"{item.source} -> {item.status.upper()} [{item.correction_outcome}]")
         if output_dir:
             print(f"Output creato in: {output_dir}")
+        plan = summary.stats.get("plan")
+        if plan:
+            print(f"Piano output (dry-run) in: {plan['output']}")
+            for row in plan["files"]:
+                print(f"  {row['source']} -> {row['target']}")
+        io_stats = summary.stats.get("io")
+        if io_stats and io_stats["read_per_output_byte"] is not None:
+            print(f"I/O: {io_stats['read_per_output_byte']} byte letti per byte scritto")
+        if timings is not None:
+            print("\n".join(format_timings(summary.stats["timings"])))
 
     if args.report and not args.json:
         print("\nReport sintetico:")
@@ -60,12 +225,132 @@ def main() -> int:
             for issue in item.issues:
                 print(f"- {item.source.name} [{issue.level}] {issue.message}")
 
-    if summary.has_errors:
-        return 1
-    if args.strict and any(item.status == "warning" for item in summary.files):
-        return 2
+    return exit_code_for(summary, args.strict)
+
+
+def _run_server(args: argparse.Namespace) -> int:
+    """Config, profili e worker caricati una volta; ogni richiesta paga solo la validazione."""
+    from core.server import ValidationService, create_server
+    from core.version import get_app_version
+
+    service = ValidationService(
+        load_config(),
+        default_profile=args.profile,
+        max_concurrent=args.max_concurrent,
+        backend=args.backend,
+        version=get_app_version(),
+    )
+    server = create_server(service, socket_path=args.socket, host=args.host, port=args.port)
+    where = args.socket if args.socket else "http://{}:{}".format(*server.server_address[:2])
+    if args.token_file is not None:
+        descriptor = os.open(args.token_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(descriptor, "w", encoding="utf-8") as handle:
+            handle.write(service.token)
+    print(f"gdlex-check in ascolto su {where} (max {args.max_concurrent} richieste in parallelo)", flush=True)
+    print(f"Token (header X-GDLEX-Token): {service.token}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        if args.socket is not None and args.socket.exists():
+            args.socket.unlink()
+        if args.token_file is not None:
+            args.token_file.unlink(missing_ok=True)
     return 0
 
 
+def _run_watch(args: argparse.Namespace, profile: Profile) -> int:
+    """Analisi iniziale, poi un aggiornamento per ogni file creato, modificato o rimosso; Ctrl+C per uscire."""
+    from core.batch import exit_code_for_statuses
+    from core.watch import DossierWatcher
+
+    watcher = DossierWatcher(
+        args.input_folder,
+        profile,
+        debounce=args.debounce,
+        backend=args.watch_backend,
+        poll_interval=args.poll_interval,
+        jobs=args.jobs,
+    )
+    try:
+        for update in watcher.watch():
+            if args.ndjson:
+                print(json.dumps(update.to_dict(), ensure_ascii=False), flush=True)
+            elif update.analysis is None:
+                print(f"[{update.event}] {update.path}", flush=True)
+            else:
+                print(f"[{update.event}] {update.path} -> {update.analysis.status.upper()}", flush=True)
+    except KeyboardInterrupt:
+        pass
+    return exit_code_for_statuses((item.status for item in watcher.index.values()), args.strict)
+
+
+def _run_ndjson(args: argparse.Namespace, profile: Profile, cache: AnalysisCache | None, timings: StageTimings | None) -> int:
+    """Stampa ogni FileAnalysis appena pronta: nessun riepilogo accumulato per l'output."""
+    from core.batch import exit_code_for_statuses
+    from core.sanitizer import iter_analyze, iter_sanitize
+
+    if args.sanitize:
+        items = iter_sanitize(
+            args.input_folder,
+            profile,
+            dry_run=args.dry_run,
+            output_mode="custom" if args.output else "sibling",
+            custom_output_dir=args.output,
+            jobs=args.jobs,
+            backend=args.backend,
+            cache=cache,
+            incremental=args.incremental,
+            materialization=args.materialize,
+            duplicates=args.duplicates,
+            timings=timings,
+        )
+    else:
+        items = iter_analyze(args.input_folder, profile, jobs=args.jobs, backend=args.backend, cache=cache, timings=timings)
+    statuses: set[str] = set()
+    with closing(items):
+        for item in items:
+            statuses.add(item.status)
+            sys.stdout.write(json.dumps(item.to_dict(), ensure_ascii=False) + "\n")
+            sys.stdout.flush()
+    if timings is not None:
+        print("\n".join(format_timings(timings.to_dict())), file=sys.stderr)
+    return exit_code_for_statuses(statuses, args.strict)
+
+
+def _run_batch(args: argparse.Namespace, inputs: list[Path], profile: Profile, cache: AnalysisCache | None, use_cache: bool) -> int:
+    """Un record JSONL per fascicolo; config e profilo sono caricati una volta sola per tutto il batch."""
+    from core.batch import BatchOptions, aggregate_exit_codes, iter_batch
+
+    options = BatchOptions(
+        sanitize=args.sanitize,
+        dry_run=args.dry_run,
+        output=args.output,
+        incremental=args.incremental,
+        materialization=args.materialize,
+        duplicates=args.duplicates,
+        strict=args.strict,
+        timings=args.timings,
+        include_summary=args.json,
+        use_cache=use_cache and args.backend == BACKEND_PROCESS,
+        cache_dir=args.cache_dir,
+        cache_content_keys=args.cache_content_keys,
+    )
+    codes: list[int] = []
+    handle = args.jsonl.open("w", encoding="utf-8") if args.jsonl else sys.stdout
+    try:
+        for record in iter_batch(inputs, profile, options, jobs=args.jobs, backend=args.backend, cache=cache):
+            codes.append(record["exit_code"])
+            handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+            handle.flush()
+    finally:
+        if handle is not sys.stdout:
+            handle.close()
+    return aggregate_exit_codes(codes)
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+from core.cache import AnalysisCache, open_analysis_cache
+from core.config import Profile, compile_profile
+from core.constants import DUPLICATES_KEEP, MATERIALIZE_COPY
+from core.models import AnalysisSummary
+from core.parallel import BACKEND_PROCESS, BACKEND_THREAD, iter_ordered
+from core.sanitizer import analyze, sanitize
+from core.timings import StageTimings
+
+EXIT_OK = 0
+EXIT_ERRORS = 1
+EXIT_WARNINGS = 2
+
+
+@dataclass(slots=True, frozen=True)
+class BatchOptions:
+    """Opzioni comuni a tutti i fascicoli del batch (picklabili per il backend a processi)."""
+
+    sanitize: bool = False
+    dry_run: bool = False
+    output: Path | None = None
+    incremental: bool = False
+    materialization: str = MATERIALIZE_COPY
+    duplicates: str = DUPLICATES_KEEP
+    strict: bool = False
+    timings: bool = False
+    include_summary: bool = False
+    use_cache: bool = False
+    cache_dir: Path | None = None
+    cache_content_keys: bool = False
+
+
+def exit_code_for_statuses(statuses: Iterable[str], strict: bool = False) -> int:
+    seen = set(statuses)
+    if "error" in seen:
+        return EXIT_ERRORS
+    if strict and "warning" in seen:
+        return EXIT_WARNINGS
+    return EXIT_OK
+
+
+def exit_code_for(summary: AnalysisSummary, strict: bool = False) -> int:
+    return exit_code_for_statuses((item.status for item in summary.files), strict)
+
+
+def aggregate_exit_codes(codes: Iterable[int]) -> int:
+    """Come per un singolo fascicolo: gli errori prevalgono sui warning in modalità strict."""
+    seen = set(codes)
+    if EXIT_ERRORS in seen:
+        return EXIT_ERRORS
+    if EXIT_WARNINGS in seen:
+        return EXIT_WARNINGS
+    return EXIT_OK
+
+
+def read_batch_file(path: Path) -> list[Path]:
+    """Un percorso per riga; righe vuote e commenti (#) ignorati. "-" legge da stdin."""
+    text = sys.stdin.read() if str(path) == "-" else path.read_text(encoding="utf-8")
+    return [Path(line.strip()) for line in text.splitlines() if line.strip() and not line.lstrip().startswith("#")]
+
+
+def run_dossier(input_path: Path, profile: Profile | dict, options: BatchOptions, cache: AnalysisCache | None = None) -> dict:
+    """Elabora un fascicolo e restituisce il record JSONL; gli errori diventano un record, non un'eccezione."""
+    own_cache = None
+    if cache is None and options.use_cache:
+        # backend a processi: la connessione sqlite non attraversa il pickling, ogni worker apre la sua
+        cache = own_cache = open_analysis_cache(options.cache_dir, content_keys=options.cache_content_keys)
+    timings = StageTimings() if options.timings else None
+    started = time.perf_counter()
+    record: dict = {"input": str(input_path), "output": None}
+    summary: AnalysisSummary | None = None
+    try:
+        if not input_path.exists():
+            raise FileNotFoundError(f"Input non trovato: {input_path}")
+        if options.sanitize:
+            output_dir, summary = sanitize(
+                input_path,
+                profile,
+                dry_run=options.dry_run,
+                output_mode="custom" if options.output else "sibling",
+                custom_output_dir=options.output,
+                cache=cache,
+                incremental=options.incremental,
+                materialization=options.materialization,
+                duplicates=options.duplicates,
+                timings=timings,
+            )
+            record["output"] = str(output_dir) if output_dir else None
+        else:
+            summary = analyze(input_path, profile, cache=cache, timings=timings)
+    except Exception as exc:
+        record.update({"exit_code": EXIT_ERRORS, "error": f"{type(exc).__name__}: {exc}"})
+    finally:
+        if own_cache is not None:
+            own_cache.close()
+
+    if summary is not None:
+        counts = {"ok": 0, "warning": 0, "error": 0}
+        for item in summary.files:
+            counts[item.status] = counts.get(item.status, 0) + 1
+        record.update({"exit_code": exit_code_for(summary, options.strict), "files": len(summary.files), "status": counts})
+    record["seconds"] = round(time.perf_counter() - started, 3)
+    if summary is not None and options.timings:
+        record["timings"] = summary.stats.get("timings")
+    if summary is not None and options.include_summary:
+        record["summary"] = summary.to_dict()
+    return record
+
+
+def iter_batch(
+    inputs: list[Path],
+    profile: Profile | dict,
+    options: BatchOptions,
+    jobs: int = 1,
+    backend: str = BACKEND_THREAD,
+    cache: AnalysisCache | None = None,
+) -> Iterator[dict]:
+    """Un record per fascicolo, nell'ordine di input; i fascicoli sono distribuiti su un unico pool.
+
+    Ogni fascicolo è elaborato da un solo worker: il parallelismo è tra fascicoli, non dentro il fascicolo.
+    """
+    shared_cache = None if backend == BACKEND_PROCESS else cache
+    yield from iter_ordered(run_dossier, inputs, compile_profile(profile), options, shared_cache, jobs=jobs, backend=backend)
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from core.config import Profile, compile_profile
+from core.constants import CACHE_ENV
+from core.fs_ops import FAST_DIGEST_AVAILABLE, fast_digest
+from core.models import FileAnalysis, Issue
+
+# da incrementare quando cambiano le regole dei validatori: invalida le analisi salvate
+CACHE_SCHEMA = 3
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def default_cache_dir() -> Path:
+    local = os.getenv("LOCALAPPDATA")
+    if local:
+        return Path(local) / "GDLEX-PCT-Validator" / "cache"
+    xdg = os.getenv("XDG_CACHE_HOME")
+    if xdg:
+        return Path(xdg) / "GDLEX-PCT-Validator"
+    return Path.home() / ".cache" / "GDLEX-PCT-Validator"
+
+
+def cache_enabled_by_env() -> bool:
+    return os.getenv(CACHE_ENV, "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def profile_fingerprint(profile: Profile | dict) -> str:
+    raw = f"{CACHE_SCHEMA}:{compile_profile(profile).fingerprint}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def _encode(item: FileAnalysis) -> str:
+    return json.dumps(
+        {
+            "file_type": item.file_type,
+            "status": item.status,
+            "issues": [[issue.level, issue.code, issue.message] for issue in item.issues],
+            "suggested_name": item.suggested_name,
+        },
+        ensure_ascii=False,
+    )
+
+
+def _decode(path: Path, payload: str) -> FileAnalysis:
+    data = json.loads(payload)
+    return FileAnalysis(
+        source=path,
+        file_type=data["file_type"],
+        status=data["status"],
+        issues=[Issue(level, code, message) for level, code, message in data["issues"]],
+        suggested_name=data["suggested_name"],
+    )
+
+
+class AnalysisCache:
+    """Cache persistente delle FileAnalysis, chiave (path, size, mtime_ns, profilo), eviction LRU.
+
+    Con content_keys viene salvata anche un'impronta veloce del contenuto (fs_ops.fast_digest): un file
+    con mtime cambiato ma stessa dimensione e stessa impronta (toccato, ricopiato) resta un hit.
+    Le impronte richiedono xxhash (extra fast-hash): senza, content_keys resta False, perché una lettura
+    completa in più per ogni file salvato costerebbe quanto rifare l'analisi.
+    """
+
+    def __init__(self, directory: Path | None = None, max_bytes: int = DEFAULT_MAX_BYTES, content_keys: bool = False):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.content_keys = content_keys and FAST_DIGEST_AVAILABLE
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.directory / "analysis.sqlite3", check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS analysis ("
+            " path TEXT NOT NULL, profile TEXT NOT NULL, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,"
+            " payload TEXT NOT NULL, last_used REAL NOT NULL, content TEXT, PRIMARY KEY (path, profile))"
+        )
+        if "content" not in {row[1] for row in self._db.execute("PRAGMA table_info(analysis)")}:
+            # database creato da una versione precedente
+            self._db.execute("ALTER TABLE analysis ADD COLUMN content TEXT")
+        self._db.execute("CREATE INDEX IF NOT EXISTS analysis_lru ON analysis (last_used)")
+        self._db.commit()
+
+    @staticmethod
+    def key_for(path: Path) -> tuple[str, int, int] | None:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return os.path.abspath(path), stat.st_size, stat.st_mtime_ns
+
+    def get(self, path: Path, fingerprint: str) -> FileAnalysis | None:
+        key = self.key_for(path)
+        if key is None:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT payload, size, mtime_ns, content FROM analysis WHERE path = ? AND profile = ?", (key[0], fingerprint)
+            ).fetchone()
+        if row is None or not self._row_matches(path, key, row[1], row[2], row[3]):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+            self._db.execute(
+                "UPDATE analysis SET last_used = ?, mtime_ns = ? WHERE path = ? AND profile = ?", (time.time(), key[2], key[0], fingerprint)
+            )
+        return _decode(path, row[0])
+
+    def _row_matches(self, path: Path, key: tuple[str, int, int], size: int, mtime_ns: int, content: str | None) -> bool:
+        if (size, mtime_ns) == key[1:]:
+            return True
+        if not self.content_keys or content is None or size != key[1]:
+            return False
+        try:
+            return fast_digest(path) == content
+        except OSError:
+            return False
+
+    def put(self, item: FileAnalysis, fingerprint: str) -> None:
+        key = self.key_for(item.source)
+        if key is None:
+            return
+        content = None
+        if self.content_keys:
+            try:
+                content = fast_digest(item.source)
+            except OSError:
+                pass
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO analysis (path, profile, size, mtime_ns, payload, last_used, content) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key[0], fingerprint, key[1], key[2], _encode(item), time.time(), content),
+            )
+
+    def flush(self) -> None:
+        with self._lock:
+            self._evict()
+            self._db.commit()
+
+    def _evict(self) -> None:
+        total = self._db.execute("SELECT COALESCE(SUM(LENGTH(payload)), 0) FROM analysis").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # si libera un margine del 10% per non ripetere l'eviction a ogni run
+        target = int(self.max_bytes * 0.9)
+        doomed: list[tuple[str, str]] = []
+        for path, profile, length in self._db.execute("SELECT path, profile, LENGTH(payload) FROM analysis ORDER BY last_used"):
+            if total <= target:
+                break
+            doomed.append((path, profile))
+            total -= length
+        self._db.executemany("DELETE FROM analysis WHERE path = ? AND profile = ?", doomed)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM analysis").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM analysis")
+            self._db.commit()
+            self._db.execute("VACUUM")
+
+    def close(self) -> None:
+        self.flush()
+        self._db.close()
+
+    def __enter__(self) -> AnalysisCache:
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+
+def open_analysis_cache(
+    directory: Path | None = None, max_bytes: int = DEFAULT_MAX_BYTES, content_keys: bool = False
+) -> AnalysisCache | None:
+    """Cache non disponibile (disco in sola lettura, DB corrotto): si prosegue senza."""
+    try:
+        return AnalysisCache(directory, max_bytes=max_bytes, content_keys=content_keys)
+    except (OSError, sqlite3.Error):
+        return None
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import os
+from dataclasses import dataclass, field
 from pathlib import Path
 
 try:
@@ -71,9 +73,129 @@ def load_config(config_path: Path | None = None) -> dict:
     return data
 
 
-def resolve_profile(config: dict, profile_name: str) -> dict:
+DEFAULT_MAX_FILENAME_LENGTH = 80
+DEFAULT_ZIP_MAX_DEPTH = 3
+DEFAULT_ZIP_SPOOL_LIMIT = 64 * 1024 * 1024
+DEFAULT_ZIP_MAX_ENTRIES = 1_000_000  # i fascicoli esportati dai gestionali superano le 10.000 entry
+DEFAULT_ZIP_MAX_TOTAL_BYTES = 4 * 1024 * 1024 * 1024
+DEFAULT_ZIP_MAX_RATIO = 100.0
+
+
+@dataclass(frozen=True, slots=True)
+class ZipLimits:
+    """Limiti di sicurezza degli archivi (ZIP bomb); entry e byte sono cumulati su tutti gli ZIP annidati."""
+
+    max_depth: int = DEFAULT_ZIP_MAX_DEPTH
+    max_inner_bytes: int = DEFAULT_ZIP_SPOOL_LIMIT
+    max_entries: int = DEFAULT_ZIP_MAX_ENTRIES
+    max_total_bytes: int = DEFAULT_ZIP_MAX_TOTAL_BYTES
+    max_ratio: float = DEFAULT_ZIP_MAX_RATIO
+
+
+ZIP_STORE_LEVEL = 0
+DEFAULT_ZIP_DEFLATE_LEVEL = 6
+# formati già compressi: deflate costa CPU senza ridurre la dimensione
+DEFAULT_ZIP_LEVELS: dict[str, int] = {
+    **dict.fromkeys(("jpg", "jpeg", "png", "gif", "mp3", "mp4", "mov", "avi", "zip", "p7m"), ZIP_STORE_LEVEL),
+    "pdf": 1,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class ZipCompression:
+    """Compressione per estensione nella ricostruzione degli ZIP: 0 = store, 1-9 = livello deflate."""
+
+    default_level: int = DEFAULT_ZIP_DEFLATE_LEVEL
+    levels: tuple[tuple[str, int], ...] = tuple(sorted(DEFAULT_ZIP_LEVELS.items()))
+
+    def policy(self) -> dict[str, int]:
+        return dict(self.levels)
+
+
+def _compression_level(value: str | int) -> int:
+    if value == "store":
+        return ZIP_STORE_LEVEL
+    if value == "deflate":
+        return DEFAULT_ZIP_DEFLATE_LEVEL
+    level = int(value)
+    if not ZIP_STORE_LEVEL <= level <= 9:
+        raise ValueError(f"livello di compressione non valido: {value}")
+    return level
+
+
+def _compile_zip_compression(section: dict) -> ZipCompression:
+    """section: {"default": 6, "jpg": "store", "xml": 9}; le estensioni indicate sostituiscono i default."""
+    levels = dict(DEFAULT_ZIP_LEVELS)
+    default_level = DEFAULT_ZIP_DEFLATE_LEVEL
+    for key, value in section.items():
+        if key == "default":
+            default_level = _compression_level(value)
+        else:
+            levels[str(key).lower().lstrip(".")] = _compression_level(value)
+    return ZipCompression(default_level=default_level, levels=tuple(sorted(levels.items())))
+
+
+@dataclass(frozen=True, slots=True)
+class Profile:
+    """Profilo compilato una volta: insiemi e limiti pronti, immutabile, hashable tramite il contenuto.
+
+    data conserva la configurazione originale (accessibile anche come profile["..."] / profile.get).
+    """
+
+    name: str
+    allowed_formats: frozenset[str]
+    warning_formats: frozenset[str]
+    max_filename_length: int
+    fingerprint: str
+    zip_limits: ZipLimits = ZipLimits()
+    zip_compression: ZipCompression = ZipCompression()
+    data: dict = field(default_factory=dict, compare=False, hash=False, repr=False)
+
+    def accepts(self, ext: str) -> bool:
+        return ext in self.allowed_formats or ext in self.warning_formats
+
+    def __getitem__(self, key: str):
+        return self.data[key]
+
+    def get(self, key: str, default=None):
+        return self.data.get(key, default)
+
+
+def _fingerprint(data: dict) -> str:
+    raw = json.dumps(data, sort_keys=True, ensure_ascii=True, default=sorted)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def compile_profile(profile: Profile | dict, name: str = "") -> Profile:
+    """Profile già compilati sono restituiti così come sono; i dict (API storica) vengono compilati."""
+    if isinstance(profile, Profile):
+        return profile
+    try:
+        zip_limits = profile.get("zip", {})
+        return Profile(
+            name=name,
+            allowed_formats=frozenset(profile["allowed_formats"]),
+            warning_formats=frozenset(profile.get("warning_formats", [])),
+            max_filename_length=int(profile.get("filename", {}).get("max_length", DEFAULT_MAX_FILENAME_LENGTH)),
+            fingerprint=_fingerprint(profile),
+            zip_limits=ZipLimits(
+                max_depth=int(zip_limits.get("max_depth", DEFAULT_ZIP_MAX_DEPTH)),
+                max_inner_bytes=int(zip_limits.get("max_inner_bytes", DEFAULT_ZIP_SPOOL_LIMIT)),
+                max_entries=int(zip_limits.get("max_entries", DEFAULT_ZIP_MAX_ENTRIES)),
+                max_total_bytes=int(zip_limits.get("max_total_bytes", DEFAULT_ZIP_MAX_TOTAL_BYTES)),
+                max_ratio=float(zip_limits.get("max_ratio", DEFAULT_ZIP_MAX_RATIO)),
+            ),
+            zip_compression=_compile_zip_compression(zip_limits.get("compression", {})),
+            data=profile,
+        )
+    except (KeyError, TypeError, ValueError, AttributeError) as exc:
+        raise ConfigError(f"Profilo '{name}' non valido: {exc}") from exc
+
+
+def resolve_profile(config: dict, profile_name: str) -> Profile:
     try:
-        return config["profiles"][profile_name]
+        data = config["profiles"][profile_name]
     except KeyError as exc:
         available = ", ".join(sorted(config.get("profiles", {}).keys()))
         raise ConfigError(f"Profilo '{profile_name}' non trovato. Disponibili: {available}") from exc
+    return compile_profile(data, profile_name)
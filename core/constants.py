@@ -0,0 +1,33 @@
+"""Valori condivisi tra la CLI e i moduli core, senza import: cli.main li usa per argparse senza caricare
+sanitizer, cache (sqlite3), watch o server."""
+
+MATERIALIZE_COPY = "copy"
+MATERIALIZE_AUTO = "auto"
+MATERIALIZE_REFLINK = "reflink"
+MATERIALIZE_COPY_FILE_RANGE = "copy_file_range"
+MATERIALIZE_HARDLINK = "hardlink"
+MATERIALIZE_STRATEGIES = (
+    MATERIALIZE_COPY,
+    MATERIALIZE_AUTO,
+    MATERIALIZE_REFLINK,
+    MATERIALIZE_COPY_FILE_RANGE,
+    MATERIALIZE_HARDLINK,
+)
+
+DUPLICATES_KEEP = "keep"
+DUPLICATES_EXCLUDE = "exclude"
+DUPLICATES_HARDLINK = "hardlink"
+DUPLICATE_POLICIES = (DUPLICATES_KEEP, DUPLICATES_EXCLUDE, DUPLICATES_HARDLINK)
+
+CACHE_ENV = "GDLEX_CACHE"
+
+WATCH_AUTO = "auto"
+WATCH_INOTIFY = "inotify"
+WATCH_POLL = "poll"
+WATCH_BACKENDS = (WATCH_AUTO, WATCH_INOTIFY, WATCH_POLL)
+DEFAULT_DEBOUNCE = 0.5
+DEFAULT_POLL_INTERVAL = 1.0
+
+SERVE_DEFAULT_HOST = "127.0.0.1"
+SERVE_DEFAULT_PORT = 8765
+SERVE_DEFAULT_MAX_CONCURRENT = 4
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import hashlib
+import zipfile
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+from core.parallel import BACKEND_THREAD, iter_ordered
+
+HASH_CHUNK = 1024 * 1024
+
+
+@dataclass(slots=True)
+class _Entry:
+    member: str
+    digest: str | None = None
+    crc: int | None = None  # CRC-32 della central directory, solo per le entry degli ZIP
+    archive: Path | None = None
+    name: str = ""
+
+
+@dataclass(frozen=True, slots=True)
+class DuplicateGroup:
+    """Contenuti identici; members nell'ordine di inserimento."""
+
+    sha256: str
+    size: int
+    members: tuple[str, ...]
+
+    @property
+    def wasted_bytes(self) -> int:
+        return self.size * (len(self.members) - 1)
+
+    def to_dict(self) -> dict:
+        return {"sha256": self.sha256, "size": self.size, "members": list(self.members)}
+
+
+class DuplicateIndex:
+    """Raggruppa contenuti identici: prima per dimensione, poi per SHA-256.
+
+    Per le entry degli ZIP l'hash è calcolato solo se la dimensione coincide con quella di un altro
+    contenuto e il CRC-32 della central directory non lo esclude; ogni archivio è aperto una volta sola.
+    """
+
+    def __init__(self) -> None:
+        self._by_size: dict[int, list[_Entry]] = {}
+
+    def add(self, member: str, size: int, digest: str) -> None:
+        self._by_size.setdefault(size, []).append(_Entry(member, digest=digest))
+
+    def add_zip_member(self, member: str, size: int, crc: int, archive: Path, name: str) -> None:
+        self._by_size.setdefault(size, []).append(_Entry(member, crc=crc, archive=archive, name=name))
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self._by_size.values())
+
+    def _pending_by_archive(self, buckets: list[list[_Entry]]) -> dict[Path, list[_Entry]]:
+        pending: dict[Path, list[_Entry]] = {}
+        for bucket in buckets:
+            # un file di primo livello non ha CRC noto: può coincidere con qualsiasi entry della stessa dimensione
+            any_crc = any(entry.crc is None for entry in bucket)
+            crc_counts = Counter(entry.crc for entry in bucket if entry.crc is not None)
+            for entry in bucket:
+                if entry.digest is None and (any_crc or crc_counts[entry.crc] > 1):
+                    pending.setdefault(entry.archive, []).append(entry)
+        return pending
+
+    def groups(self, jobs: int | None = 1) -> list[DuplicateGroup]:
+        """jobs: archivi elaborati in parallelo per gli hash ancora da calcolare (0 = uno per CPU)."""
+        buckets = [(size, bucket) for size, bucket in self._by_size.items() if len(bucket) > 1]
+        pending = list(self._pending_by_archive([bucket for _, bucket in buckets]).items())
+        computed = iter_ordered(_hash_archive_entries, pending, jobs=jobs, backend=BACKEND_THREAD)
+        for (_, entries), digests in zip(pending, computed, strict=True):
+            for entry, digest in zip(entries, digests, strict=True):
+                entry.digest = digest
+        found: list[DuplicateGroup] = []
+        for size, bucket in buckets:
+            by_digest: dict[str, list[str]] = {}
+            for entry in bucket:
+                if entry.digest is not None:
+                    by_digest.setdefault(entry.digest, []).append(entry.member)
+            found.extend(DuplicateGroup(sha, size, tuple(members)) for sha, members in by_digest.items() if len(members) > 1)
+        return found
+
+
+def _hash_archive_entries(task: tuple[Path, list[_Entry]]) -> list[str]:
+    archive, entries = task
+    return hash_zip_members(archive, [entry.name for entry in entries])
+
+
+def hash_zip_members(path: Path, names: list[str]) -> list[str]:
+    """SHA-256 delle entry indicate, con una sola apertura (e lettura della central directory) dell'archivio."""
+    digests: list[str] = []
+    with zipfile.ZipFile(path) as zf:
+        for name in names:
+            digest = hashlib.sha256()
+            with zf.open(name) as member:
+                while chunk := member.read(HASH_CHUNK):
+                    digest.update(chunk)
+            digests.append(digest.hexdigest())
+    return digests
+
+
+def zip_members(path: Path) -> list[tuple[str, int, int]]:
+    """(nome entry, dimensione, CRC-32) delle entry regolari di uno ZIP: solo la central directory viene letta."""
+    with zipfile.ZipFile(path) as zf:
+        return [(info.filename, info.file_size, info.CRC) for info in zf.infolist() if not info.is_dir()]
@@ -1,17 +1,173 @@
 from __future__ import annotations
 
 import hashlib
+import os
 import shutil
+from collections.abc import Callable, Iterable
 from datetime import datetime
 from pathlib import Path
 
+from core.constants import (
+    MATERIALIZE_AUTO,
+    MATERIALIZE_COPY,
+    MATERIALIZE_COPY_FILE_RANGE,
+    MATERIALIZE_HARDLINK,
+    MATERIALIZE_REFLINK,
+    MATERIALIZE_STRATEGIES,
+)
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+try:
+    import xxhash  # type: ignore
+except ImportError:  # pragma: no cover - dipendenza opzionale (extra "fast-hash")
+    xxhash = None
+
+FAST_DIGEST_AVAILABLE = xxhash is not None
+
+COPY_CHUNK = 1024 * 1024
+
+FICLONE = 0x40049409  # ioctl Linux per reflink (btrfs, XFS, ...)
+
+# ordine di fallback: ogni strategia prova sé stessa e poi le successive, fino alla copia
+_MATERIALIZE_CHAIN = (MATERIALIZE_HARDLINK, MATERIALIZE_REFLINK, MATERIALIZE_COPY_FILE_RANGE)
+
 
 def sha256_file(path: Path) -> str:
+    """SHA-256 con hashlib.file_digest: buffer riusato, niente bytes allocati per chunk, GIL rilasciato."""
+    with path.open("rb") as handle:
+        return hashlib.file_digest(handle, "sha256").hexdigest()
+
+
+def fast_digest(path: Path) -> str:
+    """Impronta del contenuto: xxh3 a 128 bit con l'extra fast-hash, altrimenti SHA-256.
+
+    Senza xxhash non c'è un'alternativa più rapida: con le istruzioni SHA delle CPU recenti SHA-256
+    supera BLAKE2b, e un checksum corto (CRC-32) non basta a riconoscere un file. Vedi FAST_DIGEST_AVAILABLE.
+    """
+    if xxhash is None:
+        return f"sha256:{sha256_file(path)}"
+    with path.open("rb", buffering=0) as handle:
+        return f"xxh3:{hashlib.file_digest(handle, xxhash.xxh3_128).hexdigest()}"
+
+
+def copy_with_digest(src: Path, dst: Path, consumers: Iterable[Callable[[bytes], None]] = ()) -> tuple[str, int]:
+    """Copia src in dst con una sola lettura, calcolando lo SHA-256 e passando ogni chunk ai consumer.
+
+    Restituisce (sha256, byte copiati); i metadati sono preservati come con shutil.copy2.
+    Senza consumer il buffer di lettura è riusato (readinto) invece di allocare un bytes per chunk.
+    """
     digest = hashlib.sha256()
+    sinks = list(consumers)
+    total = 0
+    with src.open("rb") as source, dst.open("wb") as target:
+        if sinks:
+            while chunk := source.read(COPY_CHUNK):
+                target.write(chunk)
+                digest.update(chunk)
+                for sink in sinks:
+                    sink(chunk)
+                total += len(chunk)
+        else:
+            buffer = bytearray(COPY_CHUNK)
+            view = memoryview(buffer)
+            while read := source.readinto(buffer):
+                target.write(view[:read])
+                digest.update(view[:read])
+                total += read
+    shutil.copystat(src, dst)
+    return digest.hexdigest(), total
+
+
+def digest_file(path: Path, consumers: Iterable[Callable[[bytes], None]] = ()) -> tuple[str, int]:
+    if not consumers:
+        return sha256_file(path), path.stat().st_size
+    digest = hashlib.sha256()
+    sinks = list(consumers)
+    total = 0
     with path.open("rb") as handle:
-        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+        while chunk := handle.read(COPY_CHUNK):
             digest.update(chunk)
-    return digest.hexdigest()
+            for sink in sinks:
+                sink(chunk)
+            total += len(chunk)
+    return digest.hexdigest(), total
+
+
+def _try_hardlink(src: Path, dst: Path) -> bool:
+    try:
+        os.link(src, dst)
+    except (OSError, NotImplementedError):
+        return False
+    return True
+
+
+def _try_reflink(src: Path, dst: Path) -> bool:
+    if fcntl is None:
+        return False
+    try:
+        with src.open("rb") as source, dst.open("wb") as target:
+            fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+    except OSError:
+        return False
+    shutil.copystat(src, dst)
+    return True
+
+
+def _try_copy_file_range(src: Path, dst: Path) -> bool:
+    copy_range = getattr(os, "copy_file_range", None)
+    if copy_range is None:
+        return False
+    try:
+        with src.open("rb") as source, dst.open("wb") as target:
+            size = os.fstat(source.fileno()).st_size
+            copied = 0
+            while copied < size:
+                step = copy_range(source.fileno(), target.fileno(), min(size - copied, 1 << 30))
+                if step == 0:
+                    break
+                copied += step
+    except OSError:
+        return False
+    if copied != size:
+        return False
+    shutil.copystat(src, dst)
+    return True
+
+
+_MATERIALIZERS: dict[str, Callable[[Path, Path], bool]] = {
+    MATERIALIZE_HARDLINK: _try_hardlink,
+    MATERIALIZE_REFLINK: _try_reflink,
+    MATERIALIZE_COPY_FILE_RANGE: _try_copy_file_range,
+}
+
+
+def materialize(
+    src: Path,
+    dst: Path,
+    strategy: str = MATERIALIZE_COPY,
+    consumers: Iterable[Callable[[bytes], None]] = (),
+) -> tuple[str, int, str]:
+    """Crea dst come copia di src con la strategia richiesta, ripiegando sulle successive se non supportata.
+
+    Restituisce (sha256, byte, strategia usata). Con reflink/copy_file_range/hardlink i dati non passano
+    in user space per la scrittura; il sorgente viene comunque letto una volta per hash e consumer.
+    dst non deve esistere: riscriverlo in place potrebbe alterare il sorgente se è un suo hardlink.
+    """
+    if strategy not in MATERIALIZE_STRATEGIES:
+        raise ValueError(f"Strategia non supportata: {strategy} (disponibili: {', '.join(MATERIALIZE_STRATEGIES)})")
+    start = MATERIALIZE_REFLINK if strategy == MATERIALIZE_AUTO else strategy
+    chain = _MATERIALIZE_CHAIN[_MATERIALIZE_CHAIN.index(start) :] if start in _MATERIALIZE_CHAIN else ()
+
+    for candidate in chain:
+        if _MATERIALIZERS[candidate](src, dst):
+            digest, total = digest_file(src, consumers)
+            return digest, total, candidate
+    digest, total = copy_with_digest(src, dst, consumers)
+    return digest, total, MATERIALIZE_COPY
 
 
 def create_output_folder(source_root: Path) -> Path:
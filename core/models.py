@@ -22,31 +22,35 @@ class FileAnalysis:
     correction_outcome: str = "NON ESEGUITA"
     correction_actions: list[str] = field(default_factory=list)
     output_path: Path | None = None
+    output_strategy: str | None = None  # copy | reflink | copy_file_range | hardlink | zip_rebuild
+
+    def to_dict(self) -> dict:
+        return {
+            "source": str(self.source),
+            "file_type": self.file_type,
+            "status": self.status,
+            "issues": [{"level": issue.level, "code": issue.code, "message": issue.message} for issue in self.issues],
+            "suggested_name": self.suggested_name,
+            "sha256": self.sha256,
+            "correction_outcome": self.correction_outcome,
+            "correction_actions": self.correction_actions,
+            "output_path": str(self.output_path) if self.output_path else None,
+            "output_strategy": self.output_strategy,
+        }
 
 
 @dataclass(slots=True)
 class AnalysisSummary:
     files: list[FileAnalysis]
     excluded_paths: list[tuple[str, str]] = field(default_factory=list)
+    stats: dict = field(default_factory=dict)
 
     @property
     def has_errors(self) -> bool:
         return any(f.status == "error" for f in self.files)
 
     def to_dict(self) -> dict:
-        payload: dict[str, list[dict]] = {"files": []}
-        for item in self.files:
-            payload["files"].append(
-                {
-                    "source": str(item.source),
-                    "file_type": item.file_type,
-                    "status": item.status,
-                    "issues": [{"level": issue.level, "code": issue.code, "message": issue.message} for issue in item.issues],
-                    "suggested_name": item.suggested_name,
-                    "sha256": item.sha256,
-                    "correction_outcome": item.correction_outcome,
-                    "correction_actions": item.correction_actions,
-                    "output_path": str(item.output_path) if item.output_path else None,
-                }
-            )
+        payload: dict[str, list[dict]] = {"files": [item.to_dict() for item in self.files]}
+        if self.stats:
+            payload["stats"] = self.stats
         return payload
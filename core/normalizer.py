@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import re
 import unicodedata
+from collections.abc import Iterable
+from functools import lru_cache
 from pathlib import Path
 
 ACCENT_MAP = str.maketrans(
@@ -22,6 +24,12 @@ ACCENT_MAP = str.maketrans(
 )
 
 VALID_FILENAME_RE = re.compile(r"^[a-zA-Z0-9._-]+$")
+FORBIDDEN_CHARS_RE = re.compile(r"[^a-zA-Z0-9._-]")
+UNDERSCORE_RUN_RE = re.compile(r"_+")
+EDGE_CHARS = "._-"
+
+# nomi distinti ricordati: un fascicolo grande ne ha qualche migliaio, ZIP interni compresi
+NORMALIZE_CACHE_SIZE = 16384
 
 
 def strip_accents(text: str) -> str:
@@ -30,14 +38,23 @@ def strip_accents(text: str) -> str:
     return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
 
 
+def _clean_stem(stem: str) -> str:
+    if stem.isascii():
+        # percorso veloce: nome già conforme, niente NFKD né sostituzioni
+        if VALID_FILENAME_RE.match(stem) and "__" not in stem and stem[0] not in EDGE_CHARS and stem[-1] not in EDGE_CHARS:
+            return stem
+        cleaned = stem
+    else:
+        cleaned = strip_accents(stem)
+    cleaned = FORBIDDEN_CHARS_RE.sub("_", cleaned)
+    return UNDERSCORE_RUN_RE.sub("_", cleaned).strip(EDGE_CHARS) or "file"
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def sanitize_filename(name: str, max_len: int = 80) -> str:
     path = Path(name)
     extension = path.suffix
-    stem = path.stem
-    cleaned = strip_accents(stem)
-    cleaned = cleaned.replace(" ", "_")
-    cleaned = re.sub(r"[^a-zA-Z0-9._-]", "_", cleaned)
-    cleaned = re.sub(r"_+", "_", cleaned).strip("._-") or "file"
+    cleaned = _clean_stem(path.stem)
 
     budget = max_len - len(extension)
     if budget < 1:
@@ -46,6 +63,18 @@ def sanitize_filename(name: str, max_len: int = 80) -> str:
     return f"{cleaned}{extension}"
 
 
+def normalize_many(names: Iterable[str], max_len: int = 80) -> list[str]:
+    """sanitize_filename su un lotto di nomi, nello stesso ordine: ogni nome distinto è calcolato una volta."""
+    done: dict[str, str] = {}
+    result: list[str] = []
+    for name in names:
+        normalized = done.get(name)
+        if normalized is None:
+            normalized = done[name] = sanitize_filename(name, max_len)
+        result.append(normalized)
+    return result
+
+
 def is_filename_valid(name: str, max_len: int = 80) -> bool:
     if len(name) > max_len:
         return False
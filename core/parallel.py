@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import os
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import TypeVar
+
+BACKEND_THREAD = "thread"
+BACKEND_PROCESS = "process"
+BACKENDS = (BACKEND_THREAD, BACKEND_PROCESS)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def resolve_jobs(jobs: int | None) -> int:
+    """0 o None = un worker per CPU disponibile."""
+    if not jobs or jobs < 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def create_executor(jobs: int | None, backend: str = BACKEND_THREAD) -> Executor:
+    workers = resolve_jobs(jobs)
+    if backend == BACKEND_THREAD:
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gdlex")
+    if backend == BACKEND_PROCESS:
+        # import differito: multiprocessing pesa sull'avvio della CLI anche quando si usano i thread
+        from concurrent.futures import ProcessPoolExecutor
+
+        return ProcessPoolExecutor(max_workers=workers)
+    raise ValueError(f"Backend non supportato: {backend} (disponibili: {', '.join(BACKENDS)})")
+
+
+def _chunksize(total: int, workers: int) -> int:
+    # lotti abbastanza grandi da ammortizzare il pickling verso i processi worker
+    return max(1, total // (workers * 4))
+
+
+def iter_ordered(
+    func: Callable[..., R],
+    items: Iterable[T],
+    *args,
+    jobs: int | None = 1,
+    backend: str = BACKEND_THREAD,
+    executor: Executor | None = None,
+) -> Iterator[R]:
+    """Applica func a ogni elemento restituendo i risultati nell'ordine di input, appena disponibili.
+
+    Con jobs=1 e senza executor esterno il lavoro resta nel thread chiamante. Chiudere il generatore
+    prima della fine annulla i task non ancora avviati.
+    """
+    values = list(items)
+    if executor is None and (resolve_jobs(jobs) == 1 or len(values) <= 1):
+        for value in values:
+            yield func(value, *args)
+        return
+
+    extra = [[arg] * len(values) for arg in args]
+    if executor is not None:
+        workers = getattr(executor, "_max_workers", 1)
+        yield from executor.map(func, values, *extra, chunksize=_chunksize(len(values), workers))
+        return
+
+    workers = resolve_jobs(jobs)
+    pool = create_executor(workers, backend)
+    try:
+        yield from pool.map(func, values, *extra, chunksize=_chunksize(len(values), workers))
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def map_ordered(
+    func: Callable[..., R],
+    items: Iterable[T],
+    *args,
+    jobs: int | None = 1,
+    backend: str = BACKEND_THREAD,
+    executor: Executor | None = None,
+) -> list[R]:
+    return list(iter_ordered(func, items, *args, jobs=jobs, backend=backend, executor=executor))
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from core.models import AnalysisSummary
+
+STAGE_ANALYZE = "analyze"
+STAGE_SANITIZE = "sanitize"
+
+
+class OperationCancelled(RuntimeError):
+    """Operazione interrotta dall'utente tramite CancelToken.
+
+    Per sanitize() porta con sé la cartella di output e il riepilogo parziale già scritti nei report.
+    """
+
+    def __init__(self, message: str = "Operazione annullata", output_dir: Path | None = None, summary: AnalysisSummary | None = None):
+        super().__init__(message)
+        self.output_dir = output_dir
+        self.summary = summary
+
+
+class CancelToken:
+    """Richiesta di annullamento condivisa tra GUI e thread worker."""
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise OperationCancelled("Operazione annullata")
+
+
+@dataclass(slots=True)
+class ProgressEvent:
+    stage: str  # analyze | sanitize
+    done: int
+    total: int
+    path: Path | None = None
+    bytes_done: int = 0
+
+
+ProgressCallback = Callable[[ProgressEvent], None]
+
+
+def check_cancel(cancel: CancelToken | None) -> None:
+    if cancel is not None:
+        cancel.raise_if_cancelled()
+
+
+class ProgressMeter:
+    """Throughput ed ETA per una fase, a partire dagli eventi di avanzamento."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._stage: str | None = None
+        self._started = 0.0
+
+    def describe(self, event: ProgressEvent) -> str:
+        now = self._clock()
+        if event.stage != self._stage:
+            self._stage = event.stage
+            self._started = now
+        elapsed = max(now - self._started, 1e-9)
+        label = "Analisi" if event.stage == STAGE_ANALYZE else "Correzione"
+        parts = [f"{label}: {event.done}/{event.total} file"]
+        if event.done:
+            parts.append(f"{event.done / elapsed:.1f} file/s")
+            if event.bytes_done:
+                parts.append(f"{event.bytes_done / elapsed / (1024 * 1024):.1f} MB/s")
+            remaining = (event.total - event.done) * elapsed / event.done
+            parts.append(f"ETA {format_duration(remaining)}")
+        return " | ".join(parts)
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    minutes, secs = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    if minutes:
+        return f"{minutes}m{secs:02d}s"
+    return f"{secs}s"
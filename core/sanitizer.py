@@ -2,17 +2,41 @@ from __future__ import annotations
 
 import csv
 import json
+import os
 import shutil
-import tempfile
+import struct
 import zipfile
+import zlib
+from collections import deque
+from collections.abc import Callable, Generator, Iterable, Iterator
+from concurrent.futures import Future
+from contextlib import closing
+from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
 
-from core.fs_ops import sha256_file
+from core.cache import AnalysisCache, profile_fingerprint
+from core.config import ZIP_STORE_LEVEL, Profile, compile_profile
+from core.constants import DUPLICATE_POLICIES, DUPLICATES_HARDLINK, DUPLICATES_KEEP, MATERIALIZE_COPY, MATERIALIZE_HARDLINK
+from core.duplicates import DuplicateGroup, DuplicateIndex, zip_members
+from core.fs_ops import materialize, sha256_file
 from core.models import AnalysisSummary, FileAnalysis, Issue
-from core.normalizer import sanitize_filename
+from core.normalizer import normalize_many
+from core.parallel import BACKEND_THREAD, create_executor, iter_ordered, resolve_jobs
+from core.progress import STAGE_ANALYZE, STAGE_SANITIZE, CancelToken, OperationCancelled, ProgressCallback, ProgressEvent, check_cancel
 from core.reporting import build_technical_report
-from core.smart_namer import ensure_unique, smart_rename
-from core.validators import validate_path
+from core.smart_namer import NameAllocator, PlannedName, ensure_unique, plan_names
+from core.timings import (
+    NULL_TIMINGS,
+    STAGE_COPY,
+    STAGE_HASH,
+    STAGE_REPORT,
+    STAGE_SCAN,
+    STAGE_VALIDATE,
+    STAGE_ZIP_REBUILD,
+    StageTimings,
+)
+from core.validators import PdfStreamScanner, ZipGuard, ZipLimitExceeded, detect_status, validate_path
 
 OUTCOME_NOT_RUN = "NON ESEGUITA"
 OUTCOME_OK = "OK"
@@ -24,15 +48,55 @@ OUTCOME_ERROR = "ERRORE"
 TECHNICAL_FILENAMES = {"report.json", "report.txt", "manifest.csv"}
 
 
-def _is_ignored_path(path: Path) -> bool:
-    lower_parts = [part.lower() for part in path.parts]
-    if ".gdlex" in lower_parts:
-        return True
-    if any(part.endswith("_conforme") or part.endswith("_sanitized") for part in lower_parts):
-        return True
-    if path.name.lower() in TECHNICAL_FILENAMES:
-        return True
-    return False
+EXCLUDED_REASON = "technical_or_generated"
+
+
+def _is_ignored_part(part: str) -> bool:
+    lower = part.lower()
+    return lower == ".gdlex" or lower.endswith("_conforme") or lower.endswith("_sanitized")
+
+
+def _sorted_entries(directory: str) -> list[os.DirEntry]:
+    try:
+        with os.scandir(directory) as entries:
+            return sorted(entries, key=lambda entry: entry.name)
+    except (PermissionError, FileNotFoundError, NotADirectoryError):
+        return []
+
+
+def scan_input_tree(input_root: Path) -> Iterator[tuple[Path, bool]]:
+    """Visita la cartella in ordine di path restituendo (path, escluso).
+
+    Le cartelle tecniche/generate (.gdlex, *_conforme, *_sanitized) non vengono attraversate:
+    compaiono una sola volta come percorso escluso. I DirEntry evitano una stat per file.
+    """
+    if any(_is_ignored_part(part) for part in input_root.parts):
+        yield input_root, True
+        return
+
+    stack = [iter(_sorted_entries(str(input_root)))]
+    while stack:
+        entry = next(stack[-1], None)
+        if entry is None:
+            stack.pop()
+            continue
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                if _is_ignored_part(entry.name):
+                    yield Path(entry.path), True
+                else:
+                    stack.append(iter(_sorted_entries(entry.path)))
+                continue
+            if not entry.is_file():
+                continue
+        except OSError:
+            continue
+        yield Path(entry.path), _is_ignored_part(entry.name) or entry.name.lower() in TECHNICAL_FILENAMES
+
+
+def is_ignored_input(path: Path) -> bool:
+    """Stesso criterio di scan_input_tree applicato a un singolo percorso (watch, eventi del filesystem)."""
+    return any(_is_ignored_part(part) for part in path.parts) or path.name.lower() in TECHNICAL_FILENAMES
 
 
 def iter_input_files(input_root: Path) -> tuple[list[Path], list[tuple[str, str]]]:
@@ -42,25 +106,153 @@ def iter_input_files(input_root: Path) -> tuple[list[Path], list[tuple[str, str]
 
     files: list[Path] = []
     excluded: list[tuple[str, str]] = []
-    for path in sorted(input_root.rglob("*")):
-        if not path.is_file():
-            continue
-        if _is_ignored_path(path):
-            excluded.append((str(path), "technical_or_generated"))
-            continue
-        files.append(path)
+    for path, ignored in scan_input_tree(input_root):
+        if ignored:
+            excluded.append((str(path), EXCLUDED_REASON))
+        else:
+            files.append(path)
     return files, excluded
 
 
-def analyze(input_root: Path, profile: dict) -> AnalysisSummary:
-    paths, excluded = iter_input_files(input_root)
-    files = [validate_path(path, profile) for path in paths]
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+def _scan(input_root: Path, timings: StageTimings) -> tuple[list[Path], list[tuple[str, str]]]:
+    with timings.stage(STAGE_SCAN) as span:
+        paths, excluded = iter_input_files(input_root)
+        span.count = len(paths) + len(excluded)
+    return paths, excluded
+
+
+def _validate_shallow(path: Path, profile: Profile) -> FileAnalysis:
+    return validate_path(path, profile, content=False)
+
+
+def _iter_analyze_paths(
+    paths: list[Path],
+    profile: Profile,
+    jobs: int,
+    backend: str,
+    cache: AnalysisCache | None,
+    content: bool = True,
+) -> Iterator[FileAnalysis]:
+    if cache is None:
+        validator = validate_path if content else _validate_shallow
+        yield from iter_ordered(validator, paths, profile, jobs=jobs, backend=backend)
+        return
+
+    fingerprint = profile_fingerprint(profile)
+    cached = [cache.get(path, fingerprint) for path in paths]
+    missing = [path for path, item in zip(paths, cached, strict=True) if item is None]
+    fresh = iter_ordered(validate_path, missing, profile, jobs=jobs, backend=backend)
+    try:
+        for item in cached:
+            if item is None:
+                item = next(fresh)
+                cache.put(item, fingerprint)
+            yield item
+    finally:
+        fresh.close()
+        cache.flush()
+
+
+def _iter_checked(
+    paths: list[Path],
+    profile: Profile,
+    jobs: int,
+    backend: str,
+    cache: AnalysisCache | None,
+    content: bool = True,
+    progress: ProgressCallback | None = None,
+    cancel: CancelToken | None = None,
+    timings: StageTimings = NULL_TIMINGS,
+) -> Iterator[FileAnalysis]:
+    """Risultati in ordine di input con avanzamento, annullamento e tempi di validazione."""
+    check_cancel(cancel)
+    # con più worker il tempo tra due risultati non è attribuibile a un singolo file: solo il totale di fase
+    per_file = resolve_jobs(jobs) == 1
+    last = timings.clock() if timings.enabled else 0.0
+    done = 0
+    with closing(_iter_analyze_paths(paths, profile, jobs, backend, cache, content)) as results:
+        for item in results:
+            if timings.enabled:
+                now = timings.clock()
+                size = _file_size(item.source) if content else 0
+                timings.add(STAGE_VALIDATE, now - last, size, item.source if per_file else None)
+                last = now
+            check_cancel(cancel)
+            done += 1
+            if progress is not None:
+                progress(ProgressEvent(STAGE_ANALYZE, done, len(paths), item.source))
+            yield item
+
+
+def _analyze_paths(
+    paths: list[Path],
+    profile: Profile,
+    jobs: int,
+    backend: str,
+    cache: AnalysisCache | None,
+    content: bool = True,
+    progress: ProgressCallback | None = None,
+    cancel: CancelToken | None = None,
+    timings: StageTimings = NULL_TIMINGS,
+) -> list[FileAnalysis]:
+    return list(_iter_checked(paths, profile, jobs, backend, cache, content, progress, cancel, timings))
+
+
+def iter_analyze(
+    input_root: Path,
+    profile: Profile | dict,
+    jobs: int = 1,
+    backend: str = BACKEND_THREAD,
+    cache: AnalysisCache | None = None,
+    progress: ProgressCallback | None = None,
+    cancel: CancelToken | None = None,
+    timings: StageTimings | None = None,
+) -> Iterator[FileAnalysis]:
+    """Come analyze(), ma ogni FileAnalysis è restituita appena pronta, senza accumulare il riepilogo.
+
+    I percorsi esclusi non vengono riportati; chiudere il generatore annulla le validazioni in coda.
+    """
+    profile = compile_profile(profile)
+    timer = timings or NULL_TIMINGS
+    paths, _excluded = _scan(input_root, timer)
+    with closing(_iter_checked(paths, profile, jobs, backend, cache, True, progress, cancel, timer)) as results:
+        for item in results:
+            item.correction_outcome = OUTCOME_NOT_RUN
+            yield item
+
+
+def analyze(
+    input_root: Path,
+    profile: Profile | dict,
+    jobs: int = 1,
+    backend: str = BACKEND_THREAD,
+    cache: AnalysisCache | None = None,
+    progress: ProgressCallback | None = None,
+    cancel: CancelToken | None = None,
+    timings: StageTimings | None = None,
+) -> AnalysisSummary:
+    """progress riceve un ProgressEvent per file; cancel interrompe con OperationCancelled.
+    Con timings i tempi per fase finiscono anche in summary.stats["timings"]."""
+    profile = compile_profile(profile)
+    timer = timings or NULL_TIMINGS
+    paths, excluded = _scan(input_root, timer)
+    files = _analyze_paths(paths, profile, jobs, backend, cache, progress=progress, cancel=cancel, timings=timer)
     for item in files:
         item.correction_outcome = OUTCOME_NOT_RUN
-    return AnalysisSummary(files=files, excluded_paths=excluded)
+    summary = AnalysisSummary(files=files, excluded_paths=excluded)
+    if timings is not None:
+        summary.stats["timings"] = timings.to_dict()
+    return summary
 
 
-def _safe_target_name(base_name: str, used: set[str]) -> str:
+def _safe_target_name(base_name: str, used: set[str] | NameAllocator) -> str:
     return ensure_unique(used, base_name)
 
 
@@ -74,47 +266,238 @@ def resolve_output_dir(input_root: Path, output_mode: str = "sibling", custom_ou
     return input_root.parent / f"{input_root.stem}_conforme"
 
 
-def _sanitize_zip(src: Path, dst: Path, profile: dict) -> tuple[list[str], bool]:
-    """Restituisce (azioni, impossible)."""
-    allowed = set(profile["allowed_formats"])
-    warning = set(profile.get("warning_formats", []))
-    max_len = int(profile.get("filename", {}).get("max_length", 80))
+ZIP_COPY_CHUNK = 1024 * 1024
+# entry più grandi vengono ricompresse in streaming nel thread chiamante, senza tenerle in memoria
+ZIP_PARALLEL_MAX_BYTES = 8 * 1024 * 1024
+
+
+def _zip_entry_parts(name: str) -> tuple[str, ...]:
+    # stessa normalizzazione di ZipFile.extractall: niente path assoluti né componenti "." / ".."
+    return tuple(part for part in name.split("/") if part not in {"", ".", ".."})
+
+
+def _zip_members(zin: zipfile.ZipFile) -> list[tuple[tuple[str, ...], zipfile.ZipInfo]]:
+    """Entry regolari in ordine di path; a parità di path vince l'ultima (come extractall)."""
+    members: dict[tuple[str, ...], zipfile.ZipInfo] = {}
+    for info in zin.infolist():
+        parts = _zip_entry_parts(info.filename)
+        if info.is_dir() or not parts:
+            continue
+        members[parts] = info
+    return sorted(members.items())
+
+
+def _output_info(info: zipfile.ZipInfo, arcname: str, compress_type: int) -> zipfile.ZipInfo:
+    out_info = zipfile.ZipInfo(arcname, date_time=info.date_time)
+    out_info.compress_type = compress_type
+    out_info.external_attr = 0o600 << 16
+    return out_info
+
+
+# La copia raw e la scrittura di entry già compresse usano interni di zipfile: ZipFile.fp, _writecheck(),
+# _didModify, filelist, NameToInfo, start_dir. Verificati su CPython 3.11, 3.12 e 3.13. Se una versione
+# futura li cambia, _zip_internals_available() è False e ogni entry passa dall'API pubblica (zout.open).
+_ZIP_INTERNALS = ("fp", "_writecheck", "_didModify", "filelist", "NameToInfo", "start_dir")
+
+
+def _zip_internals_available(zin: zipfile.ZipFile, zout: zipfile.ZipFile) -> bool:
+    return hasattr(zin, "fp") and all(hasattr(zout, name) for name in _ZIP_INTERNALS)
+
+
+def _set_compress_level(info: zipfile.ZipInfo, level: int) -> None:
+    try:
+        info.compress_level = level  # pubblico da Python 3.13
+    except AttributeError:
+        info._compresslevel = level  # 3.11 e 3.12: ZipInfo ha __slots__, solo il nome privato
+
+
+def _write_zip_entry(zout: zipfile.ZipFile, out_info: zipfile.ZipInfo, chunks: Iterable[bytes]) -> None:
+    """Scrive un'entry con CRC e dimensioni già noti in out_info e i byte già nel formato finale."""
+    zout._writecheck(out_info)
+    zout._didModify = True
+    out_info.header_offset = zout.fp.tell()
+    zout.fp.write(out_info.FileHeader())
+    for chunk in chunks:
+        zout.fp.write(chunk)
+    zout.filelist.append(out_info)
+    zout.NameToInfo[out_info.filename] = out_info
+    zout.start_dir = zout.fp.tell()
+
+
+def _raw_chunks(zin: zipfile.ZipFile, info: zipfile.ZipInfo) -> Iterator[bytes]:
+    zin.fp.seek(info.header_offset)
+    local_header = zin.fp.read(zipfile.sizeFileHeader)
+    fname_len, extra_len = struct.unpack("<HH", local_header[26:30])
+    zin.fp.seek(info.header_offset + zipfile.sizeFileHeader + fname_len + extra_len)
+    remaining = info.compress_size
+    while remaining:
+        chunk = zin.fp.read(min(ZIP_COPY_CHUNK, remaining))
+        if not chunk:
+            raise zipfile.BadZipFile(f"Entry troncata: {info.filename}")
+        remaining -= len(chunk)
+        yield chunk
+
+
+def _checked_raw_chunks(zin: zipfile.ZipFile, info: zipfile.ZipInfo) -> Iterator[bytes]:
+    """_raw_chunks verificando CRC-32 e dimensione come farebbe zin.open(): un'entry corrotta solleva BadZipFile.
+
+    Le entry deflate sono decompresse solo per il controllo (inflate, niente deflate), a blocchi di ZIP_COPY_CHUNK.
+    """
+    crc = 0
+    size = 0
+    inflater = zlib.decompressobj(-15) if info.compress_type == zipfile.ZIP_DEFLATED else None
+    try:
+        for chunk in _raw_chunks(zin, info):
+            data = chunk if inflater is None else inflater.decompress(chunk, ZIP_COPY_CHUNK)
+            while True:
+                crc = zlib.crc32(data, crc)
+                size += len(data)
+                if size > info.file_size:
+                    raise zipfile.BadZipFile(f"Entry più grande del dichiarato: {info.filename}")
+                if inflater is None or not inflater.unconsumed_tail:
+                    break
+                data = inflater.decompress(inflater.unconsumed_tail, ZIP_COPY_CHUNK)
+            yield chunk
+        if inflater is not None:
+            tail = inflater.flush()
+            crc = zlib.crc32(tail, crc)
+            size += len(tail)
+    except zlib.error as exc:
+        raise zipfile.BadZipFile(f"Dati compressi non validi in {info.filename}: {exc}") from exc
+    if size != info.file_size or crc != info.CRC:
+        raise zipfile.BadZipFile(f"CRC-32 o dimensione errati in {info.filename}")
+
+
+def _copy_zip_entry_raw(zin: zipfile.ZipFile, info: zipfile.ZipInfo, zout: zipfile.ZipFile, arcname: str) -> None:
+    """Copia i byte già compressi di un'entry cambiandone solo il nome (niente deflate), con verifica del CRC."""
+    out_info = _output_info(info, arcname, info.compress_type)
+    out_info.flag_bits = info.flag_bits & ~0x08  # CRC e dimensioni sono già noti: niente data descriptor
+    out_info.CRC = info.CRC
+    out_info.compress_size = info.compress_size
+    out_info.file_size = info.file_size
+    _write_zip_entry(zout, out_info, _checked_raw_chunks(zin, info))
+
+
+def _compress_type(level: int) -> int:
+    return zipfile.ZIP_STORED if level == ZIP_STORE_LEVEL else zipfile.ZIP_DEFLATED
+
+
+def _compress_entry(data: bytes, level: int) -> tuple[bytes, int]:
+    """Eseguita nei thread worker: zlib rilascia il GIL durante compressione e CRC."""
+    if level == ZIP_STORE_LEVEL:
+        return data, zlib.crc32(data)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush(), zlib.crc32(data)
+
+
+def _write_compressed_entry(
+    zout: zipfile.ZipFile, info: zipfile.ZipInfo, arcname: str, level: int, size: int, compressed: Future[tuple[bytes, int]]
+) -> None:
+    payload, crc = compressed.result()
+    out_info = _output_info(info, arcname, _compress_type(level))
+    out_info.CRC = crc
+    out_info.compress_size = len(payload)
+    out_info.file_size = size
+    _write_zip_entry(zout, out_info, (payload,))
+
+
+def _copy_zip_entry_stream(
+    zin: zipfile.ZipFile, info: zipfile.ZipInfo, zout: zipfile.ZipFile, arcname: str, guard: ZipGuard, level: int
+) -> None:
+    out_info = _output_info(info, arcname, _compress_type(level))
+    out_info.file_size = info.file_size
+    _set_compress_level(out_info, level)
+    with zin.open(info) as source, zout.open(out_info, "w") as target:
+        for chunk in guard.stream(source, info, chunk_size=ZIP_COPY_CHUNK):
+            target.write(chunk)
+
+
+def _rebuild_entries(
+    zin: zipfile.ZipFile, zout: zipfile.ZipFile, entries: list[tuple[zipfile.ZipInfo, str, int]], guard: ZipGuard, jobs: int
+) -> None:
+    """Scrive entries (info, nome finale, livello) nell'ordine dato.
+
+    Le entry già nel metodo di destinazione sono copiate compresse; le altre fino a ZIP_PARALLEL_MAX_BYTES
+    sono ricompresse su jobs thread, le più grandi in streaming. La lettura dall'archivio e la scrittura
+    restano nel thread chiamante; al più 2 * jobs entry lette attendono di essere scritte.
+    """
+    internals = _zip_internals_available(zin, zout)
+    workers = resolve_jobs(jobs) if internals else 1
+    executor = create_executor(workers) if workers > 1 else None
+    window = 2 * workers if executor is not None else 0
+    pending: deque[Callable[[], None]] = deque()
+    try:
+        for info, arcname, level in entries:
+            if internals and info.compress_type == _compress_type(level) and not info.flag_bits & 0x01:
+                pending.append(partial(_copy_zip_entry_raw, zin, info, zout, arcname))
+            elif executor is None or info.file_size > ZIP_PARALLEL_MAX_BYTES:
+                pending.append(partial(_copy_zip_entry_stream, zin, info, zout, arcname, guard, level))
+            else:
+                with zin.open(info) as source:
+                    data = b"".join(guard.stream(source, info, chunk_size=ZIP_COPY_CHUNK))
+                compressed = executor.submit(_compress_entry, data, level)
+                pending.append(partial(_write_compressed_entry, zout, info, arcname, level, len(data), compressed))
+            while len(pending) > window:
+                pending.popleft()()
+        while pending:
+            pending.popleft()()
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _sanitize_zip(
+    src: Path, dst: Path, profile: Profile | dict, case_insensitive: bool = False, jobs: int = 1
+) -> tuple[list[str], bool]:
+    """Restituisce (azioni, impossible). case_insensitive: nomi interni univoci anche ignorando le maiuscole.
+
+    Il livello di compressione di ogni entry segue profile.zip_compression; jobs: thread per la ricompressione.
+    Solleva ZipLimitExceeded se l'archivio supera i limiti del profilo: dalla central directory prima di
+    scrivere qualsiasi byte, oppure durante la decompressione delle entry ricompresse. Se solleva, dst non esiste.
+    """
+    profile = compile_profile(profile)
+    max_len = profile.max_filename_length
+    levels = profile.zip_compression.policy()
+    default_level = profile.zip_compression.default_level
 
     actions: list[str] = ["[ZIP] Avvio riparazione archivio"]
-    used_names: set[str] = set()
+    used_names = NameAllocator(case_insensitive=case_insensitive)
+    guard = ZipGuard(profile.zip_limits)
     impossible = False
 
-    with tempfile.TemporaryDirectory(prefix="gdlex_zip_") as tempdir:
-        temp_root = Path(tempdir)
-        with zipfile.ZipFile(src, "r") as zin:
-            zin.extractall(temp_root)
-
-        pairs: list[tuple[str, bytes]] = []
-        for file_path in sorted(p for p in temp_root.rglob("*") if p.is_file()):
-            raw_name = file_path.name
-            ext = file_path.suffix.lower().lstrip(".")
+    with zipfile.ZipFile(src, "r") as zin:
+        guard.check_directory(zin.infolist())
+        members = _zip_members(zin)
+        normalized_names = normalize_many((parts[-1] for parts, _ in members), max_len)
+        entries: list[tuple[zipfile.ZipInfo, str, int]] = []
+        for (parts, info), normalized in zip(members, normalized_names, strict=True):
+            raw_name = parts[-1]
+            ext = Path(raw_name).suffix.lower().lstrip(".")
 
             if raw_name in {".DS_Store", "Thumbs.db"} or raw_name.startswith("~$"):
                 actions.append(f"[ZIP] Rimosso file tecnico: {raw_name}")
                 continue
 
-            if ext not in allowed and ext not in warning:
+            if not profile.accepts(ext):
                 actions.append(f"[ZIP] Estensione interna vietata: {raw_name}")
                 impossible = True
                 continue
 
-            normalized = sanitize_filename(raw_name, max_len=max_len)
             final_name = _safe_target_name(normalized, used_names)
             if final_name != raw_name:
                 actions.append(f"[ZIP] Normalizzato: {raw_name} -> {final_name}")
-            if file_path.parent != temp_root:
-                actions.append(f"[ZIP] Flatten struttura: {file_path.relative_to(temp_root)}")
+            if len(parts) > 1:
+                actions.append(f"[ZIP] Flatten struttura: {Path(*parts)}")
+            entries.append((info, final_name, levels.get(ext, default_level)))
 
-            pairs.append((final_name, file_path.read_bytes()))
-
-        with zipfile.ZipFile(dst, "w", compression=zipfile.ZIP_DEFLATED) as zout:
-            for name, blob in pairs:
-                zout.writestr(name, blob)
+        # costruito accanto e rinominato solo a ricostruzione completa: un errore a metà non lascia ZIP troncati in output
+        staged = dst.with_name(f".{dst.name}.part")
+        try:
+            with zipfile.ZipFile(staged, "w", compression=zipfile.ZIP_DEFLATED) as zout:
+                _rebuild_entries(zin, zout, entries, guard, jobs)
+            os.replace(staged, dst)
+        finally:
+            staged.unlink(missing_ok=True)
 
     actions.append("[ZIP] Ricreato ZIP flat conforme")
     return actions, impossible
@@ -124,8 +507,16 @@ def _has_same_issue(target: FileAnalysis, code: str) -> bool:
     return any(issue.code == code for issue in target.issues)
 
 
-def _build_manifest_row(result: FileAnalysis) -> dict:
-    return {
+def _source_identity(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _build_manifest_row(result: FileAnalysis, identity: tuple[int, int] | None = None) -> dict:
+    row = {
         "source": str(result.source),
         "target": str(result.output_path) if result.output_path else None,
         "sha256": result.sha256,
@@ -133,25 +524,554 @@ def _build_manifest_row(result: FileAnalysis) -> dict:
         "issues": [{"level": issue.level, "code": issue.code, "message": issue.message} for issue in result.issues],
         "correction_outcome": result.correction_outcome,
         "actions": result.correction_actions,
+        "materialization": result.output_strategy,
+    }
+    if identity is not None:
+        row["source_size"], row["source_mtime_ns"] = identity
+    if result.output_path and result.output_path.is_file():
+        row["output_size"] = result.output_path.stat().st_size
+    return row
+
+
+def _load_previous_rows(output_dir: Path, state: dict) -> dict[str, dict]:
+    """Righe del REPORT.json precedente, solo se prodotto con stesso profilo e stesse opzioni."""
+    try:
+        payload = json.loads((output_dir / ".gdlex" / "REPORT.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if payload.get("state") != state:
+        return {}
+    return {row["source"]: row for row in payload.get("files", []) if row.get("source")}
+
+
+def _row_matches_source(row: dict | None, identity: tuple[int, int] | None) -> bool:
+    return bool(row and identity and (row.get("source_size"), row.get("source_mtime_ns")) == identity)
+
+
+def _row_output_reusable(row: dict, dst: Path) -> bool:
+    if row.get("target") != str(dst) or row.get("correction_outcome") == OUTCOME_ERROR:
+        return False
+    try:
+        return dst.stat().st_size == row.get("output_size")
+    except OSError:
+        return False
+
+
+def _analysis_from_row(path: Path, row: dict) -> FileAnalysis:
+    return FileAnalysis(
+        source=path,
+        file_type=path.suffix.lower().lstrip(".") or "unknown",
+        status=row["status"],
+        issues=[Issue(issue["level"], issue["code"], issue["message"]) for issue in row.get("issues", [])],
+        suggested_name=Path(row["target"]).name if row.get("target") else None,
+    )
+
+
+DUPLICATE_ACTION_PREFIX = "Duplicato di "
+
+
+def _strip_duplicate_marks(item: FileAnalysis) -> None:
+    item.issues = [issue for issue in item.issues if issue.code != "duplicate_content"]
+    item.correction_actions = [action for action in item.correction_actions if not action.startswith(DUPLICATE_ACTION_PREFIX)]
+
+
+def _restore_from_row(result: FileAnalysis, row: dict) -> None:
+    restored = _analysis_from_row(result.source, row)
+    result.status = restored.status
+    result.issues = restored.issues
+    result.suggested_name = restored.suggested_name
+    result.output_path = Path(row["target"])
+    result.sha256 = row.get("sha256")
+    result.correction_outcome = row["correction_outcome"]
+    result.correction_actions = list(row.get("actions", []))
+    result.output_strategy = row.get("materialization")
+    # i duplicati vengono ricalcolati a fine esecuzione: quelli della riga precedente non si accumulano
+    _strip_duplicate_marks(result)
+
+
+def _analyze_incremental(
+    input_root: Path,
+    profile: Profile,
+    previous: dict[str, dict],
+    identities: dict[Path, tuple[int, int] | None],
+    jobs: int,
+    backend: str,
+    cache: AnalysisCache | None,
+    content: bool = True,
+    progress: ProgressCallback | None = None,
+    cancel: CancelToken | None = None,
+    timings: StageTimings = NULL_TIMINGS,
+) -> AnalysisSummary:
+    """Come analyze(), ma i sorgenti invariati riprendono l'esito dal report precedente senza rileggerli."""
+    paths, excluded = _scan(input_root, timings)
+    files: list[FileAnalysis | None] = []
+    stale: list[int] = []
+    for idx, path in enumerate(paths):
+        identities[path] = _source_identity(path)
+        row = previous.get(str(path))
+        if _row_matches_source(row, identities[path]):
+            files.append(_analysis_from_row(path, row))
+        else:
+            files.append(None)
+            stale.append(idx)
+    fresh = _analyze_paths([paths[idx] for idx in stale], profile, jobs, backend, cache, content, progress, cancel, timings)
+    for idx, item in zip(stale, fresh, strict=True):
+        files[idx] = item
+    for item in files:
+        item.correction_outcome = OUTCOME_NOT_RUN
+    return AnalysisSummary(files=files, excluded_paths=excluded)  # type: ignore[arg-type]
+
+
+def _complete_analysis(result: FileAnalysis, profile: Profile) -> None:
+    """Aggiunge i controlli sul contenuto a un'analisi fatta solo su nome ed estensione."""
+    full = validate_path(result.source, profile)
+    result.status = full.status
+    result.issues = full.issues
+
+
+def _plan_targets(
+    sources: list[Path],
+    input_root: Path,
+    profile: Profile | dict,
+    output_mode: str,
+    custom_output_dir: Path | None,
+    smart_opts: dict | None,
+) -> tuple[Path, dict[Path, PlannedName]]:
+    """Lo stesso piano dei nomi che userebbe la correzione reale, senza scrivere nulla (dry-run)."""
+    output_dir = resolve_output_dir(input_root, output_mode=output_mode, custom_output_dir=custom_output_dir)
+    plan = plan_names(sources, output_dir, _merge_smart_opts(smart_opts), compile_profile(profile).max_filename_length)
+    return output_dir, {planned.source: planned for planned in plan}
+
+
+def _merge_smart_opts(smart_opts: dict | None) -> dict:
+    smart_opts = smart_opts or {"enabled": True, "max_filename_len": 60, "max_output_path_len": 180}
+    return {
+        "enabled": smart_opts.get("enabled", True),
+        "max_filename_len": int(smart_opts.get("max_filename_len", 60)),
+        "max_output_path_len": int(smart_opts.get("max_output_path_len", 180)),
+        "case_insensitive_names": bool(smart_opts.get("case_insensitive_names", False)),
     }
 
 
+def _remove_orphan_outputs(output_dir: Path, keep: set[Path]) -> list[Path]:
+    removed: list[Path] = []
+    for entry in sorted(output_dir.iterdir()):
+        if entry.name == ".gdlex" or entry in keep:
+            continue
+        if entry.is_dir() and not entry.is_symlink():
+            shutil.rmtree(entry)
+        else:
+            entry.unlink()
+        removed.append(entry)
+    return removed
+
+
+@dataclass(slots=True)
+class _SanitizeRun:
+    """Stato condiviso tra i file di una stessa correzione."""
+
+    output_dir: Path
+    profile: Profile
+    smart_opts: dict
+    materialization: str
+    shallow: bool
+    timer: StageTimings
+    previous: dict[str, dict]
+    identities: dict[Path, tuple[int, int] | None]
+    cancel: CancelToken | None = None
+    zip_jobs: int = 1
+
+
+@dataclass(slots=True)
+class _FileIO:
+    """Contatori di un singolo file: sommati dal chiamante, così i worker non condividono stato mutabile."""
+
+    bytes_read: int = 0
+    bytes_written: int = 0
+    reused: bool = False
+    skipped: bool = False
+
+
+def _refuse_zip(run: _SanitizeRun, result: FileAnalysis, dst: Path, exc: ZipLimitExceeded) -> None:
+    """Archivio oltre i limiti: nessun output (neanche parziale), issue zip_bomb sul risultato."""
+    dst.unlink(missing_ok=True)
+    if run.shallow:
+        with run.timer.stage(STAGE_VALIDATE, result.source):
+            _complete_analysis(result, run.profile)
+    if not _has_same_issue(result, "zip_bomb"):
+        result.issues.append(exc.issue())
+        result.status = detect_status(result.issues)
+    result.correction_outcome = OUTCOME_IMPOSSIBLE
+    result.correction_actions = [f"[ZIP] Archivio oltre i limiti di sicurezza del profilo, escluso dall'output: {exc}"]
+
+
+def _index_outputs(files: list[FileAnalysis]) -> tuple[DuplicateIndex, dict[str, FileAnalysis]]:
+    """Indice degli output scritti (hash già calcolati in copia) e delle entry degli ZIP ricostruiti."""
+    index = DuplicateIndex()
+    owners: dict[str, FileAnalysis] = {}
+    for item in files:
+        dst = item.output_path
+        if dst is None or item.sha256 is None or not dst.is_file():
+            continue
+        owners[dst.name] = item
+        index.add(dst.name, dst.stat().st_size, item.sha256)
+        if dst.suffix.lower() != ".zip":
+            continue
+        try:
+            for name, size, crc in zip_members(dst):
+                member = f"{dst.name}/{name}"
+                owners[member] = item
+                index.add_zip_member(member, size, crc, dst, name)
+        except zipfile.BadZipFile:
+            continue
+    return index, owners
+
+
+def _drop_duplicate(item: FileAnalysis, keeper: FileAnalysis, policy: str) -> None:
+    dst = item.output_path
+    original = keeper.output_path.name
+    if policy == DUPLICATES_HARDLINK:
+        # rerun incrementale o sorgenti già hardlink tra loro: os.replace su due link allo stesso inode non fa nulla
+        if not os.path.samefile(keeper.output_path, dst):
+            staged = dst.with_name(f".{dst.name}.link")
+            try:
+                os.link(keeper.output_path, staged)
+                os.replace(staged, dst)
+            except OSError:
+                # filesystem senza hardlink: resta la copia già scritta
+                return
+            finally:
+                staged.unlink(missing_ok=True)
+        item.output_strategy = MATERIALIZE_HARDLINK
+        item.correction_actions.append(f"{DUPLICATE_ACTION_PREFIX}{original}: sostituito da un hardlink")
+        return
+    dst.unlink()
+    item.output_path = None
+    item.output_strategy = None
+    item.correction_actions.append(f"{DUPLICATE_ACTION_PREFIX}{original}: escluso dall'output")
+
+
+def _apply_duplicates(files: list[FileAnalysis], policy: str, jobs: int = 1) -> list[DuplicateGroup]:
+    """Segnala i contenuti duplicati nell'output; con exclude/hardlink tiene un solo file di primo livello per gruppo.
+
+    Le entry dentro gli ZIP sono solo segnalate: riscrivere l'archivio per toglierle non vale il costo.
+    """
+    index, owners = _index_outputs(files)
+    groups = index.groups(jobs)
+    for group in groups:
+        issue = Issue("info", "duplicate_content", f"Contenuto duplicato ({group.size} byte): {' = '.join(group.members)}.")
+        involved = {id(owners[member]): owners[member] for member in group.members}
+        for item in involved.values():
+            item.issues.append(issue)
+        top_level = [owners[member] for member in group.members if "/" not in member]
+        if policy == DUPLICATES_KEEP or len(top_level) < 2:
+            continue
+        # le copie hanno di solito un suffisso ("ricorso (1).pdf"): si conserva il nome più corto
+        keeper = min(top_level, key=lambda item: len(item.output_path.name))
+        for item in top_level:
+            if item is not keeper:
+                _drop_duplicate(item, keeper, policy)
+    return groups
+
+
+def _sanitize_planned(task: tuple[FileAnalysis, PlannedName], run: _SanitizeRun) -> _FileIO:
+    return _sanitize_file(run, *task)
+
+
+def _sanitize_file(run: _SanitizeRun, result: FileAnalysis, planned: PlannedName) -> _FileIO:
+    """Corregge un singolo file verso run.output_dir con il nome già deciso dal piano; aggiorna result."""
+    io = _FileIO()
+    if run.cancel is not None and run.cancel.cancelled:
+        # con più worker i file già in coda al momento dell'annullamento restano NON ESEGUITA
+        io.skipped = True
+        return io
+    src = result.source
+    target_name = planned.target
+    rename_reasons = planned.reasons
+    dst = run.output_dir / target_name
+
+    if src not in run.identities:
+        run.identities[src] = _source_identity(src)
+    row = run.previous.get(str(src))
+    if _row_matches_source(row, run.identities[src]) and _row_output_reusable(row, dst):
+        _restore_from_row(result, row)
+        io.reused = True
+        return io
+
+    try:
+        ext = src.suffix.lower().lstrip(".")
+        if not run.profile.accepts(ext):
+            if run.shallow:
+                with run.timer.stage(STAGE_VALIDATE, src):
+                    _complete_analysis(result, run.profile)
+            result.correction_outcome = OUTCOME_IMPOSSIBLE
+            result.correction_actions = ["Formato non ammesso: file escluso dalla correzione automatica"]
+            return io
+
+        actions: list[str] = []
+        changed = False
+        impossible = False
+        if target_name != src.name:
+            actions.append(f"Smart rename: {src.name} -> {target_name}")
+            changed = True
+
+        # mai riscrivere in place: con la modalità incrementale dst potrebbe essere un hardlink al sorgente
+        if dst.is_symlink() or dst.is_file():
+            dst.unlink()
+
+        if ext == "zip":
+            try:
+                with run.timer.stage(STAGE_ZIP_REBUILD, src) as span:
+                    zip_actions, impossible = _sanitize_zip(
+                        src, dst, run.profile, run.smart_opts["case_insensitive_names"], run.zip_jobs
+                    )
+                    span.bytes = src.stat().st_size
+            except ZipLimitExceeded as exc:
+                _refuse_zip(run, result, dst, exc)
+                return io
+            actions.extend(zip_actions)
+            changed = True
+            output_size = dst.stat().st_size
+            with run.timer.stage(STAGE_VALIDATE, src, output_size):
+                reanalysis = validate_path(dst, run.profile)
+            with run.timer.stage(STAGE_HASH, src, output_size):
+                result.sha256 = sha256_file(dst)
+            result.output_strategy = "zip_rebuild"
+            io.bytes_read += src.stat().st_size + output_size
+            io.bytes_written += output_size
+        else:
+            # copia, hash e rivalidazione PDF sugli stessi buffer: il sorgente è letto una volta sola
+            pdf_scan = PdfStreamScanner() if ext == "pdf" else None
+            with run.timer.stage(STAGE_COPY, src) as span:
+                result.sha256, copied, result.output_strategy = materialize(
+                    src, dst, run.materialization, [pdf_scan.feed] if pdf_scan else []
+                )
+                span.bytes = copied
+            # con la scansione PDF già fatta in copia restano solo header e coda del file
+            with run.timer.stage(STAGE_VALIDATE, src):
+                reanalysis = validate_path(dst, run.profile, pdf_scan=pdf_scan)
+            io.bytes_read += copied
+            io.bytes_written += copied
+            if dst.name != src.name:
+                actions.append(f"Rinominato file: {src.name} -> {dst.name}")
+            else:
+                actions.append("Copia senza modifiche necessarie")
+
+        result.output_path = dst
+
+        if _has_same_issue(reanalysis, "zip_ext_forbidden"):
+            impossible = True
+            actions.append("Persistono estensioni vietate nello ZIP: impossibile completare la correzione")
+
+        if impossible:
+            result.correction_outcome = OUTCOME_IMPOSSIBLE
+        elif reanalysis.status == "ok" and changed:
+            result.correction_outcome = OUTCOME_FIXED
+        elif reanalysis.status == "ok" and not changed:
+            result.correction_outcome = OUTCOME_OK
+        elif changed:
+            result.correction_outcome = OUTCOME_PARTIAL
+        else:
+            result.correction_outcome = OUTCOME_OK
+
+        if _has_same_issue(reanalysis, "zip_mixed_pades"):
+            actions.append("Warning mantenuto: mixed PAdES rilevato (non bloccante)")
+
+        actions.append(f"Output scritto in: {dst}")
+        result.correction_actions = actions
+        result.status = reanalysis.status
+        result.issues = list(reanalysis.issues)
+        result.suggested_name = target_name
+
+        if rename_reasons:
+            result.issues.append(
+                Issue(
+                    "info",
+                    "smart_rename_applied",
+                    f"Smart rename applicato: {src.name} -> {target_name} (motivi: {', '.join(rename_reasons)}).",
+                )
+            )
+        if "path_too_long_mitigated" in rename_reasons:
+            result.issues.append(
+                Issue(
+                    "warning",
+                    "path_too_long_mitigated",
+                    f"Path lungo mitigato per evitare problemi di sincronizzazione/cartelle annidate: {target_name}.",
+                )
+            )
+
+    except Exception as exc:
+        if run.shallow:
+            try:
+                _complete_analysis(result, run.profile)
+            except OSError:
+                pass
+        # nessun output parziale: l'esito ERRORE non ha file in _conforme
+        try:
+            dst.unlink(missing_ok=True)
+        except OSError:
+            pass
+        result.output_path = None
+        result.correction_outcome = OUTCOME_ERROR
+        result.correction_actions = [f"Errore durante correzione: {exc}"]
+    return io
+
+
 def sanitize(
     input_root: Path,
-    profile: dict,
+    profile: Profile | dict,
     dry_run: bool = False,
     output_mode: str = "sibling",
     custom_output_dir: Path | None = None,
     smart_opts: dict | None = None,
     create_backup: bool = False,
+    jobs: int = 1,
+    backend: str = BACKEND_THREAD,
+    cache: AnalysisCache | None = None,
+    incremental: bool = False,
+    materialization: str = MATERIALIZE_COPY,
+    progress: ProgressCallback | None = None,
+    cancel: CancelToken | None = None,
+    timings: StageTimings | None = None,
+    duplicates: str = DUPLICATES_KEEP,
 ) -> tuple[Path | None, AnalysisSummary]:
-    summary = analyze(input_root, profile)
+    """Con cancel l'interruzione avviene tra un file e l'altro: i report parziali vengono scritti
+    (e riutilizzabili in modalità incrementale) prima di sollevare OperationCancelled.
+    Con timings i tempi per fase finiscono in summary.stats e nella sezione "timings" di REPORT.json.
+    duplicates: i file di output con contenuto identico sono sempre segnalati; con exclude o hardlink sono anche
+    ridotti a uno (escluse le copie o sostituite da hardlink), con keep (default) restano tutti."""
     if dry_run:
+        summary = analyze(
+            input_root, profile, jobs=jobs, backend=backend, cache=cache, progress=progress, cancel=cancel, timings=timings
+        )
+        sources = [item.source for item in summary.files]
+        output_dir, plan = _plan_targets(sources, input_root, profile, output_mode, custom_output_dir, smart_opts)
+        for item in summary.files:
+            item.suggested_name = plan[item.source].target
+        summary.stats["plan"] = {"output": str(output_dir), "files": [plan[source].to_dict() for source in sources]}
         return None, summary
+    steps = _sanitize_steps(
+        input_root,
+        profile,
+        output_mode,
+        custom_output_dir,
+        smart_opts,
+        create_backup,
+        jobs,
+        backend,
+        cache,
+        incremental,
+        materialization,
+        progress,
+        cancel,
+        timings,
+        duplicates,
+    )
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+
+
+def iter_sanitize(
+    input_root: Path,
+    profile: Profile | dict,
+    dry_run: bool = False,
+    output_mode: str = "sibling",
+    custom_output_dir: Path | None = None,
+    smart_opts: dict | None = None,
+    create_backup: bool = False,
+    jobs: int = 1,
+    backend: str = BACKEND_THREAD,
+    cache: AnalysisCache | None = None,
+    incremental: bool = False,
+    materialization: str = MATERIALIZE_COPY,
+    progress: ProgressCallback | None = None,
+    cancel: CancelToken | None = None,
+    timings: StageTimings | None = None,
+    duplicates: str = DUPLICATES_KEEP,
+) -> Iterator[FileAnalysis]:
+    """Come sanitize(), ma ogni FileAnalysis è restituita appena il suo output è scritto.
+
+    I report in .gdlex vengono scritti a fine iterazione; chiudere il generatore in anticipo equivale
+    a un annullamento (report parziali scritti, nessuna eccezione). I duplicati sono cercati a fine
+    iterazione: le loro issue compaiono solo nei report, non nei file già restituiti.
+    """
+    if dry_run:
+        profile = compile_profile(profile)
+        timer = timings or NULL_TIMINGS
+        paths, _excluded = _scan(input_root, timer)
+        _output_dir, plan = _plan_targets(paths, input_root, profile, output_mode, custom_output_dir, smart_opts)
+        with closing(_iter_checked(paths, profile, jobs, backend, cache, True, progress, cancel, timer)) as results:
+            for item in results:
+                item.correction_outcome = OUTCOME_NOT_RUN
+                item.suggested_name = plan[item.source].target
+                yield item
+        return
+    yield from _sanitize_steps(
+        input_root,
+        profile,
+        output_mode,
+        custom_output_dir,
+        smart_opts,
+        create_backup,
+        jobs,
+        backend,
+        cache,
+        incremental,
+        materialization,
+        progress,
+        cancel,
+        timings,
+        duplicates,
+    )
+
+
+def _sanitize_steps(
+    input_root: Path,
+    profile: Profile,
+    output_mode: str,
+    custom_output_dir: Path | None,
+    smart_opts: dict | None,
+    create_backup: bool,
+    jobs: int,
+    backend: str,
+    cache: AnalysisCache | None,
+    incremental: bool,
+    materialization: str,
+    progress: ProgressCallback | None,
+    cancel: CancelToken | None,
+    timings: StageTimings | None,
+    duplicates: str = DUPLICATES_KEEP,
+) -> Generator[FileAnalysis, None, tuple[Path, AnalysisSummary]]:
+    """Corpo comune di sanitize() e iter_sanitize(): restituisce ogni file corretto, ritorna (output, riepilogo)."""
+    if duplicates not in DUPLICATE_POLICIES:
+        raise ValueError(f"Gestione duplicati non supportata: {duplicates} (disponibili: {', '.join(DUPLICATE_POLICIES)})")
+    profile = compile_profile(profile)
+    timer = timings or NULL_TIMINGS
 
     output_dir = resolve_output_dir(input_root, output_mode=output_mode, custom_output_dir=custom_output_dir)
-    if output_dir.exists():
-        shutil.rmtree(output_dir)
+    merged_opts = _merge_smart_opts(smart_opts)
+    state = {"profile": profile_fingerprint(profile), "smart_opts": merged_opts}
+
+    # senza cache il contenuto viene letto una sola volta, nella fase di copia: qui solo nome ed estensione
+    shallow = cache is None
+    identities: dict[Path, tuple[int, int] | None] = {}
+    previous: dict[str, dict] = {}
+    if incremental and output_dir.is_dir():
+        previous = _load_previous_rows(output_dir, state)
+        summary = _analyze_incremental(
+            input_root, profile, previous, identities, jobs, backend, cache, not shallow, progress, cancel, timer
+        )
+    else:
+        paths, excluded = _scan(input_root, timer)
+        files = _analyze_paths(paths, profile, jobs, backend, cache, not shallow, progress, cancel, timer)
+        for item in files:
+            item.correction_outcome = OUTCOME_NOT_RUN
+        summary = AnalysisSummary(files=files, excluded_paths=excluded)
+        if output_dir.exists():
+            shutil.rmtree(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
     tech_dir = output_dir / ".gdlex"
     tech_dir.mkdir(parents=True, exist_ok=True)
@@ -164,112 +1084,95 @@ def sanitize(
             backup_dir.mkdir(parents=True, exist_ok=True)
             shutil.copy2(input_root, backup_dir / input_root.name)
 
-    used_targets: set[str] = set()
-    smart_opts = smart_opts or {"enabled": True, "max_filename_len": 60, "max_output_path_len": 180}
+    # piano dei nomi prima di ogni scrittura: la fase di I/O lavora su destinazioni già fissate
+    plan = plan_names([item.source for item in summary.files], output_dir, merged_opts, profile.max_filename_length)
+    run = _SanitizeRun(
+        output_dir=output_dir,
+        profile=profile,
+        smart_opts=merged_opts,
+        materialization=materialization,
+        shallow=shallow,
+        timer=timer,
+        previous=previous,
+        identities=identities,
+        cancel=cancel,
+        zip_jobs=jobs,
+    )
+    total = len(summary.files)
+    cancelled = closed = False
+    bytes_read = bytes_written = reused = 0
 
-    for result in summary.files:
-        src = result.source
-        max_len = int(profile.get("filename", {}).get("max_length", 80))
-        merged_opts = {
-            "enabled": smart_opts.get("enabled", True),
-            "max_filename_len": int(smart_opts.get("max_filename_len", 60)),
-            "max_output_path_len": int(smart_opts.get("max_output_path_len", 180)),
-        }
-        candidate, rename_reasons = smart_rename(src.name, src.suffix, merged_opts, {"output_dir": output_dir})
-        if not candidate:
-            candidate = sanitize_filename(src.name, max_len=max_len)
-        target_name = _safe_target_name(candidate, used_targets)
-        dst = output_dir / target_name
+    # I/O sempre a thread: i processi non vedrebbero le modifiche a FileAnalysis
+    work = iter_ordered(_sanitize_planned, list(zip(summary.files, plan, strict=True)), run, jobs=jobs, backend=BACKEND_THREAD)
+    with closing(work):
+        for index, result in enumerate(summary.files):
+            if progress is not None:
+                progress(ProgressEvent(STAGE_SANITIZE, index, total, result.source, bytes_written))
+            if cancel is not None and cancel.cancelled:
+                cancelled = True
+                break
+            io = next(work)
+            if io.skipped:
+                cancelled = True
+                break
+            bytes_read += io.bytes_read
+            bytes_written += io.bytes_written
+            reused += io.reused
+            try:
+                yield result
+            except GeneratorExit:
+                # iter_sanitize() chiuso dal chiamante: come un annullamento, ma senza eccezione
+                cancelled = closed = True
+                break
 
-        try:
-            ext = src.suffix.lower().lstrip(".")
-            allowed = set(profile["allowed_formats"])
-            warning = set(profile.get("warning_formats", []))
+    if progress is not None and not cancelled:
+        progress(ProgressEvent(STAGE_SANITIZE, total, total, None, bytes_written))
 
-            if ext not in allowed and ext not in warning:
-                result.correction_outcome = OUTCOME_IMPOSSIBLE
-                result.correction_actions = ["Formato non ammesso: file escluso dalla correzione automatica"]
-                continue
+    if not cancelled:
+        summary.stats["duplicates"] = [group.to_dict() for group in _apply_duplicates(summary.files, duplicates, jobs)]
 
-            actions: list[str] = []
-            changed = False
-            impossible = False
-            if target_name != src.name:
-                actions.append(f"Smart rename: {src.name} -> {target_name}")
-                changed = True
-
-            if ext == "zip":
-                zip_actions, impossible = _sanitize_zip(src, dst, profile)
-                actions.extend(zip_actions)
-                changed = True
-            else:
-                shutil.copy2(src, dst)
-                if dst.name != src.name:
-                    actions.append(f"Rinominato file: {src.name} -> {dst.name}")
-                else:
-                    actions.append("Copia senza modifiche necessarie")
-
-            reanalysis = validate_path(dst, profile)
-            result.output_path = dst
-            result.sha256 = sha256_file(dst)
-
-            if _has_same_issue(reanalysis, "zip_ext_forbidden"):
-                impossible = True
-                actions.append("Persistono estensioni vietate nello ZIP: impossibile completare la correzione")
-
-            if impossible:
-                result.correction_outcome = OUTCOME_IMPOSSIBLE
-            elif reanalysis.status == "ok" and changed:
-                result.correction_outcome = OUTCOME_FIXED
-            elif reanalysis.status == "ok" and not changed:
-                result.correction_outcome = OUTCOME_OK
-            elif changed:
-                result.correction_outcome = OUTCOME_PARTIAL
-            else:
-                result.correction_outcome = OUTCOME_OK
-
-            if _has_same_issue(reanalysis, "zip_mixed_pades"):
-                actions.append("Warning mantenuto: mixed PAdES rilevato (non bloccante)")
-
-            actions.append(f"Output scritto in: {dst}")
-            result.correction_actions = actions
-            result.status = reanalysis.status
-            result.issues = list(reanalysis.issues)
-            result.suggested_name = target_name
-
-            if rename_reasons:
-                result.issues.append(
-                    Issue(
-                        "info",
-                        "smart_rename_applied",
-                        f"Smart rename applicato: {src.name} -> {target_name} (motivi: {', '.join(rename_reasons)}).",
-                    )
-                )
-            if "path_too_long_mitigated" in rename_reasons:
-                result.issues.append(
-                    Issue(
-                        "warning",
-                        "path_too_long_mitigated",
-                        f"Path lungo mitigato per evitare problemi di sincronizzazione/cartelle annidate: {target_name}.",
-                    )
-                )
-
-        except Exception as exc:  # pragma: no cover
-            result.correction_outcome = OUTCOME_ERROR
-            result.correction_actions = [f"Errore durante correzione: {exc}"]
-
-    manifest_rows = [_build_manifest_row(item) for item in summary.files]
+    strategies: dict[str, int] = {}
+    for item in summary.files:
+        if item.output_strategy:
+            strategies[item.output_strategy] = strategies.get(item.output_strategy, 0) + 1
+    summary.stats["io"] = {
+        "source_bytes_read": bytes_read,
+        "output_bytes_written": bytes_written,
+        "read_per_output_byte": round(bytes_read / bytes_written, 3) if bytes_written else None,
+        "materialization": strategies,
+    }
+    report_started = timer.clock() if timer.enabled else 0.0
+    report: dict = {"output": str(output_dir), "state": state, "io": summary.stats["io"]}
+    if "duplicates" in summary.stats:
+        report["duplicates"] = summary.stats["duplicates"]
+    if cancelled:
+        report["cancelled"] = True
+    elif incremental:
+        removed = _remove_orphan_outputs(output_dir, {item.output_path for item in summary.files if item.output_path})
+        report["incremental"] = {
+            "reused": reused,
+            "rewritten": sum(1 for item in summary.files if item.output_path) - reused,
+            "removed": [str(path) for path in removed],
+        }
+    report["files"] = [_build_manifest_row(item, identities.get(item.source)) for item in summary.files]
 
     report_json = tech_dir / "REPORT.json"
     report_txt = tech_dir / "REPORT.txt"
     manifest_csv = tech_dir / "MANIFEST.csv"
 
-    with report_json.open("w", encoding="utf-8") as handle:
-        json.dump({"output": str(output_dir), "files": manifest_rows}, handle, indent=2, ensure_ascii=False)
-
     _write_report_txt(report_txt, summary, output_dir)
     _write_manifest_csv(manifest_csv, summary)
+    if timings is not None:
+        # REPORT.json è scritto per ultimo: la sua serializzazione resta fuori dalla fase report
+        timings.add(STAGE_REPORT, timings.clock() - report_started, count=2)
+        summary.stats["timings"] = report["timings"] = timings.to_dict()
+        report["files"] = report.pop("files")
+
+    with report_json.open("w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2, ensure_ascii=False)
 
+    if cancelled and not closed:
+        raise OperationCancelled("Correzione annullata", output_dir=output_dir, summary=summary)
     return output_dir, summary
 
 
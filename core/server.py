@@ -0,0 +1,352 @@
+"""Server locale residente: configurazione, profili e worker restano caldi tra una richiesta e l'altra.
+
+Protocollo (HTTP/1.1 su localhost o socket Unix):
+    GET  /health
+    POST /analyze   JSON {"path": ..., "profile": ...}
+    POST /sanitize  JSON {"path": ..., "profile": ..., "output": ..., "incremental": ..., "materialize": ..., "duplicates": ...}
+    POST /analyze?filename=atto.pdf&profile=...  corpo application/octet-stream (file inviato in streaming)
+
+La risposta è il record di core.batch.run_dossier con il riepilogo completo in "summary".
+Il server legge e scrive percorsi locali per conto del chiamante: va esposto solo in locale.
+Ogni richiesta deve portare il token generato all'avvio nell'header X-GDLEX-Token e un Host
+locale (localhost, 127.0.0.1, [::1]): una pagina web aperta nel browser non conosce il token
+e non può aggirare il controllo con un DNS rebinding.
+"""
+from __future__ import annotations
+
+import hmac
+import http.client
+import json
+import os
+import secrets
+import shutil
+import socket
+import socketserver
+import tempfile
+import threading
+from concurrent.futures import Executor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from core.batch import BatchOptions, run_dossier
+from core.config import ConfigError, Profile, resolve_profile
+from core.constants import (
+    DUPLICATE_POLICIES,
+    DUPLICATES_KEEP,
+    MATERIALIZE_STRATEGIES,
+    SERVE_DEFAULT_HOST,
+    SERVE_DEFAULT_MAX_CONCURRENT,
+    SERVE_DEFAULT_PORT,
+)
+from core.parallel import BACKEND_PROCESS, BACKEND_THREAD, create_executor
+
+DEFAULT_HOST = SERVE_DEFAULT_HOST
+DEFAULT_PORT = SERVE_DEFAULT_PORT
+DEFAULT_MAX_CONCURRENT = SERVE_DEFAULT_MAX_CONCURRENT
+DEFAULT_QUEUE_TIMEOUT = 30.0
+DEFAULT_MAX_UPLOAD = 512 * 1024 * 1024
+UPLOAD_CHUNK = 1024 * 1024
+TOKEN_HEADER = "X-GDLEX-Token"
+LOCAL_HOSTS = frozenset({"localhost", "127.0.0.1", "[::1]"})
+
+
+class ServerError(RuntimeError):
+    """Richiesta rifiutata dal server (codice HTTP in status)."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _warm_up() -> int:
+    return os.getpid()
+
+
+class ValidationService:
+    """Logica del server, indipendente dal trasporto: profili risolti una volta, pool condiviso, limite di concorrenza."""
+
+    def __init__(
+        self,
+        config: dict,
+        default_profile: str = "pdua_safe",
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+        backend: str = BACKEND_THREAD,
+        queue_timeout: float = DEFAULT_QUEUE_TIMEOUT,
+        max_upload: int = DEFAULT_MAX_UPLOAD,
+        version: str = "",
+        token: str | None = None,
+    ):
+        self.profiles: dict[str, Profile] = {name: resolve_profile(config, name) for name in config["profiles"]}
+        if default_profile not in self.profiles:
+            raise ConfigError(f"Profilo '{default_profile}' non trovato. Disponibili: {', '.join(sorted(self.profiles))}")
+        self.default_profile = default_profile
+        self.max_concurrent = max_concurrent
+        self.queue_timeout = queue_timeout
+        self.max_upload = max_upload
+        self.version = version
+        self.backend = backend
+        # nuovo a ogni avvio: lo conosce solo chi ha lanciato il server
+        self.token = token or secrets.token_urlsafe(32)
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._active = 0
+        self._lock = threading.Lock()
+        self.executor: Executor = create_executor(max_concurrent, backend)
+        if backend == BACKEND_PROCESS:
+            # avvia subito i processi worker: la prima richiesta non paga fork e import
+            for future in [self.executor.submit(_warm_up) for _ in range(max_concurrent)]:
+                future.result()
+
+    def health(self) -> dict:
+        return {
+            "status": "ok",
+            "version": self.version,
+            "profiles": sorted(self.profiles),
+            "active": self._active,
+            "max_concurrent": self.max_concurrent,
+            "backend": self.backend,
+        }
+
+    def authorize(self, token: str | None) -> None:
+        if token is None or not hmac.compare_digest(token.encode("utf-8"), self.token.encode("utf-8")):
+            raise ServerError(401, f"Token mancante o non valido (header {TOKEN_HEADER})")
+
+    def _profile(self, name: str | None) -> Profile:
+        name = name or self.default_profile
+        try:
+            return self.profiles[name]
+        except KeyError as exc:
+            raise ServerError(400, f"Profilo '{name}' non trovato. Disponibili: {', '.join(sorted(self.profiles))}") from exc
+
+    def run(self, operation: str, params: dict, upload: Path | None = None) -> dict:
+        """Esegue analyze/sanitize nel pool; ServerError 503 se tutti gli slot restano occupati oltre queue_timeout."""
+        if operation not in {"analyze", "sanitize"}:
+            raise ServerError(404, f"Operazione sconosciuta: {operation}")
+        profile = self._profile(params.get("profile"))
+        target = upload if upload is not None else params.get("path")
+        if not target:
+            raise ServerError(400, "Specificare 'path' o inviare il file nel corpo della richiesta")
+        output = params.get("output")
+        if operation == "sanitize" and upload is not None and not output:
+            raise ServerError(400, "Per correggere un file inviato in streaming serve 'output' (cartella sul server)")
+        materialization = params.get("materialize") or "copy"
+        if materialization not in MATERIALIZE_STRATEGIES:
+            raise ServerError(400, f"Strategia non supportata: {materialization}")
+        duplicates = params.get("duplicates") or DUPLICATES_KEEP
+        if duplicates not in DUPLICATE_POLICIES:
+            raise ServerError(400, f"Gestione duplicati non supportata: {duplicates}")
+        options = BatchOptions(
+            sanitize=operation == "sanitize",
+            dry_run=bool(params.get("dry_run")),
+            output=Path(output) if output else None,
+            incremental=bool(params.get("incremental")),
+            materialization=materialization,
+            duplicates=duplicates,
+            strict=bool(params.get("strict")),
+            include_summary=True,
+        )
+
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise ServerError(503, f"Server occupato: {self.max_concurrent} richieste già in corso")
+        with self._lock:
+            self._active += 1
+        try:
+            return self.executor.submit(run_dossier, Path(target), profile, options).result()
+        finally:
+            with self._lock:
+                self._active -= 1
+            self._slots.release()
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "gdlex-check"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def service(self) -> ValidationService:
+        return self.server.service  # type: ignore[attr-defined]
+
+    def address_string(self) -> str:
+        # sui socket Unix client_address è una stringa vuota
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format: str, *args) -> None:
+        if getattr(self.server, "verbose", False):
+            super().log_message(format, *args)
+
+    def _reply(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _check_request(self) -> None:
+        """Host locale e token di avvio, verificati prima di leggere il corpo."""
+        host = self.headers.get("Host", "")
+        name = host[: host.index("]") + 1] if host.startswith("[") and "]" in host else host.rsplit(":", 1)[0]
+        if name.lower() not in LOCAL_HOSTS:
+            raise ServerError(403, f"Host non ammesso: {host or '(mancante)'}")
+        self.service.authorize(self.headers.get(TOKEN_HEADER))
+
+    def do_GET(self) -> None:
+        try:
+            self._check_request()
+        except ServerError as exc:
+            self._reply(exc.status, {"error": str(exc)})
+            return
+        if urlsplit(self.path).path == "/health":
+            self._reply(200, self.service.health())
+        else:
+            self._reply(404, {"error": f"Endpoint sconosciuto: {self.path}"})
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        spool: Path | None = None
+        try:
+            self._check_request()
+            length = int(self.headers.get("Content-Length") or 0)
+            content_type = self.headers.get("Content-Type", "").split(";", 1)[0].strip().lower()
+            if content_type == "application/octet-stream":
+                spool, upload = self._receive_upload(params, length)
+            else:
+                if content_type != "application/json":
+                    raise ServerError(415, "Content-Type non supportato: usare application/json o application/octet-stream")
+                if length > self.service.max_upload:
+                    raise ServerError(413, "Richiesta troppo grande")
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if not isinstance(body, dict):
+                    raise ValueError("atteso un oggetto")
+                params.update(body)
+                upload = None
+            record = self.service.run(url.path.strip("/"), params, upload)
+            if upload is not None:
+                # il percorso temporaneo di spool non interessa al chiamante
+                record["input"] = upload.name
+            self._reply(200, record)
+        except ValueError as exc:
+            self.close_connection = True
+            self._reply(400, {"error": f"Richiesta non valida: {exc}"})
+        except ServerError as exc:
+            # il corpo potrebbe non essere stato letto: la connessione non è riutilizzabile
+            self.close_connection = True
+            self._reply(exc.status, {"error": str(exc)})
+        finally:
+            if spool is not None:
+                shutil.rmtree(spool, ignore_errors=True)
+
+    def _receive_upload(self, params: dict, length: int) -> tuple[Path, Path]:
+        if length > self.service.max_upload:
+            raise ServerError(413, f"File oltre il limite di {self.service.max_upload} byte")
+        name = Path(params.get("filename") or "upload.bin").name
+        if name in {"", ".", ".."}:
+            raise ServerError(400, "Nome file non valido")
+        spool = Path(tempfile.mkdtemp(prefix="gdlex_upload_"))
+        target = spool / name
+        remaining = length
+        with target.open("wb") as handle:
+            while remaining:
+                chunk = self.rfile.read(min(UPLOAD_CHUNK, remaining))
+                if not chunk:
+                    break
+                handle.write(chunk)
+                remaining -= len(chunk)
+        if remaining:
+            # connessione chiusa prima della fine: il file è troncato, non va analizzato
+            shutil.rmtree(spool, ignore_errors=True)
+            raise ServerError(400, f"Corpo della richiesta più corto di Content-Length ({length - remaining} di {length} byte)")
+        return spool, target
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def create_server(
+    service: ValidationService,
+    socket_path: Path | None = None,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    verbose: bool = False,
+) -> socketserver.BaseServer:
+    """Socket Unix (permessi 0600) se socket_path è indicato, altrimenti HTTP su host:port (port 0 = libera)."""
+    if socket_path is not None:
+        if socket_path.exists():
+            socket_path.unlink()
+        server: socketserver.BaseServer = UnixHTTPServer(str(socket_path), _Handler)
+        os.chmod(socket_path, 0o600)
+    else:
+        server = ThreadingHTTPServer((host, port), _Handler)
+        server.daemon_threads = True
+    server.service = service  # type: ignore[attr-defined]
+    server.verbose = verbose  # type: ignore[attr-defined]
+    return server
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self._socket_path = socket_path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self._socket_path)
+        self.sock = sock
+
+
+class ValidationClient:
+    """Client minimale per il server residente (solo libreria standard); token è quello stampato all'avvio."""
+
+    def __init__(
+        self,
+        socket_path: Path | None = None,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        timeout: float = 300.0,
+        token: str = "",
+    ):
+        self.socket_path = socket_path
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.token = token
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self.socket_path is not None:
+            return _UnixHTTPConnection(str(self.socket_path), self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _request(self, method: str, path: str, body: bytes | None = None, content_type: str = "application/json") -> dict:
+        conn = self._connection()
+        try:
+            headers = {TOKEN_HEADER: self.token}
+            if body is not None:
+                headers["Content-Type"] = content_type
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            payload = json.loads(response.read() or b"{}")
+        finally:
+            conn.close()
+        if response.status != 200:
+            raise ServerError(response.status, payload.get("error", response.reason))
+        return payload
+
+    def health(self) -> dict:
+        return self._request("GET", "/health")
+
+    def analyze(self, path: Path | None = None, data: bytes | None = None, filename: str | None = None, profile: str | None = None) -> dict:
+        """Analizza un percorso visibile al server oppure i byte di un file (data + filename)."""
+        if data is not None:
+            query = urlencode({key: value for key, value in {"filename": filename, "profile": profile}.items() if value})
+            return self._request("POST", f"/analyze?{query}", data, "application/octet-stream")
+        return self._request("POST", "/analyze", json.dumps({"path": str(path), "profile": profile}).encode("utf-8"))
+
+    def sanitize(self, path: Path, output: Path | None = None, profile: str | None = None, **options) -> dict:
+        params = {"path": str(path), "output": str(output) if output else None, "profile": profile, **options}
+        return self._request("POST", "/sanitize", json.dumps(params).encode("utf-8"))
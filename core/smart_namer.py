@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 import re
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 
 from core.normalizer import is_filename_valid, sanitize_filename
@@ -22,7 +25,58 @@ def classify_filename(name: str) -> str | None:
 
 
 
-def ensure_unique(nameset: set[str], candidate: str) -> str:
+class NameAllocator:
+    """Insieme di nomi già assegnati che ricorda, per stem ed estensione, il prossimo suffisso _NN libero.
+
+    Assegna gli stessi nomi della ricerca lineare di ensure_unique su un set, ma senza ripartire da _02
+    a ogni collisione. case_insensitive: "Atto.pdf" e "atto.PDF" collidono (destinazioni NTFS, OneDrive).
+    """
+
+    __slots__ = ("case_insensitive", "_used", "_next")
+
+    def __init__(self, names: Iterable[str] = (), case_insensitive: bool = False):
+        self.case_insensitive = case_insensitive
+        self._used: set[str] = set()
+        self._next: dict[tuple[str, str], int] = {}
+        for name in names:
+            self.add(name)
+
+    def _key(self, name: str) -> str:
+        return name.lower() if self.case_insensitive else name
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self._key(name) in self._used
+
+    def __len__(self) -> int:
+        return len(self._used)
+
+    def add(self, name: str) -> None:
+        self._used.add(self._key(name))
+
+    def allocate(self, candidate: str) -> str:
+        key = self._key(candidate)
+        if key not in self._used:
+            self._used.add(key)
+            return candidate
+        path = Path(candidate)
+        stem, ext = path.stem, path.suffix
+        slot = (self._key(stem), self._key(ext))
+        # i nomi non vengono mai rilasciati: i suffissi sotto quello ricordato restano occupati
+        idx = self._next.get(slot, 2)
+        while True:
+            alt = f"{stem}_{idx:02d}{ext}"
+            alt_key = self._key(alt)
+            if alt_key not in self._used:
+                break
+            idx += 1
+        self._next[slot] = idx + 1
+        self._used.add(alt_key)
+        return alt
+
+
+def ensure_unique(nameset: set[str] | NameAllocator, candidate: str) -> str:
+    if isinstance(nameset, NameAllocator):
+        return nameset.allocate(candidate)
     if candidate not in nameset:
         nameset.add(candidate)
         return candidate
@@ -48,6 +102,12 @@ def _signed_suffix(stem: str) -> str:
     return ""
 
 
+@lru_cache(maxsize=64)
+def _output_prefix_len(output_dir: str | Path) -> int:
+    """Caratteri che la cartella di output aggiunge al percorso di un file, separatore compreso."""
+    return len(str(Path(output_dir) / "_")) - 1
+
+
 def smart_rename(name: str, ext: str, opts: dict, context: dict | None = None) -> tuple[str, list[str]]:
     enabled = bool(opts.get("enabled", True))
     max_filename_len = int(opts.get("max_filename_len", 60))
@@ -64,7 +124,8 @@ def smart_rename(name: str, ext: str, opts: dict, context: dict | None = None) -
     invalid_name = not is_filename_valid(original, max_len=max_filename_len)
 
     output_dir = context.get("output_dir") if context else None
-    path_too_long = bool(output_dir and len(str(Path(output_dir) / original)) > max_output_path_len)
+    prefix_len = _output_prefix_len(output_dir) if output_dir else 0
+    path_too_long = bool(output_dir and prefix_len + len(original) > max_output_path_len)
 
     if not enabled:
         return sanitize_filename(original, max_len=max_filename_len), []
@@ -92,15 +153,43 @@ def smart_rename(name: str, ext: str, opts: dict, context: dict | None = None) -
 
     candidate = sanitize_filename(f"{candidate_stem}{extension}", max_len=max_filename_len)
 
-    if output_dir and len(str(Path(output_dir) / candidate)) > max_output_path_len:
+    if output_dir and prefix_len + len(candidate) > max_output_path_len:
         base = Path(candidate).stem
         extn = Path(candidate).suffix
-        while len(str(Path(output_dir) / candidate)) > max_output_path_len and len(base) > 12:
-            base = base[:-1]
+        if len(base) > 12:
+            # taglio calcolato in un colpo: stesso risultato del vecchio ciclo un carattere alla volta
+            base = base[: max(12, max_output_path_len - prefix_len - len(extn))]
             candidate = f"{base}{extn}"
-        if len(str(Path(output_dir) / candidate)) > max_output_path_len:
+        if prefix_len + len(candidate) > max_output_path_len:
             candidate = sanitize_filename(candidate, max_len=max(20, max_filename_len - 10))
         reasons.append("path_too_long_mitigated")
 
     candidate = candidate.replace("_signed_signed", "_signed").replace("_firmato_firmato", "_firmato")
     return candidate, reasons
+
+
+@dataclass(frozen=True, slots=True)
+class PlannedName:
+    source: Path
+    target: str
+    reasons: tuple[str, ...] = ()
+
+    def to_dict(self) -> dict:
+        return {"source": str(self.source), "target": self.target, "reasons": list(self.reasons)}
+
+
+def plan_names(sources: Sequence[Path], output_dir: Path, opts: dict, max_len: int = 80) -> list[PlannedName]:
+    """Nomi di destinazione dell'intero fascicolo, decisi prima di qualsiasi scrittura.
+
+    Le collisioni sono risolte nell'ordine di sources (quello di scansione, stabile): a parità di input
+    e opzioni il piano è identico, e la fase di scrittura può procedere in parallelo.
+    """
+    allocator = NameAllocator(case_insensitive=bool(opts.get("case_insensitive_names", False)))
+    context = {"output_dir": output_dir}
+    plan: list[PlannedName] = []
+    for source in sources:
+        candidate, reasons = smart_rename(source.name, source.suffix, opts, context)
+        if not candidate:
+            candidate = sanitize_filename(source.name, max_len=max_len)
+        plan.append(PlannedName(source, allocator.allocate(candidate), tuple(reasons)))
+    return plan
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+STAGE_SCAN = "scan"
+STAGE_VALIDATE = "validate"
+STAGE_COPY = "copy"
+STAGE_ZIP_REBUILD = "zip_rebuild"
+STAGE_HASH = "hash"
+STAGE_REPORT = "report"
+STAGES = (STAGE_SCAN, STAGE_VALIDATE, STAGE_COPY, STAGE_ZIP_REBUILD, STAGE_HASH, STAGE_REPORT)
+
+DEFAULT_SLOWEST = 10
+
+
+@dataclass(slots=True)
+class StageStats:
+    seconds: float = 0.0
+    count: int = 0
+    bytes: int = 0
+
+
+class _Span:
+    __slots__ = ("_timings", "_stage", "_path", "bytes", "count", "_started")
+
+    def __init__(self, timings: StageTimings, stage: str, path: Path | None, nbytes: int):
+        self._timings = timings
+        self._stage = stage
+        self._path = path
+        self.bytes = nbytes
+        self.count = 1
+        self._started = 0.0
+
+    def __enter__(self) -> _Span:
+        self._started = self._timings.clock()
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self._timings.add(self._stage, self._timings.clock() - self._started, self.bytes, self._path, self.count)
+
+
+class StageTimings:
+    """Tempi, conteggi e byte per fase di analyze()/sanitize(), più i file più lenti.
+
+    I worker di scrittura dell'output registrano le proprie fasi da altri thread: aggiornamenti e letture
+    passano tutti dal lock, quindi il rapporto si può produrre anche mentre l'operazione è in corso.
+    """
+
+    enabled = True
+
+    def __init__(self, slowest: int = DEFAULT_SLOWEST, clock: Callable[[], float] = time.perf_counter):
+        self.clock = clock
+        self.slowest = slowest
+        self.stages: dict[str, StageStats] = {}
+        self._per_file: dict[Path, dict[str, float]] = {}
+        self._started = clock()
+        self._lock = threading.Lock()
+
+    def stage(self, name: str, path: Path | None = None, nbytes: int = 0) -> _Span:
+        """Context manager che misura una fase; byte e conteggio si possono impostare dentro il blocco."""
+        return _Span(self, name, path, nbytes)
+
+    def add(self, name: str, seconds: float, nbytes: int = 0, path: Path | None = None, count: int = 1) -> None:
+        with self._lock:
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = self.stages[name] = StageStats()
+            stats.seconds += seconds
+            stats.count += count
+            stats.bytes += nbytes
+            if path is not None:
+                per_stage = self._per_file.setdefault(path, {})
+                per_stage[name] = per_stage.get(name, 0.0) + seconds
+
+    def slowest_files(self) -> list[tuple[Path, float, dict[str, float]]]:
+        with self._lock:
+            snapshot = [(path, dict(per_stage)) for path, per_stage in self._per_file.items()]
+        ranked = sorted(snapshot, key=lambda item: sum(item[1].values()), reverse=True)
+        return [(path, sum(per_stage.values()), per_stage) for path, per_stage in ranked[: self.slowest]]
+
+    def to_dict(self) -> dict:
+        stages = {}
+        with self._lock:
+            for name in sorted(self.stages, key=lambda key: STAGES.index(key) if key in STAGES else len(STAGES)):
+                stats = self.stages[name]
+                stages[name] = {
+                    "seconds": round(stats.seconds, 6),
+                    "count": stats.count,
+                    "bytes": stats.bytes,
+                    "mb_s": round(stats.bytes / (1024 * 1024) / stats.seconds, 1) if stats.bytes and stats.seconds else None,
+                }
+        return {
+            "total_seconds": round(self.clock() - self._started, 6),
+            "stages": stages,
+            "slowest_files": [
+                {"path": str(path), "seconds": round(seconds, 6), "stages": {k: round(v, 6) for k, v in per_stage.items()}}
+                for path, seconds, per_stage in self.slowest_files()
+            ],
+        }
+
+
+class _NullSpan:
+    __slots__ = ()
+    bytes = 0
+    count = 0
+
+    def __enter__(self) -> _NullSpan:
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        return None
+
+    def __setattr__(self, _name, _value) -> None:
+        return None
+
+
+class _NullTimings:
+    """Strumentazione disattivata: nessuna lettura dell'orologio, nessuna allocazione per fase."""
+
+    enabled = False
+    _span = _NullSpan()
+
+    def stage(self, name: str, path: Path | None = None, nbytes: int = 0) -> _NullSpan:
+        return self._span
+
+    def add(self, name: str, seconds: float, nbytes: int = 0, path: Path | None = None, count: int = 1) -> None:
+        return None
+
+
+NULL_TIMINGS = _NullTimings()
+
+
+def format_timings(data: dict) -> list[str]:
+    """Righe leggibili per la CLI a partire da StageTimings.to_dict()."""
+    lines = [f"Tempi per fase (totale {data['total_seconds']:.3f}s):"]
+    for name, stats in data["stages"].items():
+        line = f"  {name:<12} {stats['seconds']:>9.3f}s  {stats['count']:>6} op"
+        if stats["bytes"]:
+            line += f"  {stats['bytes'] / (1024 * 1024):>9.1f} MB"
+            if stats["mb_s"] is not None:
+                line += f"  {stats['mb_s']:>8.1f} MB/s"
+        lines.append(line)
+    if data["slowest_files"]:
+        lines.append("File più lenti:")
+        for row in data["slowest_files"]:
+            detail = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in row["stages"].items())
+            lines.append(f"  {row['seconds']:>9.3f}s  {row['path']} ({detail})")
+    return lines
@@ -2,12 +2,20 @@ from __future__ import annotations
 
 import io
 import zipfile
+import zlib
+from collections.abc import Iterator
+from dataclasses import dataclass
 from pathlib import Path
+from typing import BinaryIO
 
+from core.config import Profile, ZipLimits, compile_profile
 from core.models import FileAnalysis, Issue
 from core.normalizer import is_filename_valid, sanitize_filename
 
 MACOS_JUNK = {"__MACOSX", ".DS_Store", "Thumbs.db"}
+ZIP_SPOOL_CHUNK = 1024 * 1024
+# sotto questa dimensione un rapporto alto è normale (testo, PDF vuoti) e non viene considerato
+ZIP_RATIO_MIN_BYTES = 1024 * 1024
 
 
 def file_type(path: Path) -> str:
@@ -22,51 +30,132 @@ def detect_status(issues: list[Issue]) -> str:
     return "ok"
 
 
-def validate_pdf(path: Path) -> list[Issue]:
+PDF_SCAN_CHUNK = 1024 * 1024
+PDF_TAIL_WINDOW = 2048
+PDF_SCAN_MARKERS = (b"/Encrypt", b"/ByteRange", b"/Contents")
+
+
+class _MarkerScanner:
+    """Cerca marker su chunk consecutivi: memoria limitata a un chunk + marker più lungo."""
+
+    def __init__(self, markers: tuple[bytes, ...]):
+        self.found: set[bytes] = set()
+        self.pending = set(markers)
+        self._overlap = max(len(marker) for marker in markers) - 1
+        self._carry = b""
+
+    def feed(self, chunk: bytes) -> None:
+        if not self.pending:
+            return
+        # solo la giunzione tra chunk viene ricopiata, il resto è cercato in place
+        seam = self._carry + chunk[: self._overlap]
+        for marker in tuple(self.pending):
+            if marker in chunk or marker in seam:
+                self.found.add(marker)
+                self.pending.discard(marker)
+        if self._overlap:
+            overlap = self._overlap
+            self._carry = chunk[-overlap:] if len(chunk) >= overlap else (self._carry + chunk)[-overlap:]
+
+
+def _scan_markers(handle: BinaryIO, markers: tuple[bytes, ...], chunk_size: int = PDF_SCAN_CHUNK) -> set[bytes]:
+    scanner = _MarkerScanner(markers)
+    while scanner.pending:
+        chunk = handle.read(chunk_size)
+        if not chunk:
+            break
+        scanner.feed(chunk)
+    return scanner.found
+
+
+class PdfStreamScanner:
+    """Validazione PDF alimentata dall'esterno (es. durante la copia): stessi esiti di validate_pdf."""
+
+    def __init__(self) -> None:
+        self.header = b""
+        self.tail = b""
+        self._markers = _MarkerScanner(PDF_SCAN_MARKERS)
+
+    def feed(self, chunk: bytes) -> None:
+        if len(self.header) < 4:
+            self.header += chunk[: 4 - len(self.header)]
+        if len(chunk) >= PDF_TAIL_WINDOW:
+            self.tail = chunk[-PDF_TAIL_WINDOW:]
+        else:
+            self.tail = (self.tail + chunk)[-PDF_TAIL_WINDOW:]
+        self._markers.feed(chunk)
+
+    def issues(self) -> list[Issue]:
+        return _pdf_issues(self.header, self.tail, self._markers.found)
+
+
+def _pdf_issues(header: bytes, tail: bytes, markers: set[bytes]) -> list[Issue]:
     issues: list[Issue] = []
-    blob = path.read_bytes()
-    if not blob.startswith(b"%PDF"):
+    if not header.startswith(b"%PDF"):
         issues.append(Issue("error", "pdf_header", "Header PDF non valido."))
         return issues
 
-    if b"%%EOF" not in blob[-2048:]:
+    if b"%%EOF" not in tail:
         issues.append(Issue("error", "pdf_integrity", "Trailer EOF PDF non trovato; file potenzialmente corrotto."))
 
-    if b"/Encrypt" in blob:
+    if b"/Encrypt" in markers:
         issues.append(Issue("error", "pdf_encrypted", "PDF cifrato/non apribile senza password."))
 
-    if b"/ByteRange" in blob and b"/Contents" in blob:
+    if b"/ByteRange" in markers and b"/Contents" in markers:
         issues.append(Issue("info", "pades_detected", "Possibile firma PAdES rilevata."))
 
     return issues
 
 
-def _validate_zip_entries(names: list[str], allowed_exts: set[str], warning_exts: set[str]) -> list[Issue]:
+def validate_pdf(path: Path, chunk_size: int = PDF_SCAN_CHUNK) -> list[Issue]:
+    with path.open("rb") as handle:
+        header = handle.read(4)
+        if not header.startswith(b"%PDF"):
+            return _pdf_issues(header, b"", set())
+
+        size = handle.seek(0, io.SEEK_END)
+        handle.seek(max(0, size - PDF_TAIL_WINDOW))
+        tail = handle.read(PDF_TAIL_WINDOW)
+
+        handle.seek(0)
+        markers = _scan_markers(handle, PDF_SCAN_MARKERS, chunk_size)
+    return _pdf_issues(header, tail, markers)
+
+
+def _is_junk(name: str) -> bool:
+    return any(name.startswith(f"{junk}/") or name == junk for junk in MACOS_JUNK)
+
+
+def _validate_zip_entries(
+    names: list[str], allowed_exts: frozenset[str], warning_exts: frozenset[str], prefix: str = ""
+) -> list[Issue]:
+    """prefix: percorso dell'archivio annidato ("esterno.zip/interno.zip/"), vuoto per lo ZIP principale."""
     issues: list[Issue] = []
     has_pades = False
     has_unsigned_pdf = False
 
     for name in names:
-        if any(name.startswith(f"{junk}/") or name == junk for junk in MACOS_JUNK):
-            issues.append(Issue("error", "zip_junk", f"Elemento non ammesso nello ZIP: {name}"))
+        if _is_junk(name):
+            issues.append(Issue("error", "zip_junk", f"Elemento non ammesso nello ZIP: {prefix}{name}"))
             continue
         if name.startswith("~$"):
-            issues.append(Issue("error", "zip_temp", f"File temporaneo non ammesso: {name}"))
+            issues.append(Issue("error", "zip_temp", f"File temporaneo non ammesso: {prefix}{name}"))
             continue
         if "/" in name.strip("/"):
-            issues.append(Issue("error", "zip_nested", f"ZIP non flat (contiene cartelle): {name}"))
+            issues.append(Issue("error", "zip_nested", f"ZIP non flat (contiene cartelle): {prefix}{name}"))
         base = Path(name).name
+        shown = f"{prefix}{name}" if prefix else base
         if base.count(".") > 1:
-            issues.append(Issue("error", "zip_double_ext", f"Doppia estensione: {base}"))
+            issues.append(Issue("error", "zip_double_ext", f"Doppia estensione: {shown}"))
 
         ext = Path(base).suffix.lower().lstrip(".")
         if ext in warning_exts:
-            issues.append(Issue("warning", "zip_warning_ext", f"Formato nello ZIP ammesso con warning: {base}"))
+            issues.append(Issue("warning", "zip_warning_ext", f"Formato nello ZIP ammesso con warning: {shown}"))
         elif ext not in allowed_exts:
-            issues.append(Issue("error", "zip_ext_forbidden", f"Formato non ammesso nello ZIP: {base}"))
+            issues.append(Issue("error", "zip_ext_forbidden", f"Formato non ammesso nello ZIP: {shown}"))
 
         if not is_filename_valid(base):
-            issues.append(Issue("warning", "zip_name", f"Nome nello ZIP da normalizzare: {base}"))
+            issues.append(Issue("warning", "zip_name", f"Nome nello ZIP da normalizzare: {shown}"))
 
         if ext == "pdf" and "signed" in base.lower():
             has_pades = True
@@ -74,25 +163,147 @@ def _validate_zip_entries(names: list[str], allowed_exts: set[str], warning_exts
             has_unsigned_pdf = True
 
     if has_pades and has_unsigned_pdf:
-        issues.append(Issue("warning", "zip_mixed_pades", "PDF firmati e non firmati nello stesso ZIP."))
+        where = f" ({prefix.rstrip('/')})" if prefix else ""
+        issues.append(Issue("warning", "zip_mixed_pades", f"PDF firmati e non firmati nello stesso ZIP{where}."))
     return issues
 
 
-def validate_zip(path: Path, allowed_exts: set[str], warning_exts: set[str]) -> list[Issue]:
+class ZipLimitExceeded(ValueError):
+    """Archivio oltre i limiti di sicurezza del profilo (possibile ZIP bomb)."""
+
+    def issue(self) -> Issue:
+        return Issue("error", "zip_bomb", f"{self} Archivio non decompresso.")
+
+
+@dataclass(slots=True)
+class ZipGuard:
+    """Consumo cumulato di un albero di archivi rispetto ai ZipLimits; breached resta True dopo il primo superamento."""
+
+    limits: ZipLimits
+    entries: int = 0
+    declared_bytes: int = 0
+    streamed_bytes: int = 0
+    breached: bool = False
+
+    def _fail(self, message: str) -> ZipLimitExceeded:
+        self.breached = True
+        return ZipLimitExceeded(message)
+
+    def _ratio_exceeded(self, size: int, info: zipfile.ZipInfo) -> bool:
+        return size >= ZIP_RATIO_MIN_BYTES and size > self.limits.max_ratio * max(info.compress_size, 1)
+
+    def check_directory(self, infos: list[zipfile.ZipInfo], prefix: str = "") -> None:
+        """Controllo sui metadati della central directory, prima di decomprimere qualsiasi entry."""
+        limits = self.limits
+        where = f" ({prefix.rstrip('/')})" if prefix else ""
+        self.entries += len(infos)
+        if self.entries > limits.max_entries:
+            raise self._fail(f"ZIP con più di {limits.max_entries} entry{where}.")
+        for info in infos:
+            if self._ratio_exceeded(info.file_size, info):
+                ratio = info.file_size / max(info.compress_size, 1)
+                raise self._fail(f"Rapporto di compressione sospetto ({ratio:.0f}:1): {prefix}{info.filename}.")
+            self.declared_bytes += info.file_size
+        if self.declared_bytes > limits.max_total_bytes:
+            raise self._fail(f"ZIP oltre {limits.max_total_bytes} byte decompressi{where}.")
+
+    def stream(self, member: BinaryIO, info: zipfile.ZipInfo, prefix: str = "", chunk_size: int = ZIP_SPOOL_CHUNK) -> Iterator[bytes]:
+        """Chunk decompressi di un'entry, ricontrollando i limiti sui byte effettivi (le dimensioni dichiarate possono mentire)."""
+        produced = 0
+        while chunk := member.read(chunk_size):
+            produced += len(chunk)
+            self.streamed_bytes += len(chunk)
+            if produced > info.file_size:
+                raise self._fail(f"Entry oltre la dimensione dichiarata ({info.file_size} byte): {prefix}{info.filename}.")
+            if self._ratio_exceeded(produced, info):
+                raise self._fail(f"Rapporto di compressione sospetto: {prefix}{info.filename}.")
+            if self.streamed_bytes > self.limits.max_total_bytes:
+                raise self._fail(f"ZIP oltre {self.limits.max_total_bytes} byte decompressi.")
+            yield chunk
+
+
+def _spool_member(zf: zipfile.ZipFile, info: zipfile.ZipInfo, guard: ZipGuard, prefix: str) -> io.BytesIO | None:
+    """Contenuto di un'entry in memoria (ZipFile ha bisogno di seek); None oltre max_inner_bytes decompressi."""
+    if info.file_size > guard.limits.max_inner_bytes:
+        return None
+    buffer = io.BytesIO()
+    with zf.open(info) as member:
+        # lo stream non supera la dimensione dichiarata, già confrontata con il limite
+        for chunk in guard.stream(member, info, prefix):
+            buffer.write(chunk)
+    buffer.seek(0)
+    return buffer
+
+
+def _validate_zip_tree(
+    zf: zipfile.ZipFile,
+    allowed_exts: frozenset[str],
+    warning_exts: frozenset[str],
+    prefix: str,
+    depth: int,
+    guard: ZipGuard,
+) -> list[Issue]:
+    try:
+        guard.check_directory(zf.infolist(), prefix)
+    except ZipLimitExceeded as exc:
+        return [exc.issue()]
+    limits = guard.limits
+    issues = _validate_zip_entries(zf.namelist(), allowed_exts, warning_exts, prefix)
+    for info in zf.infolist():
+        if guard.breached:
+            break
+        if info.is_dir() or _is_junk(info.filename) or not info.filename.lower().endswith(".zip"):
+            continue
+        entry = f"{prefix}{info.filename}"
+        if depth >= limits.max_depth:
+            issues.append(
+                Issue("warning", "zip_depth_limit", f"ZIP annidato oltre {limits.max_depth} livelli, contenuto non verificato: {entry}")
+            )
+            continue
+        try:
+            spooled = _spool_member(zf, info, guard, prefix)
+            if spooled is None:
+                issues.append(
+                    Issue(
+                        "warning",
+                        "zip_inner_too_large",
+                        f"ZIP annidato oltre {limits.max_inner_bytes} byte, contenuto non verificato: {entry}",
+                    )
+                )
+                continue
+            with zipfile.ZipFile(spooled) as inner:
+                issues.extend(_validate_zip_tree(inner, allowed_exts, warning_exts, f"{entry}/", depth + 1, guard))
+        except ZipLimitExceeded as exc:
+            issues.append(exc.issue())
+        except (zipfile.BadZipFile, zipfile.LargeZipFile, zlib.error, NotImplementedError, RuntimeError, EOFError, ValueError):
+            # RuntimeError: entry cifrata; NotImplementedError: metodo di compressione non supportato; zlib.error: deflate corrotto
+            issues.append(Issue("error", "zip_corrupt", f"Archivio ZIP annidato corrotto o illeggibile: {entry}"))
+    return issues
+
+
+def validate_zip(path: Path, allowed_exts: frozenset[str], warning_exts: frozenset[str], limits: ZipLimits | None = None) -> list[Issue]:
+    """Controlla le entry e, ricorsivamente fino a limits.max_depth livelli, gli ZIP annidati (letti in memoria, mai estratti).
+
+    Un superamento dei limiti anti ZIP bomb produce l'issue zip_bomb e interrompe la decompressione.
+    """
     issues: list[Issue] = []
     try:
         with zipfile.ZipFile(path, "r") as zf:
-            names = zf.namelist()
-            issues.extend(_validate_zip_entries(names, allowed_exts, warning_exts))
+            issues.extend(_validate_zip_tree(zf, allowed_exts, warning_exts, "", 0, ZipGuard(limits or ZipLimits())))
     except zipfile.BadZipFile:
         issues.append(Issue("error", "zip_corrupt", "Archivio ZIP corrotto."))
     return issues
 
 
-def validate_path(path: Path, profile: dict) -> FileAnalysis:
-    allowed = set(profile["allowed_formats"])
-    warnings = set(profile.get("warning_formats", []))
-    max_len = int(profile.get("filename", {}).get("max_length", 80))
+def validate_path(path: Path, profile: Profile | dict, pdf_scan: PdfStreamScanner | None = None, content: bool = True) -> FileAnalysis:
+    """pdf_scan: scanner già alimentato con il contenuto del file, evita di rileggerlo.
+
+    content=False limita i controlli a nome ed estensione (nessuna lettura del file).
+    """
+    profile = compile_profile(profile)
+    allowed = profile.allowed_formats
+    warnings = profile.warning_formats
+    max_len = profile.max_filename_length
 
     issues: list[Issue] = []
     base = path.name
@@ -106,10 +317,12 @@ def validate_path(path: Path, profile: dict) -> FileAnalysis:
     if not is_filename_valid(base, max_len=max_len):
         issues.append(Issue("warning", "filename_normalize", "Nome file da normalizzare."))
 
-    if ext == "pdf":
-        issues.extend(validate_pdf(path))
+    if not content:
+        pass
+    elif ext == "pdf":
+        issues.extend(pdf_scan.issues() if pdf_scan is not None else validate_pdf(path))
     elif ext == "zip":
-        issues.extend(validate_zip(path, allowed, warnings))
+        issues.extend(validate_zip(path, allowed, warnings, profile.zip_limits))
 
     status = detect_status(issues)
     return FileAnalysis(
@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import errno
+import os
+import select
+import stat
+import struct
+import sys
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+from core.config import Profile, compile_profile
+from core.constants import DEFAULT_DEBOUNCE, DEFAULT_POLL_INTERVAL, WATCH_AUTO, WATCH_BACKENDS, WATCH_INOTIFY, WATCH_POLL
+from core.models import FileAnalysis
+from core.parallel import BACKEND_THREAD, iter_ordered
+from core.progress import CancelToken
+from core.sanitizer import OUTCOME_NOT_RUN, is_ignored_input, iter_analyze, scan_input_tree
+from core.validators import validate_path
+
+EVENT_ADDED = "added"
+EVENT_CHANGED = "changed"
+EVENT_REMOVED = "removed"
+
+# linux/inotify.h
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+_WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+@dataclass(slots=True)
+class WatchUpdate:
+    event: str  # added | changed | removed
+    path: Path
+    analysis: FileAnalysis | None = None
+
+    def to_dict(self) -> dict:
+        return {"event": self.event, "path": str(self.path), "result": self.analysis.to_dict() if self.analysis else None}
+
+
+def _identity(path: Path) -> tuple[int, int] | None:
+    try:
+        info = path.stat()
+    except OSError:
+        return None
+    if not stat.S_ISREG(info.st_mode):
+        return None
+    return info.st_size, info.st_mtime_ns
+
+
+class PollingSource:
+    """Fallback portabile: confronta a intervalli regolari dimensione e mtime dei file."""
+
+    def __init__(self, root: Path, interval: float = DEFAULT_POLL_INTERVAL, clock: Callable[[], float] = time.monotonic):
+        self.root = root
+        self.interval = interval
+        self._clock = clock
+        self._snapshot = self._take_snapshot()
+        self._next_poll = clock() + interval
+
+    def _take_snapshot(self) -> dict[Path, tuple[int, int] | None]:
+        return {path: _identity(path) for path, ignored in scan_input_tree(self.root) if not ignored}
+
+    def read(self, timeout: float) -> set[Path]:
+        wait = self._next_poll - self._clock()
+        if wait > timeout:
+            time.sleep(max(timeout, 0.0))
+            return set()
+        if wait > 0:
+            time.sleep(wait)
+        self._next_poll = self._clock() + self.interval
+        current = self._take_snapshot()
+        previous, self._snapshot = self._snapshot, current
+        return {path for path in previous.keys() | current.keys() if previous.get(path) != current.get(path)}
+
+    def close(self) -> None:
+        return None
+
+
+class InotifySource:
+    """Eventi inotify (solo Linux) via ctypes: una watch per cartella, nessuna scansione periodica."""
+
+    def __init__(self, root: Path):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify disponibile solo su Linux")
+        # import differito: ctypes.util porta con sé subprocess, inutile a chi non usa --watch
+        import ctypes
+        import ctypes.util
+
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self._get_errno = ctypes.get_errno
+        self.root = root
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 non riuscita")
+        self._dirs: dict[int, Path] = {}
+        try:
+            self._add_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_watch(self, directory: Path) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            code = self._get_errno()
+            # cartella sparita o illeggibile nel frattempo: si ignora. ENOSPC (fs.inotify.max_user_watches
+            # esaurito) o errori sulla radice risalgono, e con backend auto si passa al polling
+            if directory == self.root or code not in {errno.ENOENT, errno.EACCES, errno.ENOTDIR}:
+                raise OSError(code, f"inotify_add_watch non riuscita: {directory}")
+            return
+        self._dirs[wd] = directory
+
+    def _add_tree(self, directory: Path) -> None:
+        if is_ignored_input(directory):
+            return
+        self._add_watch(directory)
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    subdirs = [Path(entry.path) for entry in entries if entry.is_dir(follow_symlinks=False)]
+            except OSError:
+                continue
+            for subdir in subdirs:
+                if not is_ignored_input(subdir):
+                    self._add_watch(subdir)
+                    stack.append(subdir)
+
+    def _drop_tree(self, directory: Path) -> None:
+        for wd, watched in list(self._dirs.items()):
+            if watched == directory or directory in watched.parents:
+                self._libc.inotify_rm_watch(self._fd, wd)
+                del self._dirs[wd]
+
+    def read(self, timeout: float) -> set[Path]:
+        ready, _, _ = select.select([self._fd], [], [], max(timeout, 0.0))
+        if not ready:
+            return set()
+        dirty: set[Path] = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                raw_name = data[offset + _EVENT_HEADER.size : offset + _EVENT_HEADER.size + length].rstrip(b"\0")
+                offset += _EVENT_HEADER.size + length
+                if mask & IN_Q_OVERFLOW:
+                    # eventi persi: si ricontrolla tutto l'albero
+                    dirty.add(self.root)
+                    continue
+                directory = self._dirs.get(wd)
+                if mask & IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    continue
+                if directory is None:
+                    continue
+                path = directory / os.fsdecode(raw_name) if raw_name else directory
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    self._add_tree(path)
+                elif mask & IN_ISDIR and mask & IN_MOVED_FROM:
+                    # le watch seguono l'inode: quelle del sottoalbero spostato riporterebbero percorsi vecchi
+                    self._drop_tree(path)
+                dirty.add(path)
+        return dirty
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def open_change_source(root: Path, backend: str = WATCH_AUTO, poll_interval: float = DEFAULT_POLL_INTERVAL):
+    if backend not in WATCH_BACKENDS:
+        raise ValueError(f"Backend watch non supportato: {backend} (disponibili: {', '.join(WATCH_BACKENDS)})")
+    if backend != WATCH_POLL:
+        try:
+            return InotifySource(root)
+        except (OSError, AttributeError):
+            # AttributeError: libc senza simboli inotify (es. musl datata, macOS)
+            if backend == WATCH_INOTIFY:
+                raise
+    return PollingSource(root, poll_interval)
+
+
+class DossierWatcher:
+    """Indice in memoria delle FileAnalysis di una cartella, aggiornato solo per i file creati o modificati.
+
+    Gli eventi su uno stesso percorso vengono raggruppati: un file è rivalidato solo dopo debounce secondi
+    senza nuove modifiche (copie lente da file server, salvataggi in più passi).
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        profile: Profile | dict,
+        debounce: float = DEFAULT_DEBOUNCE,
+        backend: str = WATCH_AUTO,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        jobs: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.root = root
+        self.profile = compile_profile(profile)
+        self.debounce = debounce
+        self.backend = backend
+        self.poll_interval = poll_interval
+        self.jobs = jobs
+        self.index: dict[Path, FileAnalysis] = {}
+        self._identities: dict[Path, tuple[int, int] | None] = {}
+        self._pending: dict[Path, float] = {}
+        self._clock = clock
+        self._source = None
+
+    def start(self) -> Iterator[WatchUpdate]:
+        """Analisi iniziale completa; la sorgente eventi è aperta prima, così nessuna modifica va persa."""
+        self._source = open_change_source(self.root, self.backend, self.poll_interval)
+        for item in iter_analyze(self.root, self.profile, jobs=self.jobs, backend=BACKEND_THREAD):
+            self.index[item.source] = item
+            self._identities[item.source] = _identity(item.source)
+            yield WatchUpdate(EVENT_ADDED, item.source, item)
+
+    @property
+    def source_name(self) -> str:
+        return WATCH_INOTIFY if isinstance(self._source, InotifySource) else WATCH_POLL
+
+    def step(self, timeout: float = 0.2) -> list[WatchUpdate]:
+        """Attende eventi per al massimo timeout secondi e rivalida i percorsi stabili da almeno debounce."""
+        if self._source is None:
+            raise RuntimeError("DossierWatcher.start() non ancora eseguito")
+        wait = timeout
+        if self._pending:
+            oldest = min(self._pending.values())
+            wait = min(timeout, max(0.0, oldest + self.debounce - self._clock()))
+        dirty = self._source.read(wait)
+        now = self._clock()
+        for path in dirty:
+            self._pending[path] = now
+        ready = sorted(path for path, seen in self._pending.items() if now - seen >= self.debounce)
+        for path in ready:
+            del self._pending[path]
+        return self._refresh(ready) if ready else []
+
+    def _candidates(self, paths: list[Path]) -> list[Path]:
+        candidates: set[Path] = set()
+        for path in paths:
+            if path.is_dir() and not path.is_symlink():
+                # cartella creata, spostata o overflow della coda eventi: si visita solo quel sottoalbero
+                candidates.update(item for item, ignored in scan_input_tree(path) if not ignored)
+            else:
+                candidates.add(path)
+            if path not in self.index:
+                # cartella rimossa o rinominata: i file indicizzati sotto di lei vanno verificati
+                candidates.update(indexed for indexed in self.index if path in indexed.parents)
+        return sorted(path for path in candidates if not is_ignored_input(path))
+
+    def _refresh(self, paths: list[Path]) -> list[WatchUpdate]:
+        updates: list[WatchUpdate] = []
+        stale: list[tuple[Path, tuple[int, int]]] = []
+        for path in self._candidates(paths):
+            identity = _identity(path)
+            if identity is None:
+                if self.index.pop(path, None) is not None:
+                    self._identities.pop(path, None)
+                    updates.append(WatchUpdate(EVENT_REMOVED, path))
+            elif self._identities.get(path) != identity:
+                stale.append((path, identity))
+        fresh = iter_ordered(validate_path, [path for path, _ in stale], self.profile, jobs=self.jobs)
+        for (path, identity), item in zip(stale, fresh, strict=True):
+            item.correction_outcome = OUTCOME_NOT_RUN
+            event = EVENT_CHANGED if path in self.index else EVENT_ADDED
+            self.index[path] = item
+            self._identities[path] = identity
+            updates.append(WatchUpdate(event, path, item))
+        return updates
+
+    def watch(self, cancel: CancelToken | None = None, timeout: float = 0.2) -> Iterator[WatchUpdate]:
+        """start() seguito da step() finché cancel non viene attivato (o il generatore chiuso)."""
+        try:
+            yield from self.start()
+            while cancel is None or not cancel.cancelled:
+                yield from self.step(timeout)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if self._source is not None:
+            self._source.close()
+            self._source = None
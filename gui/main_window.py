@@ -21,6 +21,7 @@ from PySide6.QtWidgets import (
     QMainWindow,
     QMessageBox,
     QPlainTextEdit,
+    QProgressBar,
     QPushButton,
     QSpinBox,
     QSplitter,
@@ -32,6 +33,7 @@ from PySide6.QtWidgets import (
 
 from core.config import load_config, resolve_profile
 from core.models import AnalysisSummary
+from core.progress import OperationCancelled, ProgressEvent, ProgressMeter
 from core.reporting import build_synthetic_report, build_technical_report
 from core.sanitizer import (
     OUTCOME_ERROR,
@@ -45,6 +47,9 @@ from core.sanitizer import (
     sanitize,
 )
 from core.version import get_version_info
+from gui.worker import OperationWorker, start_worker
+
+WORKER_SHUTDOWN_TIMEOUT_MS = 5000  # attesa massima del worker alla chiusura della finestra
 
 PROBLEM_HELP = {
     "filename_normalize": {
@@ -267,6 +272,10 @@ class MainWindow(QMainWindow):
         self.last_output: Path | None = None
         self.last_summary: AnalysisSummary | None = None
         self._temp_input_dir: Path | None = None
+        self._worker: OperationWorker | None = None
+        self._worker_thread = None
+        self._close_pending = False
+        self._progress_meter = ProgressMeter()
 
         self.settings = QSettings("GD LEX", "PCT-PDUA-Validator")
         self.output_mode = self.settings.value("output_mode", "sibling")
@@ -351,6 +360,18 @@ class MainWindow(QMainWindow):
         self.summary_label = QLabel("Riepilogo correzione: NON ESEGUITA")
         root.addWidget(self.summary_label)
 
+        progress_row = QHBoxLayout()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 1)
+        self.progress_bar.setValue(0)
+        self.progress_label = QLabel("Pronto")
+        self.btn_cancel_op = QPushButton("Annulla")
+        self.btn_cancel_op.setEnabled(False)
+        progress_row.addWidget(self.progress_bar, 1)
+        progress_row.addWidget(self.progress_label, 1)
+        progress_row.addWidget(self.btn_cancel_op)
+        root.addLayout(progress_row)
+
         button_row = QHBoxLayout()
         self.btn_analyze = QPushButton("Analizza")
         self.btn_analyze.setObjectName("PrimaryButton")
@@ -386,6 +407,7 @@ class MainWindow(QMainWindow):
         self.btn_print_report.clicked.connect(self.print_report)
         self.btn_export_pdf.clicked.connect(self.export_report_pdf)
         self.btn_reset.clicked.connect(self.reset)
+        self.btn_cancel_op.clicked.connect(self.cancel_operation)
 
 
     def _build_menu(self) -> None:
@@ -421,7 +443,7 @@ class MainWindow(QMainWindow):
             self._set_input_paths([Path(selected)])
 
     def _collect_preview_rows(self, selected_paths: list[Path]) -> list[RowState]:
-        allowed_ext = set(self.profile.get("allowed_formats", [])) | set(self.profile.get("warning_formats", []))
+        allowed_ext = self.profile.allowed_formats | self.profile.warning_formats
         preview_files: list[Path] = []
 
         for path in selected_paths:
@@ -492,10 +514,75 @@ class MainWindow(QMainWindow):
         self.choose_folder()
         return self.input_path is not None
 
+    def _busy(self) -> bool:
+        return self._worker is not None
+
+    def _set_busy(self, busy: bool) -> None:
+        for btn in [self.btn_analyze, self.btn_sanitize, self.btn_reset, self.btn_load_file, self.btn_load_folder, self.btn_settings]:
+            btn.setEnabled(not busy)
+        self.drop_area.setAcceptDrops(not busy)
+        self.btn_cancel_op.setEnabled(busy)
+
+    def _start_operation(self, operation, on_done) -> None:
+        self._progress_meter = ProgressMeter()
+        self.progress_bar.setRange(0, 0)
+        self.progress_label.setText("Avvio…")
+        worker = OperationWorker(operation)
+        worker.progress.connect(self._on_progress)
+        worker.finished.connect(on_done)
+        worker.finished.connect(self._end_operation)
+        worker.cancelled.connect(self._on_operation_cancelled)
+        worker.failed.connect(self._on_operation_failed)
+        self._worker = worker
+        self._set_busy(True)
+        self._worker_thread = start_worker(self, worker)
+
+    def _end_operation(self, *_args) -> None:
+        self._worker = None
+        self._worker_thread = None
+        self._set_busy(False)
+        self.btn_sanitize.setEnabled(self.last_summary is not None)
+
+    def _on_progress(self, event: ProgressEvent) -> None:
+        self.progress_bar.setRange(0, max(event.total, 1))
+        self.progress_bar.setValue(event.done if event.total else 1)
+        self.progress_label.setText(self._progress_meter.describe(event))
+        if event.path is not None:
+            self.progress_label.setToolTip(str(event.path))
+
+    def cancel_operation(self) -> None:
+        if self._worker is None:
+            return
+        self._worker.token.cancel()
+        self.btn_cancel_op.setEnabled(False)
+        self.progress_label.setText("Annullamento in corso…")
+        self._append_log("Annullamento richiesto")
+
+    def _on_operation_cancelled(self, exc: OperationCancelled) -> None:
+        self._end_operation()
+        if exc.output_dir is not None and exc.summary is not None:
+            self._apply_sanitize_result(exc.output_dir, exc.summary, completed=False)
+            self._append_log(f"Correzione annullata: output parziale in {exc.output_dir}")
+        else:
+            self._append_log("Analisi annullata")
+        self.progress_label.setText("Operazione annullata")
+
+    def _on_operation_failed(self, message: str) -> None:
+        self._end_operation()
+        self.progress_label.setText("Errore")
+        self._append_log(f"Operazione fallita: {message}")
+        QMessageBox.warning(self, "Errore", f"Operazione non riuscita:\n{message}")
+
     def run_analyze(self) -> None:
-        if not self._ensure_input():
+        if self._busy() or not self._ensure_input():
             return
-        summary = analyze(self.input_path, self.profile)
+        input_path, profile = self.input_path, self.profile
+        self._start_operation(
+            lambda progress, cancel: analyze(input_path, profile, progress=progress, cancel=cancel),
+            self._apply_analysis_result,
+        )
+
+    def _apply_analysis_result(self, summary: AnalysisSummary) -> None:
         self.last_summary = summary
         self.rows = [
             RowState(
@@ -513,25 +600,35 @@ class MainWindow(QMainWindow):
         ]
         self._refresh_model()
         self.btn_sanitize.setEnabled(True)
+        self.progress_label.setText(f"Analisi completata: {len(summary.files)} file")
         self._append_log("Analisi completata")
         for path, reason in summary.excluded_paths:
             self._append_log(f"Escluso da analisi ({reason}): {path}")
 
     def run_sanitize(self) -> None:
-        if not self._ensure_input():
+        if self._busy() or not self._ensure_input():
             return
-        output, summary = sanitize(
-            self.input_path,
-            self.profile,
-            output_mode=str(self.output_mode),
-            custom_output_dir=Path(self.custom_output_dir) if self.custom_output_dir else None,
-            smart_opts={
+        input_path, profile = self.input_path, self.profile
+        options = {
+            "output_mode": str(self.output_mode),
+            "custom_output_dir": Path(self.custom_output_dir) if self.custom_output_dir else None,
+            "smart_opts": {
                 "enabled": self.smart_rename_enabled,
                 "max_filename_len": self.max_filename_len,
                 "max_output_path_len": self.max_output_path_len,
             },
-            create_backup=self.create_backup,
+            "create_backup": self.create_backup,
+        }
+        self._start_operation(
+            lambda progress, cancel: sanitize(input_path, profile, progress=progress, cancel=cancel, **options),
+            self._on_sanitize_finished,
         )
+
+    def _on_sanitize_finished(self, result: tuple[Path | None, AnalysisSummary]) -> None:
+        # metodo legato (non lambda): il segnale del worker arriva in coda al thread GUI
+        self._apply_sanitize_result(*result)
+
+    def _apply_sanitize_result(self, output: Path | None, summary: AnalysisSummary, completed: bool = True) -> None:
         self.last_output = output
         self.last_summary = summary
         # aggiorna rows senza svuotare tabella
@@ -550,6 +647,9 @@ class MainWindow(QMainWindow):
             row.actions = list(item.correction_actions)
 
         self._refresh_model()
+        if not completed:
+            return
+        self.progress_label.setText(f"Correzione completata: {output}")
         self._append_log(f"Correzione completata: {output}")
         for item in summary.files:
             self._append_log(f"{item.source.name}: {item.correction_outcome} -> {item.output_path or '-'}")
@@ -796,7 +896,27 @@ class MainWindow(QMainWindow):
             if width is not None:
                 self.table.setColumnWidth(index, int(width))
 
+    def _close_after_worker(self) -> None:
+        self._close_pending = False
+        self.close()
+
     def closeEvent(self, event):  # noqa: N802
+        if self._close_pending:
+            event.ignore()
+            return
+        if self._worker is not None and self._worker_thread is not None:
+            self._worker.token.cancel()
+            self._worker_thread.quit()
+            if not self._worker_thread.wait(WORKER_SHUTDOWN_TIMEOUT_MS):
+                # l'annullamento è controllato tra un file e l'altro: distruggere ora il QThread in esecuzione
+                # farebbe abortire Qt, la finestra si chiude quando il thread termina
+                self._close_pending = True
+                self._worker_thread.finished.connect(self._close_after_worker)
+                self.btn_cancel_op.setEnabled(False)
+                self.progress_label.setText("Annullamento in corso… la finestra si chiuderà al termine")
+                self._append_log("Chiusura rimandata: attendo la fine dell'operazione in corso")
+                event.ignore()
+                return
         self.settings.setValue("window_geometry", self.saveGeometry())
         self.settings.setValue("splitter_sizes", self.splitter.sizes())
         self.settings.setValue("output_mode", self.output_mode)
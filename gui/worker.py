@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+
+from PySide6.QtCore import QObject, Qt, QThread, Signal
+
+from core.progress import CancelToken, OperationCancelled, ProgressEvent
+
+PROGRESS_INTERVAL = 0.1  # secondi minimi tra due aggiornamenti della barra
+
+
+class OperationWorker(QObject):
+    """Esegue analyze()/sanitize() fuori dal thread GUI; i segnali arrivano in coda al thread GUI."""
+
+    progress = Signal(object)  # ProgressEvent
+    finished = Signal(object)  # risultato dell'operazione
+    cancelled = Signal(object)  # OperationCancelled
+    failed = Signal(str)
+
+    def __init__(self, operation: Callable[[Callable[[ProgressEvent], None], CancelToken], object]):
+        super().__init__()
+        self._operation = operation
+        self.token = CancelToken()
+        self._last_emit = 0.0
+
+    def _on_progress(self, event: ProgressEvent) -> None:
+        now = time.monotonic()
+        if event.done == event.total or now - self._last_emit >= PROGRESS_INTERVAL:
+            self._last_emit = now
+            self.progress.emit(event)
+
+    def run(self) -> None:
+        try:
+            result = self._operation(self._on_progress, self.token)
+        except OperationCancelled as exc:
+            self.cancelled.emit(exc)
+        except Exception as exc:  # pragma: no cover
+            self.failed.emit(str(exc))
+        else:
+            self.finished.emit(result)
+
+
+def start_worker(parent: QObject, worker: OperationWorker) -> QThread:
+    thread = QThread(parent)
+    worker.moveToThread(thread)
+    thread.started.connect(worker.run)
+    # quit() è thread-safe: diretto, così il thread termina anche se il thread GUI è bloccato in wait()
+    for signal in (worker.finished, worker.cancelled, worker.failed):
+        signal.connect(thread.quit, Qt.ConnectionType.DirectConnection)
+    thread.finished.connect(worker.deleteLater)
+    thread.finished.connect(thread.deleteLater)
+    thread.start()
+    return thread
@@ -0,0 +1,74 @@
+import os
+from pathlib import Path
+
+import core.sanitizer as sanitizer
+from cli.main import main
+from core.cache import AnalysisCache, profile_fingerprint
+from core.sanitizer import analyze
+
+PROFILE = {
+    "allowed_formats": ["pdf", "txt", "zip"],
+    "warning_formats": [],
+    "filename": {"max_length": 80},
+}
+
+
+def _dossier(tmp_path: Path) -> Path:
+    root = tmp_path / "fascicolo"
+    root.mkdir()
+    (root / "atto uno.pdf").write_bytes(b"%PDF-1.4\n%%EOF")
+    (root / "rotto.pdf").write_bytes(b"nope")
+    return root
+
+
+def test_cache_hits_on_unchanged_files(tmp_path: Path, monkeypatch):
+    root = _dossier(tmp_path)
+    cache = AnalysisCache(tmp_path / "cache")
+    first = analyze(root, PROFILE, cache=cache)
+    assert cache.misses == 2
+
+    def _no_validation(*_args, **_kwargs):
+        raise AssertionError("file rivalidato nonostante la cache")
+
+    monkeypatch.setattr(sanitizer, "validate_path", _no_validation)
+    second = analyze(root, PROFILE, cache=cache)
+    assert cache.hits == 2
+    assert second.to_dict() == first.to_dict()
+    cache.close()
+
+
+def test_cache_invalidated_by_change_and_profile(tmp_path: Path):
+    root = _dossier(tmp_path)
+    with AnalysisCache(tmp_path / "cache") as cache:
+        analyze(root, PROFILE, cache=cache)
+
+        target = root / "rotto.pdf"
+        target.write_bytes(b"%PDF-1.4\n%%EOF")
+        stat = target.stat()
+        os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        summary = analyze(root, PROFILE, cache=cache)
+        assert cache.misses == 3
+        assert all(item.status != "error" for item in summary.files)
+
+        analyze(root, {**PROFILE, "filename": {"max_length": 10}}, cache=cache)
+        assert cache.misses == 5
+
+
+def test_cache_lru_eviction(tmp_path: Path):
+    root = _dossier(tmp_path)
+    fingerprint = profile_fingerprint(PROFILE)
+    with AnalysisCache(tmp_path / "cache", max_bytes=1) as cache:
+        analyze(root, PROFILE, cache=cache)
+        assert cache.get(root / "atto uno.pdf", fingerprint) is None
+
+
+def test_cli_clear_cache_without_input(tmp_path: Path, capsys):
+    cache_dir = tmp_path / "cache"
+    root = _dossier(tmp_path)
+    assert main([str(root), "--analyze", "--cache", "--cache-dir", str(cache_dir)]) == 1
+    with AnalysisCache(cache_dir) as cache:
+        assert len(cache) == 2
+    assert main(["--clear-cache", "--cache-dir", str(cache_dir)]) == 0
+    assert "svuotata" in capsys.readouterr().out
+    with AnalysisCache(cache_dir) as cache:
+        assert len(cache) == 0
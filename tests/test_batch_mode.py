@@ -0,0 +1,68 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import cli.main as cli_main
+from cli.main import main
+from core.batch import BatchOptions, aggregate_exit_codes, iter_batch, read_batch_file
+
+PROFILE = {
+    "allowed_formats": ["pdf", "txt"],
+    "warning_formats": ["png"],
+    "filename": {"max_length": 80},
+}
+
+
+def _dossier(root: Path, *names: str) -> Path:
+    root.mkdir(parents=True)
+    for name in names:
+        (root / name).write_bytes(b"%PDF-1.4\n%%EOF" if name.endswith(".pdf") else b"x")
+    return root
+
+
+def test_aggregate_exit_codes_matches_single_run_priority():
+    assert aggregate_exit_codes([]) == 0
+    assert aggregate_exit_codes([0, 2, 0]) == 2
+    assert aggregate_exit_codes([2, 1, 0]) == 1
+
+
+def test_read_batch_file_skips_blanks_and_comments(tmp_path: Path):
+    listing = tmp_path / "lista.txt"
+    listing.write_text("# notte\n/a/uno\n\n  /b/due  \n", encoding="utf-8")
+    assert read_batch_file(listing) == [Path("/a/uno"), Path("/b/due")]
+
+
+@pytest.mark.parametrize("backend", ["thread", "process"])
+def test_iter_batch_keeps_input_order(tmp_path: Path, backend):
+    inputs = [_dossier(tmp_path / f"cliente{idx}", "atto.pdf", "nota.txt") for idx in range(4)]
+    inputs.insert(2, tmp_path / "mancante")
+    _dossier(tmp_path / "warn", "foto.png")
+    inputs.append(tmp_path / "warn")
+
+    records = list(iter_batch(inputs, PROFILE, BatchOptions(strict=True), jobs=3, backend=backend))
+
+    assert [r["input"] for r in records] == [str(p) for p in inputs]
+    assert [r["exit_code"] for r in records] == [0, 0, 1, 0, 0, 2]
+    assert "Input non trovato" in records[2]["error"]
+    assert records[0]["status"] == {"ok": 2, "warning": 0, "error": 0}
+
+
+def test_cli_batch_loads_config_once_and_writes_jsonl(tmp_path: Path, monkeypatch):
+    first = _dossier(tmp_path / "a", "atto.pdf")
+    second = _dossier(tmp_path / "b", "virus.exe")
+    listing = tmp_path / "lista.txt"
+    listing.write_text(f"{second}\n", encoding="utf-8")
+    out = tmp_path / "risultati.jsonl"
+    loads = []
+    real_load = cli_main.load_config
+    monkeypatch.setattr(cli_main, "load_config", lambda *a: loads.append(1) or real_load(*a))
+
+    code = main([str(first), "--batch-file", str(listing), "--sanitize", "--output", str(tmp_path / "out"), "--jsonl", str(out)])
+
+    records = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert code == 1
+    assert len(loads) == 1
+    assert [r["exit_code"] for r in records] == [0, 1]
+    assert records[0]["output"] == str(tmp_path / "out" / "a_conforme")
+    assert (tmp_path / "out" / "a_conforme" / "atto.pdf").is_file()
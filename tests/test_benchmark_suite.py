@@ -0,0 +1,55 @@
+from pathlib import Path
+
+import pytest
+
+from benchmarks.bench_e2e import OP_ANALYZE, OP_SANITIZE_ZIP, compare_results, run_suite
+from benchmarks.dossier import SCENARIO_DEEP_ZIP, SCENARIO_PATHOLOGICAL_NAMES, generate_dossier
+
+PROFILE = {
+    "allowed_formats": ["pdf", "p7m", "zip", "txt", "xml"],
+    "warning_formats": [],
+    "filename": {"max_length": 80},
+}
+
+
+def _tree(root: Path) -> dict[str, bytes]:
+    return {path.relative_to(root).as_posix(): path.read_bytes() for path in root.rglob("*") if path.is_file()}
+
+
+@pytest.mark.parametrize("scenario", [SCENARIO_DEEP_ZIP, SCENARIO_PATHOLOGICAL_NAMES])
+def test_generator_is_reproducible(tmp_path: Path, scenario):
+    first = generate_dossier(tmp_path / "a", scenario, scale=0.005)
+    second = generate_dossier(tmp_path / "b", scenario, scale=0.005)
+
+    assert first.files == second.files > 0
+    assert _tree(first.root) == _tree(second.root)
+
+
+def test_run_suite_in_process_reports_metrics(tmp_path: Path):
+    results = run_suite([SCENARIO_DEEP_ZIP], [OP_ANALYZE, OP_SANITIZE_ZIP], PROFILE, tmp_path, scale=0.005, isolated=False)
+
+    cases = {row["case"]: row for row in results["results"]}
+    assert set(cases) == {"deep_zip/analyze", "deep_zip/sanitize_zip"}
+    assert cases["deep_zip/sanitize_zip"]["files"] > 2
+    assert all(row["seconds"] >= 0 and row["bytes"] > 0 for row in cases.values())
+
+
+def test_compare_results_flags_only_significant_regressions():
+    baseline = {"scale": 1.0, "seed": 1, "results": [
+        {"case": "x/analyze", "seconds": 1.0, "peak_rss_mb": 100.0},
+        {"case": "x/sanitize", "seconds": 0.01, "peak_rss_mb": 100.0},
+    ]}
+    current = {"scale": 1.0, "seed": 1, "results": [
+        {"case": "x/analyze", "seconds": 1.5, "peak_rss_mb": 110.0},
+        {"case": "x/sanitize", "seconds": 0.03, "peak_rss_mb": 200.0},
+        {"case": "y/analyze", "seconds": 9.0, "peak_rss_mb": 1.0},
+    ]}
+
+    regressions = compare_results(baseline, current, time_threshold=0.2, rss_threshold=0.25, min_delta=0.05)
+
+    assert len(regressions) == 2
+    assert regressions[0].startswith("x/analyze: tempo")
+    assert regressions[1].startswith("x/sanitize: picco RSS")
+
+    with pytest.raises(ValueError):
+        compare_results({**baseline, "scale": 2.0}, current)
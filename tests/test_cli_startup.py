@@ -0,0 +1,51 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import cli.main as cli_main
+import core.server as server_mod
+import core.version as version_module
+import core.watch as watch_mod
+from core.constants import DUPLICATES_KEEP, MATERIALIZE_COPY, WATCH_AUTO
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_build_parser_does_not_resolve_version(monkeypatch):
+    def _fail():
+        raise AssertionError("versione risolta senza --version")
+
+    monkeypatch.setattr(version_module, "get_app_version", _fail)
+    args = cli_main.build_parser().parse_args(["fascicolo", "--analyze"])
+    assert args.analyze
+
+
+def test_version_flag_resolves_on_demand(monkeypatch, capsys):
+    monkeypatch.setattr(version_module, "get_app_version", lambda: "9.9.9")
+    with pytest.raises(SystemExit) as excinfo:
+        cli_main.build_parser().parse_args(["--version"])
+    assert excinfo.value.code == 0
+    assert capsys.readouterr().out == "gdlex-check 9.9.9\n"
+
+
+def test_cli_import_skips_heavy_modules():
+    heavy = ("core.server", "core.version", "core.cache", "core.batch", "core.watch", "core.sanitizer", "core.duplicates", "sqlite3")
+    heavy += ("http.server", "subprocess", "multiprocessing", "zipfile")
+    code = f"import sys, cli.main; print(','.join(m for m in {heavy!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
+
+
+def test_constants_module_imports_nothing():
+    code = "import sys, core.constants; print(','.join(sorted(m for m in sys.modules if m.startswith('core.'))))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "core.constants"
+
+
+def test_parser_defaults_come_from_core_constants():
+    args = cli_main.build_parser().parse_args(["fascicolo"])
+    assert (args.materialize, args.duplicates, args.watch_backend) == (MATERIALIZE_COPY, DUPLICATES_KEEP, WATCH_AUTO)
+    assert (args.debounce, args.poll_interval) == (watch_mod.DEFAULT_DEBOUNCE, watch_mod.DEFAULT_POLL_INTERVAL)
+    assert (args.host, args.port, args.max_concurrent) == (server_mod.DEFAULT_HOST, server_mod.DEFAULT_PORT, server_mod.DEFAULT_MAX_CONCURRENT)
@@ -0,0 +1,59 @@
+import dataclasses
+import pickle
+from pathlib import Path
+
+import pytest
+
+import core.config as cfg
+from core.cache import profile_fingerprint
+from core.validators import validate_path
+
+CONFIG = {
+    "profiles": {
+        "base": {"allowed_formats": ["pdf", "txt"], "warning_formats": ["png"], "filename": {"max_length": 40}},
+        "copia": {"warning_formats": ["png"], "filename": {"max_length": 40}, "allowed_formats": ["pdf", "txt"]},
+        "lungo": {"allowed_formats": ["pdf", "txt"], "warning_formats": ["png"], "filename": {"max_length": 41}},
+        "rotto": {"warning_formats": ["png"]},
+    }
+}
+
+
+def test_resolve_profile_returns_compiled_profile():
+    profile = cfg.resolve_profile(CONFIG, "base")
+
+    assert profile.name == "base"
+    assert profile.allowed_formats == frozenset({"pdf", "txt"})
+    assert profile.warning_formats == frozenset({"png"})
+    assert profile.max_filename_length == 40
+    assert profile.accepts("png") and not profile.accepts("exe")
+    assert profile["allowed_formats"] == ["pdf", "txt"]
+    assert profile.get("assente", "x") == "x"
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        profile.max_filename_length = 10  # type: ignore[misc]
+
+
+def test_fingerprint_is_stable_and_content_based():
+    base = cfg.resolve_profile(CONFIG, "base")
+
+    assert base.fingerprint == cfg.compile_profile(CONFIG["profiles"]["base"]).fingerprint
+    assert base.fingerprint == cfg.resolve_profile(CONFIG, "copia").fingerprint  # stesso contenuto, chiavi in altro ordine
+    assert base.fingerprint != cfg.resolve_profile(CONFIG, "lungo").fingerprint
+    assert cfg.compile_profile(base) is base
+    assert {base: 1}[pickle.loads(pickle.dumps(base))] == 1
+    assert profile_fingerprint(base) == profile_fingerprint(CONFIG["profiles"]["base"])
+
+
+def test_invalid_profile_raises_config_error():
+    with pytest.raises(cfg.ConfigError):
+        cfg.resolve_profile(CONFIG, "rotto")
+
+
+def test_validate_path_same_result_for_dict_and_profile(tmp_path: Path):
+    target = tmp_path / "immagine con spazi.png"
+    target.write_bytes(b"x")
+
+    from_dict = validate_path(target, CONFIG["profiles"]["base"])
+    from_profile = validate_path(target, cfg.resolve_profile(CONFIG, "base"))
+
+    assert from_dict.status == from_profile.status == "warning"
+    assert [issue.code for issue in from_dict.issues] == [issue.code for issue in from_profile.issues]
@@ -0,0 +1,102 @@
+import json
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from core import duplicates
+from core.duplicates import DuplicateIndex
+from core.sanitizer import sanitize
+
+PROFILE = {"allowed_formats": ["pdf", "txt", "zip"], "warning_formats": [], "filename": {"max_length": 80}}
+RICORSO = b"%PDF-1.4\nricorso per decreto ingiuntivo\n%%EOF"
+
+
+def _dossier(tmp_path: Path) -> Path:
+    root = tmp_path / "fascicolo"
+    root.mkdir()
+    (root / "ricorso.pdf").write_bytes(RICORSO)
+    (root / "ricorso (1).pdf").write_bytes(RICORSO)
+    (root / "procura.pdf").write_bytes(b"%PDF-1.4\nprocura alle liti\n%%EOF")
+    (root / "nota.txt").write_bytes(b"x" * len(RICORSO))
+    with zipfile.ZipFile(root / "allegati.zip", "w") as zf:
+        zf.writestr("copia_ricorso.pdf", RICORSO)
+    return root
+
+
+def _issues(summary, name: str) -> list[str]:
+    item = next(item for item in summary.files if item.source.name == name)
+    return [issue.message for issue in item.issues if issue.code == "duplicate_content"]
+
+
+def test_index_hashes_only_crc_candidates_with_one_open(tmp_path: Path, monkeypatch):
+    archive = tmp_path / "allegati.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("a.pdf", b"uguale")
+        zf.writestr("b.pdf", b"uguale")
+        zf.writestr("c.pdf", b"divers")
+        zf.writestr("unico.pdf", b"altra dimensione")
+    calls: list[list[str]] = []
+    original = duplicates.hash_zip_members
+    monkeypatch.setattr(duplicates, "hash_zip_members", lambda path, names: calls.append(names) or original(path, names))
+
+    index = DuplicateIndex()
+    for name, size, crc in duplicates.zip_members(archive):
+        index.add_zip_member(f"allegati.zip/{name}", size, crc, archive, name)
+    groups = index.groups(jobs=2)
+
+    assert [(group.members, group.wasted_bytes) for group in groups] == [(("allegati.zip/a.pdf", "allegati.zip/b.pdf"), 6)]
+    assert calls == [["a.pdf", "b.pdf"]]
+
+
+def test_duplicates_reported_across_files_and_zip_entries(tmp_path: Path):
+    out, summary = sanitize(_dossier(tmp_path), PROFILE, output_mode="custom", custom_output_dir=tmp_path / "out")
+
+    expected = [f"Contenuto duplicato ({len(RICORSO)} byte): allegati.zip/copia_ricorso.pdf = ricorso_1.pdf = ricorso.pdf."]
+    assert _issues(summary, "ricorso.pdf") == expected
+    assert _issues(summary, "ricorso (1).pdf") == expected
+    assert _issues(summary, "allegati.zip") == expected
+    assert _issues(summary, "nota.txt") == _issues(summary, "procura.pdf") == []
+    assert all(item.status == "ok" for item in summary.files)
+    # keep (default): solo segnalati, l'output resta invariato
+    assert (out / "ricorso_1.pdf").stat().st_ino != (out / "ricorso.pdf").stat().st_ino
+    assert not any(action.startswith("Duplicato di") for item in summary.files for action in item.correction_actions)
+    report = json.loads((out / ".gdlex" / "REPORT.json").read_text(encoding="utf-8"))
+    assert [group["members"] for group in report["duplicates"]] == [["allegati.zip/copia_ricorso.pdf", "ricorso_1.pdf", "ricorso.pdf"]]
+
+
+@pytest.mark.parametrize("policy", ["exclude", "hardlink"])
+def test_duplicate_outputs_excluded_or_hardlinked(tmp_path: Path, policy: str):
+    out, summary = sanitize(_dossier(tmp_path), PROFILE, output_mode="custom", custom_output_dir=tmp_path / "out", duplicates=policy)
+    copy = next(item for item in summary.files if item.source.name == "ricorso (1).pdf")
+
+    assert (out / "ricorso.pdf").exists()
+    assert (out / "allegati.zip").exists()
+    if policy == "exclude":
+        assert not (out / "ricorso_1.pdf").exists()
+        assert copy.output_path is None
+        assert copy.correction_actions[-1] == "Duplicato di ricorso.pdf: escluso dall'output"
+    else:
+        assert (out / "ricorso_1.pdf").stat().st_ino == (out / "ricorso.pdf").stat().st_ino
+        assert copy.output_strategy == "hardlink"
+
+
+def test_incremental_reruns_do_not_accumulate_duplicate_marks(tmp_path: Path):
+    root = _dossier(tmp_path)
+    for _ in range(3):
+        out, summary = sanitize(
+            root, PROFILE, output_mode="custom", custom_output_dir=tmp_path / "out", incremental=True, duplicates="hardlink"
+        )
+        copy = next(item for item in summary.files if item.source.name == "ricorso (1).pdf")
+
+        assert len(_issues(summary, "ricorso (1).pdf")) == 1
+        assert [action for action in copy.correction_actions if action.startswith("Duplicato di")] == [
+            "Duplicato di ricorso.pdf: sostituito da un hardlink"
+        ]
+        assert not list(out.glob(".*.link"))
+    assert json.loads((out / ".gdlex" / "REPORT.json").read_text(encoding="utf-8"))["incremental"]["removed"] == []
+
+
+def test_unknown_duplicate_policy(tmp_path: Path):
+    with pytest.raises(ValueError):
+        sanitize(_dossier(tmp_path), PROFILE, output_mode="custom", custom_output_dir=tmp_path / "out", duplicates="elimina")
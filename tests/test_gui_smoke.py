@@ -13,3 +13,38 @@ def test_main_window_constructs():
     assert window.windowTitle()
     window.close()
     app.quit()
+
+
+def test_close_waits_for_running_worker(monkeypatch):
+    pytest.importorskip("PySide6", exc_type=ImportError)
+    qtwidgets = pytest.importorskip("PySide6.QtWidgets", exc_type=ImportError)
+    QApplication = qtwidgets.QApplication
+
+    import gc
+    import threading
+    import time
+
+    import gui.main_window as main_window
+
+    app = QApplication.instance() or QApplication([])
+    monkeypatch.setattr(main_window, "WORKER_SHUTDOWN_TIMEOUT_MS", 10)
+    release = threading.Event()
+    window = main_window.MainWindow()
+    window.show()
+    # un file lungo: l'annullamento arriva solo quando l'operazione torna al controllo tra un file e l'altro
+    window._start_operation(lambda progress, cancel: release.wait(10), lambda _result: None)
+
+    assert window.close() is False
+    assert window.isVisible()
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while window.isVisible() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+    assert not window.isVisible()
+    assert window._worker_thread is None
+    # oggetti Qt raccolti dal GC su un altro thread (test successivi) fanno crashare l'interprete
+    del window
+    gc.collect()
+    app.quit()
@@ -0,0 +1,69 @@
+import hashlib
+import os
+import random
+from pathlib import Path
+
+import core.cache as cache_mod
+from core.cache import AnalysisCache
+from core.fs_ops import COPY_CHUNK, copy_with_digest, fast_digest, sha256_file
+from core.models import FileAnalysis
+
+
+def _files(tmp_path: Path) -> list[Path]:
+    rng = random.Random(3)
+    paths = []
+    for index, size in enumerate((0, 1, COPY_CHUNK - 1, COPY_CHUNK * 3 + 17)):
+        path = tmp_path / f"atto_{index}.pdf"
+        path.write_bytes(rng.randbytes(size))
+        paths.append(path)
+    return paths
+
+
+def test_sha256_engine_matches_hashlib(tmp_path: Path):
+    paths = _files(tmp_path)
+    expected = [hashlib.sha256(path.read_bytes()).hexdigest() for path in paths]
+
+    assert [sha256_file(path) for path in paths] == expected
+
+    chunks: list[bytes] = []
+    assert copy_with_digest(paths[-1], tmp_path / "copia.pdf") == (expected[-1], paths[-1].stat().st_size)
+    assert copy_with_digest(paths[-1], tmp_path / "copia2.pdf", [chunks.append])[0] == expected[-1]
+    assert (tmp_path / "copia.pdf").read_bytes() == b"".join(chunks) == paths[-1].read_bytes()
+
+
+def test_fast_digest_tracks_content(tmp_path: Path):
+    first, second = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    first.write_bytes(b"%PDF-1.4 ricorso")
+    second.write_bytes(b"%PDF-1.4 ricorso")
+
+    assert fast_digest(first) == fast_digest(second)
+    kind, _, value = fast_digest(first).partition(":")
+    assert (kind, len(value)) in {("xxh3", 32), ("sha256", 64)}
+    second.write_bytes(b"%PDF-1.4 procura")
+    assert fast_digest(first) != fast_digest(second)
+
+
+def test_cache_content_keys_survive_touch(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(cache_mod, "FAST_DIGEST_AVAILABLE", True)
+    source = tmp_path / "atto.pdf"
+    source.write_bytes(b"%PDF-1.4\n%%EOF")
+    item = FileAnalysis(source=source, file_type="pdf", status="ok")
+
+    with AnalysisCache(tmp_path / "plain") as plain, AnalysisCache(tmp_path / "content", content_keys=True) as content:
+        plain.put(item, "profilo")
+        content.put(item, "profilo")
+        stat = source.stat()
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+
+        assert plain.get(source, "profilo") is None
+        assert content.get(source, "profilo") is not None
+
+        source.write_bytes(b"%PDF-1.4\n%%EOX")
+        assert content.get(source, "profilo") is None
+
+
+def test_cache_content_keys_need_fast_digest(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(cache_mod, "FAST_DIGEST_AVAILABLE", False)
+
+    with AnalysisCache(tmp_path / "cache", content_keys=True) as cache:
+        assert cache.content_keys is False
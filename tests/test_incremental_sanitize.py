@@ -0,0 +1,86 @@
+import json
+import os
+from pathlib import Path
+
+import core.sanitizer as sanitizer
+from core.sanitizer import sanitize
+
+PROFILE = {
+    "allowed_formats": ["pdf", "txt", "zip"],
+    "warning_formats": [],
+    "filename": {"max_length": 80},
+}
+
+
+def _touch(path: Path, payload: bytes) -> None:
+    path.write_bytes(payload)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def _count_copies(monkeypatch) -> list[str]:
+    copied: list[str] = []
+    original = sanitizer.materialize
+
+    def _tracking(src, dst, *args, **kwargs):
+        copied.append(Path(src).name)
+        return original(src, dst, *args, **kwargs)
+
+    monkeypatch.setattr(sanitizer, "materialize", _tracking)
+    return copied
+
+
+def _dossier(tmp_path: Path) -> Path:
+    root = tmp_path / "fascicolo"
+    root.mkdir()
+    (root / "atto uno.pdf").write_bytes(b"%PDF-1.4\n%%EOF")
+    (root / "nota.txt").write_bytes(b"ciao")
+    (root / "vecchio.txt").write_bytes(b"da rimuovere")
+    return root
+
+
+def test_incremental_rewrites_only_changed_files(tmp_path: Path, monkeypatch):
+    root = _dossier(tmp_path)
+    output, first = sanitize(root, PROFILE)
+    (output / "intruso.txt").write_text("x", encoding="utf-8")
+
+    _touch(root / "nota.txt", b"ciao di nuovo")
+    (root / "vecchio.txt").unlink()
+    copied = _count_copies(monkeypatch)
+
+    output2, summary = sanitize(root, PROFILE, incremental=True)
+
+    assert output2 == output
+    assert copied == ["nota.txt"]
+    assert sorted(p.name for p in output.iterdir() if p.name != ".gdlex") == ["atto_uno.pdf", "nota.txt"]
+    assert (output / "nota.txt").read_bytes() == b"ciao di nuovo"
+
+    by_name = {item.source.name: item for item in summary.files}
+    before = {item.source.name: item for item in first.files}
+    assert by_name["atto uno.pdf"].correction_outcome == before["atto uno.pdf"].correction_outcome
+    assert by_name["atto uno.pdf"].sha256 == before["atto uno.pdf"].sha256
+
+    report = json.loads((output / ".gdlex" / "REPORT.json").read_text(encoding="utf-8"))
+    assert report["incremental"]["reused"] == 1
+    assert report["incremental"]["rewritten"] == 1
+    assert sorted(Path(p).name for p in report["incremental"]["removed"]) == ["intruso.txt", "vecchio.txt"]
+
+
+def test_incremental_rebuilds_when_profile_changes(tmp_path: Path, monkeypatch):
+    root = _dossier(tmp_path)
+    sanitize(root, PROFILE)
+    copied = _count_copies(monkeypatch)
+
+    sanitize(root, {**PROFILE, "filename": {"max_length": 60}}, incremental=True)
+    assert sorted(copied) == ["atto uno.pdf", "nota.txt", "vecchio.txt"]
+
+
+def test_incremental_rewrites_tampered_output(tmp_path: Path, monkeypatch):
+    root = _dossier(tmp_path)
+    output, _ = sanitize(root, PROFILE)
+    (output / "nota.txt").write_bytes(b"manomesso!!")
+    copied = _count_copies(monkeypatch)
+
+    sanitize(root, PROFILE, incremental=True)
+    assert copied == ["nota.txt"]
+    assert (output / "nota.txt").read_bytes() == b"ciao"
@@ -0,0 +1,60 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import core.fs_ops as fs_ops
+from core.fs_ops import materialize, sha256_file
+from core.sanitizer import sanitize
+
+PROFILE = {
+    "allowed_formats": ["pdf", "txt"],
+    "warning_formats": [],
+    "filename": {"max_length": 80},
+}
+
+
+def _source(tmp_path: Path) -> Path:
+    src = tmp_path / "atto.pdf"
+    src.write_bytes(b"%PDF-1.4\n" + b"x" * 100_000 + b"\n%%EOF")
+    return src
+
+
+@pytest.mark.parametrize("strategy", ["copy", "auto", "reflink", "copy_file_range", "hardlink"])
+def test_materialize_produces_identical_output(tmp_path: Path, strategy: str):
+    src = _source(tmp_path)
+    dst = tmp_path / "out.pdf"
+    chunks: list[bytes] = []
+
+    digest, size, used = materialize(src, dst, strategy, [chunks.append])
+
+    assert dst.read_bytes() == src.read_bytes()
+    assert digest == sha256_file(src)
+    assert size == src.stat().st_size
+    assert b"".join(chunks) == src.read_bytes()
+    assert used in {"copy", "reflink", "copy_file_range", "hardlink"}
+
+
+def test_materialize_falls_back_to_copy(tmp_path: Path, monkeypatch):
+    src = _source(tmp_path)
+    for name in list(fs_ops._MATERIALIZERS):
+        monkeypatch.setitem(fs_ops._MATERIALIZERS, name, lambda *_: False)
+
+    _, _, used = materialize(src, tmp_path / "out.pdf", "hardlink")
+    assert used == "copy"
+
+
+def test_sanitize_records_strategy_and_protects_hardlinked_sources(tmp_path: Path):
+    root = tmp_path / "fascicolo"
+    root.mkdir()
+    (root / "atto.pdf").write_bytes(b"%PDF-1.4\n%%EOF")
+
+    output, summary = sanitize(root, PROFILE, materialization="hardlink")
+    used = summary.files[0].output_strategy
+    row = json.loads((output / ".gdlex" / "REPORT.json").read_text(encoding="utf-8"))["files"][0]
+    assert row["materialization"] == used
+
+    (root / "atto.pdf").write_bytes(b"%PDF-1.5\n%%EOF")
+    sanitize(root, PROFILE, incremental=True, materialization="copy")
+    assert (root / "atto.pdf").read_bytes() == b"%PDF-1.5\n%%EOF"
+    assert (output / "atto.pdf").read_bytes() == b"%PDF-1.5\n%%EOF"
@@ -1,4 +1,4 @@
-from core.normalizer import sanitize_filename
+from core.normalizer import normalize_many, sanitize_filename
 
 
 def test_sanitize_filename_basic():
@@ -21,3 +21,18 @@ def test_sanitize_filename_removes_forbidden_chars_without_semantic_rewrite():
     src = "Nota: ufficiale*giudiziario?.pdf"
     out = sanitize_filename(src)
     assert out == "Nota_ufficiale_giudiziario.pdf"
+
+
+def test_sanitize_filename_matches_reference_implementation():
+    from benchmarks.bench_normalizer import _legacy_sanitize_filename, generate_names
+
+    tricky = ["", ".", "..pdf", "__a__.pdf", "-a-.pdf", "già_conforme.pdf", "a b.tar.gz", "x" * 90 + ".pdf", "ÀÉ.pdf", "a.", "..."]
+    for name in tricky + generate_names(2000, seed=3):
+        for max_len in (80, 10, 3):
+            assert sanitize_filename(name, max_len=max_len) == _legacy_sanitize_filename(name, max_len=max_len), name
+
+
+def test_normalize_many_keeps_order_and_duplicates():
+    names = ["Atto è.pdf", "procura.pdf", "Atto è.pdf"]
+    assert normalize_many(names, max_len=80) == ["Atto_e.pdf", "procura.pdf", "Atto_e.pdf"]
+    assert normalize_many([]) == []
@@ -0,0 +1,53 @@
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from cli.main import build_parser
+from core.parallel import map_ordered, resolve_jobs
+from core.sanitizer import analyze
+
+PROFILE = {
+    "allowed_formats": ["pdf", "txt", "zip"],
+    "warning_formats": ["png"],
+    "filename": {"max_length": 80},
+}
+
+
+def _make_dossier(root: Path) -> None:
+    root.mkdir()
+    for idx in range(12):
+        (root / f"atto {idx}.pdf").write_bytes(b"%PDF-1.4\n%%EOF")
+    (root / "rotto.pdf").write_bytes(b"nope")
+    (root / "foto.png").write_bytes(b"x")
+    sub = root / "allegati"
+    sub.mkdir()
+    with zipfile.ZipFile(sub / "pack.zip", "w") as zf:
+        zf.writestr("dir/doc.pdf", b"%PDF-1.4\n%%EOF")
+
+
+@pytest.mark.parametrize("backend", ["thread", "process"])
+def test_parallel_analyze_matches_serial(tmp_path: Path, backend: str):
+    root = tmp_path / "fascicolo"
+    _make_dossier(root)
+
+    serial = analyze(root, PROFILE)
+    parallel = analyze(root, PROFILE, jobs=4, backend=backend)
+
+    assert parallel.to_dict() == serial.to_dict()
+    assert parallel.excluded_paths == serial.excluded_paths
+
+
+def test_map_ordered_preserves_order():
+    assert map_ordered(pow, range(20), 2, jobs=4) == [n**2 for n in range(20)]
+
+
+def test_resolve_jobs_auto():
+    assert resolve_jobs(0) >= 1
+    assert resolve_jobs(3) == 3
+
+
+def test_cli_jobs_option():
+    args = build_parser().parse_args(["fascicolo", "--jobs", "8", "--backend", "process"])
+    assert args.jobs == 8
+    assert args.backend == "process"
@@ -0,0 +1,69 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from core.progress import STAGE_ANALYZE, STAGE_SANITIZE, CancelToken, OperationCancelled, ProgressEvent, ProgressMeter
+from core.sanitizer import analyze, sanitize
+
+PROFILE = {
+    "allowed_formats": ["pdf", "txt"],
+    "warning_formats": [],
+    "filename": {"max_length": 80},
+}
+
+
+def _dossier(tmp_path: Path, count: int = 5) -> Path:
+    root = tmp_path / "fascicolo"
+    root.mkdir()
+    for idx in range(count):
+        (root / f"atto_{idx}.pdf").write_bytes(b"%PDF-1.4\n%%EOF")
+    return root
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_analyze_reports_progress(tmp_path: Path, jobs: int):
+    root = _dossier(tmp_path)
+    events: list[ProgressEvent] = []
+    analyze(root, PROFILE, jobs=jobs, progress=events.append)
+    assert [(e.stage, e.done, e.total) for e in events] == [(STAGE_ANALYZE, n, 5) for n in range(1, 6)]
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_analyze_cancel(tmp_path: Path, jobs: int):
+    root = _dossier(tmp_path)
+    token = CancelToken()
+
+    def _progress(event: ProgressEvent) -> None:
+        if event.done == 2:
+            token.cancel()
+
+    with pytest.raises(OperationCancelled):
+        analyze(root, PROFILE, jobs=jobs, progress=_progress, cancel=token)
+
+
+def test_sanitize_cancel_writes_partial_report(tmp_path: Path):
+    root = _dossier(tmp_path)
+    token = CancelToken()
+
+    def _progress(event: ProgressEvent) -> None:
+        if event.stage == STAGE_SANITIZE and event.done == 2:
+            token.cancel()
+
+    with pytest.raises(OperationCancelled) as info:
+        sanitize(root, PROFILE, progress=_progress, cancel=token)
+
+    output = info.value.output_dir
+    assert sorted(p.name for p in output.iterdir() if p.is_file()) == ["atto_0.pdf", "atto_1.pdf"]
+    report = json.loads((output / ".gdlex" / "REPORT.json").read_text(encoding="utf-8"))
+    assert report["cancelled"] is True
+    assert [item.correction_outcome for item in info.value.summary.files].count("NON ESEGUITA") == 3
+
+
+def test_progress_meter_eta():
+    now = [0.0]
+    meter = ProgressMeter(clock=lambda: now[0])
+    meter.describe(ProgressEvent(STAGE_SANITIZE, 0, 10))
+    now[0] = 4.0
+    text = meter.describe(ProgressEvent(STAGE_SANITIZE, 2, 10, bytes_done=8 * 1024 * 1024))
+    assert text == "Correzione: 2/10 file | 0.5 file/s | 2.0 MB/s | ETA 16s"
@@ -0,0 +1,59 @@
+import json
+from pathlib import Path
+
+from core.sanitizer import iter_sanitize, sanitize
+from core.smart_namer import plan_names
+
+PROFILE = {"allowed_formats": ["pdf", "txt"], "warning_formats": [], "filename": {"max_length": 80}}
+SMART = {"enabled": True, "max_filename_len": 60, "max_output_path_len": 180}
+
+
+def _dossier(tmp_path: Path) -> Path:
+    root = tmp_path / "fascicolo"
+    for folder in ("scanner_1", "scanner_2", "scanner_3"):
+        (root / folder).mkdir(parents=True)
+        for name in ("scansione.pdf", "Scansione 1.pdf", "Scansione_1.pdf", "scansione_02.pdf"):
+            (root / folder / name).write_bytes(b"%PDF-1.4\n%%EOF")
+        (root / folder / "nota è.txt").write_bytes(folder.encode())
+    return root
+
+
+def _outputs(summary) -> list[tuple[str, str]]:
+    return [(item.source.relative_to(item.source.parents[1]).as_posix(), item.output_path.name) for item in summary.files]
+
+
+def test_plan_is_deterministic_and_resolves_collisions_globally(tmp_path: Path):
+    sources = [tmp_path / "a" / "scansione.pdf", tmp_path / "b" / "scansione.pdf", tmp_path / "c" / "scansione_02.pdf"]
+    first = plan_names(sources, tmp_path / "out", SMART)
+
+    assert [planned.target for planned in first] == ["scansione.pdf", "scansione_02.pdf", "scansione_02_02.pdf"]
+    assert plan_names(sources, tmp_path / "out", SMART) == first
+
+
+def test_dry_run_plan_matches_parallel_output(tmp_path: Path):
+    root = _dossier(tmp_path)
+
+    _, planned = sanitize(root, PROFILE, dry_run=True, output_mode="custom", custom_output_dir=tmp_path / "seq")
+    plan = planned.stats["plan"]
+    assert not (tmp_path / "seq").exists()
+    assert plan["output"] == str(tmp_path / "seq" / "fascicolo_conforme")
+
+    _, sequential = sanitize(root, PROFILE, output_mode="custom", custom_output_dir=tmp_path / "seq")
+    out, parallel = sanitize(root, PROFILE, output_mode="custom", custom_output_dir=tmp_path / "par", jobs=4)
+
+    assert [row["target"] for row in plan["files"]] == [item.output_path.name for item in sequential.files]
+    assert [item.suggested_name for item in planned.files] == [row["target"] for row in plan["files"]]
+    assert _outputs(parallel) == _outputs(sequential)
+    assert [item.correction_outcome for item in parallel.files] == [item.correction_outcome for item in sequential.files]
+    report = json.loads((out / ".gdlex" / "REPORT.json").read_text(encoding="utf-8"))
+    assert report["io"]["output_bytes_written"] == sequential.stats["io"]["output_bytes_written"]
+
+
+def test_iter_sanitize_dry_run_streams_planned_names(tmp_path: Path):
+    root = _dossier(tmp_path)
+    _, planned = sanitize(root, PROFILE, dry_run=True)
+
+    streamed = [item.suggested_name for item in iter_sanitize(root, PROFILE, dry_run=True, jobs=2)]
+
+    assert streamed == [row["target"] for row in planned.stats["plan"]["files"]]
+    assert len(set(streamed)) == len(streamed)
@@ -21,3 +21,18 @@ def test_sanitize_collision_resolved_incrementally(tmp_path: Path):
     assert outputs[0] != outputs[1]
     assert any("_02" in name for name in outputs)
     assert all(item.correction_outcome in {"CORRETTA", "OK", "PARZIALE"} for item in summary.files)
+
+
+def test_sanitize_case_insensitive_names(tmp_path: Path):
+    root = tmp_path / "input"
+    (root / "a").mkdir(parents=True)
+    (root / "b").mkdir()
+    (root / "a" / "Atto.pdf").write_bytes(b"%PDF-1.4\n%%EOF")
+    (root / "b" / "atto.pdf").write_bytes(b"%PDF-1.4\n%%EOF")
+    profile = {"allowed_formats": ["pdf"], "warning_formats": [], "filename": {"max_length": 80}}
+
+    out, _ = sanitize(root, profile, output_mode="custom", custom_output_dir=tmp_path / "cs")
+    assert sorted(p.name for p in out.iterdir() if p.is_file()) == ["Atto.pdf", "atto.pdf"]
+
+    out, _ = sanitize(root, profile, output_mode="custom", custom_output_dir=tmp_path / "ci", smart_opts={"case_insensitive_names": True})
+    assert sorted(p.name for p in out.iterdir() if p.is_file()) == ["Atto.pdf", "atto_02.pdf"]
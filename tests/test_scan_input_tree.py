@@ -0,0 +1,59 @@
+import os
+from pathlib import Path
+
+from core.sanitizer import iter_input_files
+
+
+def _legacy_files(root: Path) -> list[Path]:
+    def ignored(path: Path) -> bool:
+        parts = [p.lower() for p in path.parts]
+        if ".gdlex" in parts or any(p.endswith(("_conforme", "_sanitized")) for p in parts):
+            return True
+        return path.name.lower() in {"report.json", "report.txt", "manifest.csv"}
+
+    return [p for p in sorted(root.rglob("*")) if p.is_file() and not ignored(p)]
+
+
+def _tree(root: Path) -> None:
+    for rel in ["a.pdf", "a/b.pdf", "a.b/c.txt", "A/z.pdf", "B.pdf", "x/y/z/deep.pdf", "x/REPORT.json", "x_sanitized/q.pdf"]:
+        target = root / rel
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(b"x")
+    gdlex = root / "x" / ".gdlex" / "backup_originali"
+    gdlex.mkdir(parents=True)
+    for idx in range(20):
+        (gdlex / f"old_{idx}.pdf").write_bytes(b"x")
+    conforme = root / "fascicolo_conforme"
+    conforme.mkdir()
+    (conforme / "atto.pdf").write_bytes(b"x")
+
+
+def test_scan_matches_legacy_order_and_prunes(tmp_path: Path, monkeypatch):
+    root = tmp_path / "in"
+    _tree(root)
+
+    visited: list[str] = []
+    real_scandir = os.scandir
+
+    def _tracking(path):
+        visited.append(os.fspath(path))
+        return real_scandir(path)
+
+    monkeypatch.setattr(os, "scandir", _tracking)
+    files, excluded = iter_input_files(root)
+    monkeypatch.setattr(os, "scandir", real_scandir)
+
+    assert files == _legacy_files(root)
+    assert sorted(Path(p).name for p, _ in excluded) == [".gdlex", "REPORT.json", "fascicolo_conforme", "x_sanitized"]
+    assert not any(Path(v).name in {".gdlex", "fascicolo_conforme", "x_sanitized"} for v in visited), visited
+
+
+def test_scan_skips_symlinked_directories(tmp_path: Path):
+    root = tmp_path / "in"
+    (root / "real").mkdir(parents=True)
+    (root / "real" / "doc.pdf").write_bytes(b"x")
+    (root / "link").symlink_to(root / "real", target_is_directory=True)
+    (root / "file_link.pdf").symlink_to(root / "real" / "doc.pdf")
+
+    files, _ = iter_input_files(root)
+    assert files == _legacy_files(root)
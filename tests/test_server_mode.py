@@ -0,0 +1,166 @@
+import http.client
+import json
+import socket
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+import core.server as server_mod
+from core.server import ServerError, ValidationClient, ValidationService, create_server
+
+CONFIG = {
+    "profiles": {
+        "standard": {"allowed_formats": ["pdf", "txt"], "warning_formats": [], "filename": {"max_length": 80}},
+        "solo_txt": {"allowed_formats": ["txt"], "warning_formats": [], "filename": {"max_length": 80}},
+    }
+}
+
+
+@pytest.fixture()
+def running_server():
+    started = []
+
+    def _start(socket_path: Path | None = None, **service_kwargs):
+        service = ValidationService(CONFIG, default_profile="standard", **service_kwargs)
+        server = create_server(service, socket_path=socket_path, port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        started.append((server, service, thread))
+        if socket_path is not None:
+            return ValidationClient(socket_path=socket_path, timeout=10, token=service.token)
+        return ValidationClient(port=server.server_address[1], timeout=10, token=service.token)
+
+    yield _start
+    for server, service, thread in started:
+        server.shutdown()
+        server.server_close()
+        service.close()
+        thread.join()
+
+
+def _dossier(tmp_path: Path) -> Path:
+    root = tmp_path / "fascicolo"
+    root.mkdir()
+    (root / "atto.pdf").write_bytes(b"%PDF-1.4\n%%EOF")
+    (root / "nota.txt").write_bytes(b"ciao")
+    return root
+
+
+def test_http_analyze_sanitize_and_upload(tmp_path: Path, running_server):
+    client = running_server()
+    root = _dossier(tmp_path)
+
+    health = client.health()
+    assert health["profiles"] == ["solo_txt", "standard"]
+
+    record = client.analyze(root)
+    assert record["exit_code"] == 0
+    assert [item["status"] for item in record["summary"]["files"]] == ["ok", "ok"]
+
+    record = client.analyze(root, profile="solo_txt")
+    assert record["exit_code"] == 1
+
+    record = client.analyze(data=b"non un pdf", filename="../../rotto.pdf")
+    assert record["input"] == "rotto.pdf"
+    assert record["summary"]["files"][0]["status"] == "error"
+
+    record = client.sanitize(root, output=tmp_path / "out")
+    assert record["output"] == str(tmp_path / "out" / "fascicolo_conforme")
+    assert (tmp_path / "out" / "fascicolo_conforme" / "atto.pdf").is_file()
+
+    with pytest.raises(ServerError) as excinfo:
+        client.analyze(root, profile="inesistente")
+    assert excinfo.value.status == 400
+
+
+def test_concurrency_limit_rejects_when_busy(tmp_path: Path, running_server, monkeypatch):
+    release = threading.Event()
+    entered = threading.Event()
+    real_run = server_mod.run_dossier
+
+    def _slow(*args):
+        entered.set()
+        release.wait(10)
+        return real_run(*args)
+
+    monkeypatch.setattr(server_mod, "run_dossier", _slow)
+    client = running_server(max_concurrent=1, queue_timeout=0.05)
+    root = _dossier(tmp_path)
+    first: list[dict] = []
+    worker = threading.Thread(target=lambda: first.append(client.analyze(root)))
+    worker.start()
+    assert entered.wait(5)
+
+    with pytest.raises(ServerError) as excinfo:
+        client.analyze(root)
+    release.set()
+    worker.join(10)
+
+    assert excinfo.value.status == 503
+    assert first and first[0]["exit_code"] == 0
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="socket Unix non disponibili")
+def test_unix_socket_transport(tmp_path: Path, running_server):
+    socket_path = tmp_path / "gdlex.sock"
+    client = running_server(socket_path=socket_path)
+
+    record = client.analyze(_dossier(tmp_path))
+
+    assert record["files"] == 2
+    assert socket_path.stat().st_mode & 0o777 == 0o600
+
+
+def _raw_post(client: ValidationClient, path: str, headers: dict, body: bytes, truncated: bool = False) -> tuple[int, dict]:
+    conn = http.client.HTTPConnection(client.host, client.port, timeout=10)
+    try:
+        conn.putrequest("POST", path, skip_host=True)
+        for key, value in headers.items():
+            conn.putheader(key, value)
+        conn.endheaders()
+        conn.send(body)
+        if truncated:
+            conn.sock.shutdown(socket.SHUT_WR)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+def test_requests_need_token_local_host_and_json(tmp_path: Path, running_server):
+    client = running_server()
+    body = json.dumps({"path": str(_dossier(tmp_path))}).encode("utf-8")
+    valid = {"Host": f"localhost:{client.port}", "X-GDLEX-Token": client.token, "Content-Type": "application/json"}
+
+    def _post(body: bytes = body, **changes) -> int:
+        headers = {key: value for key, value in {**valid, **changes}.items() if value is not None}
+        return _raw_post(client, "/analyze", {**headers, "Content-Length": str(len(body))}, body)[0]
+
+    assert _post() == 200
+    assert _post(**{"Host": f"[::1]:{client.port}"}) == 200
+    assert _post(**{"X-GDLEX-Token": None}) == 401
+    assert _post(**{"X-GDLEX-Token": "indovinato"}) == 401
+    assert _post(**{"Host": "attaccante.example:8765"}) == 403
+    assert _post(**{"Host": None}) == 403
+    assert _post(**{"Content-Type": "text/plain"}) == 415
+    assert _post(**{"Content-Type": None}) == 415
+
+    with pytest.raises(ServerError) as excinfo:
+        ValidationClient(port=client.port, timeout=10).health()
+    assert excinfo.value.status == 401
+
+
+def test_truncated_upload_is_rejected(running_server):
+    client = running_server()
+    headers = {
+        "Host": "127.0.0.1",
+        "X-GDLEX-Token": client.token,
+        "Content-Type": "application/octet-stream",
+        "Content-Length": "1000",
+    }
+    status, payload = _raw_post(client, "/analyze?filename=atto.pdf", headers, b"%PDF-1.4 troncato", truncated=True)
+
+    assert status == 400
+    assert "Content-Length" in payload["error"]
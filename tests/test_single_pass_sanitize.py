@@ -0,0 +1,45 @@
+import json
+from pathlib import Path
+
+import core.validators as validators
+from core.sanitizer import OUTCOME_IMPOSSIBLE, sanitize
+
+PROFILE = {
+    "allowed_formats": ["pdf", "txt"],
+    "warning_formats": [],
+    "filename": {"max_length": 80},
+}
+
+
+def test_plain_files_are_read_once(tmp_path: Path, monkeypatch):
+    root = tmp_path / "fascicolo"
+    root.mkdir()
+    (root / "atto.pdf").write_bytes(b"%PDF-1.4\n" + b"x" * 3_000_000 + b"\n%%EOF")
+    (root / "cifrato.pdf").write_bytes(b"%PDF-1.4\n/Encrypt 1 0 R\n%%EOF")
+    (root / "nota.txt").write_bytes(b"ciao")
+
+    def _no_reread(*_args, **_kwargs):
+        raise AssertionError("PDF riletto da disco")
+
+    monkeypatch.setattr(validators, "validate_pdf", _no_reread)
+    output, summary = sanitize(root, PROFILE)
+
+    by_name = {item.source.name: item for item in summary.files}
+    assert [i.code for i in by_name["cifrato.pdf"].issues] == ["pdf_encrypted"]
+    assert by_name["atto.pdf"].status == "ok"
+    assert (output / "atto.pdf").read_bytes() == (root / "atto.pdf").read_bytes()
+
+    io_stats = json.loads((output / ".gdlex" / "REPORT.json").read_text(encoding="utf-8"))["io"]
+    assert io_stats["read_per_output_byte"] == 1.0
+    assert io_stats["output_bytes_written"] == sum(p.stat().st_size for p in root.iterdir())
+
+
+def test_excluded_files_keep_content_issues(tmp_path: Path):
+    root = tmp_path / "fascicolo"
+    root.mkdir()
+    (root / "rotto.pdf").write_bytes(b"nope")
+
+    _, summary = sanitize(root, {**PROFILE, "allowed_formats": ["txt"]})
+    item = summary.files[0]
+    assert item.correction_outcome == OUTCOME_IMPOSSIBLE
+    assert [i.code for i in item.issues] == ["ext_forbidden", "pdf_header"]
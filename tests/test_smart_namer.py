@@ -1,6 +1,6 @@
 from pathlib import Path
 
-from core.smart_namer import detect_uuid_like, ensure_unique, smart_rename
+from core.smart_namer import NameAllocator, detect_uuid_like, ensure_unique, smart_rename
 
 
 def test_detect_uuid_like_true():
@@ -41,3 +41,24 @@ def test_smart_rename_preserves_words_no_semantic_substitution():
     )
     assert candidate == "Nota_per_Ufficiale_Giudiziario_signed.pdf"
     assert "Notifica" not in candidate
+
+
+def test_name_allocator_matches_linear_probe():
+    import random
+
+    rng = random.Random(5)
+    pool = ["scansione.pdf", "scansione_02.pdf", "scansione_03.pdf", "documento.pdf", "documento_02_02.pdf", "a.tar.gz"]
+    legacy: set[str] = set()
+    allocator = NameAllocator()
+    for _ in range(3000):
+        name = rng.choice(pool)
+        assert ensure_unique(allocator, name) == ensure_unique(legacy, name)
+    assert len(allocator) == len(legacy)
+
+
+def test_name_allocator_case_insensitive():
+    allocator = NameAllocator(["Scansione.PDF"], case_insensitive=True)
+    assert "scansione.pdf" in allocator
+    assert allocator.allocate("scansione.pdf") == "scansione_02.pdf"
+    assert allocator.allocate("SCANSIONE.pdf") == "SCANSIONE_03.pdf"
+    assert NameAllocator(["Scansione.PDF"]).allocate("scansione.pdf") == "scansione.pdf"
@@ -0,0 +1,103 @@
+import json
+import threading
+import zipfile
+from pathlib import Path
+
+from cli.main import main
+from core.sanitizer import analyze, sanitize
+from core.timings import NULL_TIMINGS, StageTimings
+
+PROFILE = {
+    "allowed_formats": ["pdf", "txt", "zip"],
+    "warning_formats": [],
+    "filename": {"max_length": 80},
+}
+
+
+def _dossier(tmp_path: Path) -> Path:
+    root = tmp_path / "fascicolo"
+    (root / "sub").mkdir(parents=True)
+    (root / "atto.pdf").write_bytes(b"%PDF-1.4\n" + b"x" * 100_000 + b"\n%%EOF")
+    (root / "sub" / "nota.txt").write_bytes(b"ciao")
+    with zipfile.ZipFile(root / "allegati.zip", "w") as zf:
+        zf.writestr("a/b.pdf", b"%PDF-1.4\n%%EOF")
+    return root
+
+
+def test_sanitize_records_stages_in_report(tmp_path: Path):
+    root = _dossier(tmp_path)
+    timings = StageTimings(slowest=2)
+
+    output, summary = sanitize(root, PROFILE, timings=timings)
+
+    report = json.loads((output / ".gdlex" / "REPORT.json").read_text(encoding="utf-8"))
+    stages = report["timings"]["stages"]
+    assert set(stages) == {"scan", "validate", "copy", "zip_rebuild", "hash", "report"}
+    assert stages["scan"]["count"] == 3
+    assert stages["copy"]["count"] == 2
+    assert stages["copy"]["bytes"] == (root / "atto.pdf").stat().st_size + 4
+    assert stages["zip_rebuild"]["count"] == stages["hash"]["count"] == 1
+    assert len(report["timings"]["slowest_files"]) == 2
+    assert summary.stats["timings"] == report["timings"]
+
+
+def test_disabled_timings_leave_report_untouched(tmp_path: Path):
+    root = _dossier(tmp_path)
+
+    output, summary = sanitize(root, PROFILE)
+
+    report = json.loads((output / ".gdlex" / "REPORT.json").read_text(encoding="utf-8"))
+    assert "timings" not in report
+    assert "timings" not in summary.stats
+    with NULL_TIMINGS.stage("copy") as span:
+        span.bytes = 10
+    assert not hasattr(NULL_TIMINGS, "stages")
+
+
+def test_slowest_files_sum_stages_with_fake_clock():
+    ticks = iter([0.0, 0.0, 3.0, 3.0, 4.0, 9.0])
+    timings = StageTimings(slowest=1, clock=lambda: next(ticks))
+
+    with timings.stage("copy", Path("a.pdf"), 100):
+        pass
+    with timings.stage("validate", Path("b.pdf")):
+        pass
+    timings.add("hash", 1.0, path=Path("b.pdf"))
+    data = timings.to_dict()
+
+    assert data["total_seconds"] == 9.0
+    assert data["stages"]["copy"] == {"seconds": 3.0, "count": 1, "bytes": 100, "mb_s": 0.0}
+    assert data["slowest_files"] == [{"path": "a.pdf", "seconds": 3.0, "stages": {"copy": 3.0}}]
+
+
+def test_analyze_and_cli_print_timings(tmp_path: Path, capsys):
+    root = _dossier(tmp_path)
+
+    summary = analyze(root, PROFILE, timings=StageTimings())
+    assert summary.stats["timings"]["stages"]["validate"]["count"] == 3
+
+    main([str(root), "--analyze", "--timings", "--profile", "standard"])
+    out = capsys.readouterr().out
+    assert "Tempi per fase" in out
+    assert "validate" in out
+
+
+def test_reads_are_consistent_while_workers_record():
+    timings = StageTimings(slowest=3)
+    done = threading.Event()
+
+    def _record(worker: int) -> None:
+        for index in range(2000):
+            timings.add("copy", 0.001, 10, Path(f"w{worker}/file_{index}.pdf"))
+        done.set()
+
+    workers = [threading.Thread(target=_record, args=(worker,)) for worker in range(4)]
+    for worker in workers:
+        worker.start()
+    while not done.is_set():
+        snapshot = timings.to_dict()
+        assert len(snapshot["slowest_files"]) <= 3
+    for worker in workers:
+        worker.join()
+
+    assert timings.to_dict()["stages"]["copy"]["count"] == 8000
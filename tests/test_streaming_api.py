@@ -0,0 +1,79 @@
+import json
+from pathlib import Path
+
+import core.sanitizer as sanitizer
+from cli.main import main
+from core.sanitizer import OUTCOME_NOT_RUN, analyze, iter_analyze, iter_sanitize
+
+PROFILE = {
+    "allowed_formats": ["pdf", "txt"],
+    "warning_formats": [],
+    "filename": {"max_length": 80},
+}
+
+
+def _dossier(tmp_path: Path, count: int = 5) -> Path:
+    root = tmp_path / "fascicolo"
+    root.mkdir()
+    for idx in range(count):
+        (root / f"atto {idx}.pdf").write_bytes(b"%PDF-1.4\n%%EOF")
+    (root / "rotto.txt").write_bytes(b"ok")
+    return root
+
+
+def test_iter_analyze_matches_analyze_and_is_lazy(tmp_path: Path, monkeypatch):
+    root = _dossier(tmp_path)
+    expected = [item.to_dict() for item in analyze(root, PROFILE).files]
+
+    validated = []
+    real_validate = sanitizer.validate_path
+    monkeypatch.setattr(sanitizer, "validate_path", lambda path, *a, **k: validated.append(path) or real_validate(path, *a, **k))
+    results = iter_analyze(root, PROFILE)
+    first = next(results)
+
+    assert len(validated) == 1
+    assert first.correction_outcome == OUTCOME_NOT_RUN
+    assert [first.to_dict()] + [item.to_dict() for item in results] == expected
+
+
+def test_iter_sanitize_yields_each_file_then_writes_reports(tmp_path: Path):
+    root = _dossier(tmp_path)
+    out = tmp_path / "out"
+    report = out / "fascicolo_conforme" / ".gdlex" / "REPORT.json"
+
+    seen = []
+    for item in iter_sanitize(root, PROFILE, output_mode="custom", custom_output_dir=out):
+        assert item.output_path is not None and item.output_path.is_file()
+        assert not report.exists()
+        seen.append(item.source.name)
+
+    assert len(seen) == 6
+    assert len(json.loads(report.read_text(encoding="utf-8"))["files"]) == 6
+
+
+def test_closing_iter_sanitize_early_writes_partial_report(tmp_path: Path):
+    root = _dossier(tmp_path)
+    out = tmp_path / "out"
+
+    results = iter_sanitize(root, PROFILE, output_mode="custom", custom_output_dir=out)
+    next(results)
+    next(results)
+    results.close()
+
+    data = json.loads((out / "fascicolo_conforme" / ".gdlex" / "REPORT.json").read_text(encoding="utf-8"))
+    assert data["cancelled"] is True
+    assert sum(1 for row in data["files"] if row["target"]) == 2
+
+
+def test_cli_ndjson_prints_one_line_per_file(tmp_path: Path, capsys):
+    root = _dossier(tmp_path, count=3)
+    (root / "virus.exe").write_bytes(b"x")
+
+    code = main([str(root), "--ndjson", "--profile", "standard"])
+
+    lines = capsys.readouterr().out.splitlines()
+    records = [json.loads(line) for line in lines]
+    assert code == 1
+    assert len(records) == 5
+    assert [record["source"] for record in records][-1].endswith("virus.exe")
+    assert records[-1]["status"] == "error"
@@ -0,0 +1,40 @@
+from pathlib import Path
+
+import pytest
+
+from core.models import Issue
+from core.validators import validate_pdf
+
+
+def _legacy_validate_pdf(blob: bytes) -> list[Issue]:
+    issues: list[Issue] = []
+    if not blob.startswith(b"%PDF"):
+        return [Issue("error", "pdf_header", "Header PDF non valido.")]
+    if b"%%EOF" not in blob[-2048:]:
+        issues.append(Issue("error", "pdf_integrity", "Trailer EOF PDF non trovato; file potenzialmente corrotto."))
+    if b"/Encrypt" in blob:
+        issues.append(Issue("error", "pdf_encrypted", "PDF cifrato/non apribile senza password."))
+    if b"/ByteRange" in blob and b"/Contents" in blob:
+        issues.append(Issue("info", "pades_detected", "Possibile firma PAdES rilevata."))
+    return issues
+
+
+SAMPLES = [
+    b"",
+    b"%PD",
+    b"nope %PDF",
+    b"%PDF-1.4\n%%EOF",
+    b"%PDF-1.4\n" + b"x" * 5000 + b"\n%%EOF",
+    b"%PDF-1.4\n%%EOF\n" + b"x" * 5000,
+    b"%PDF-1.4\n/Encrypt 5 0 R\n%%EOF",
+    b"%PDF-1.4\n" + b"a" * 61 + b"/ByteRange [0 1 2 3]" + b"b" * 77 + b"/Contents <00>\n%%EOF",
+    b"%PDF-1.4\n" + b"/Contents" + b"z" * 300,
+]
+
+
+@pytest.mark.parametrize("blob", SAMPLES)
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1024 * 1024])
+def test_streaming_pdf_matches_full_read(tmp_path: Path, blob: bytes, chunk_size: int):
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(blob)
+    assert validate_pdf(path, chunk_size=chunk_size) == _legacy_validate_pdf(blob)
@@ -0,0 +1,91 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+import core.watch as watch
+from core.constants import WATCH_INOTIFY, WATCH_POLL
+from core.watch import EVENT_ADDED, EVENT_CHANGED, EVENT_REMOVED, DossierWatcher
+
+PROFILE = {
+    "allowed_formats": ["pdf", "txt"],
+    "warning_formats": [],
+    "filename": {"max_length": 80},
+}
+
+
+def _dossier(tmp_path: Path) -> Path:
+    root = tmp_path / "fascicolo"
+    (root / "sub").mkdir(parents=True)
+    (root / "atto.pdf").write_bytes(b"%PDF-1.4\n%%EOF")
+    (root / "sub" / "nota.txt").write_bytes(b"ciao")
+    return root
+
+
+def _events(updates) -> list[tuple[str, str]]:
+    return [(update.event, update.path.name) for update in updates]
+
+
+def test_polling_watch_revalidates_only_changed_files(tmp_path: Path, monkeypatch):
+    root = _dossier(tmp_path)
+    watcher = DossierWatcher(root, PROFILE, debounce=0, backend=WATCH_POLL, poll_interval=0)
+    assert sorted(_events(watcher.start())) == [(EVENT_ADDED, "atto.pdf"), (EVENT_ADDED, "nota.txt")]
+
+    validated = []
+    real_validate = watch.validate_path
+    monkeypatch.setattr(watch, "validate_path", lambda path, *a, **k: validated.append(path.name) or real_validate(path, *a, **k))
+
+    (root / "atto.pdf").write_bytes(b"rotto, non un PDF")
+    (root / "nuovo.txt").write_bytes(b"x")
+    (root / "sub" / "nota.txt").unlink()
+    (root / ".gdlex").mkdir()
+    (root / ".gdlex" / "REPORT.json").write_text("{}", encoding="utf-8")
+    updates = watcher.step(0)
+    watcher.close()
+
+    assert _events(updates) == [(EVENT_REMOVED, "nota.txt"), (EVENT_CHANGED, "atto.pdf"), (EVENT_ADDED, "nuovo.txt")]
+    assert sorted(validated) == ["atto.pdf", "nuovo.txt"]
+    assert watcher.index[root / "atto.pdf"].status == "error"
+    assert set(watcher.index) == {root / "atto.pdf", root / "nuovo.txt"}
+
+
+def test_debounce_waits_for_quiet_period(tmp_path: Path):
+    root = _dossier(tmp_path)
+    now = [100.0]
+    watcher = DossierWatcher(root, PROFILE, debounce=5, backend=WATCH_POLL, poll_interval=0, clock=lambda: now[0])
+    list(watcher.start())
+
+    (root / "atto.pdf").write_bytes(b"%PDF-1.4\n% copia in corso")
+    assert watcher.step(0) == []
+    now[0] += 2
+    assert watcher.step(0) == []
+    now[0] += 3
+    updates = watcher.step(0)
+    watcher.close()
+
+    assert _events(updates) == [(EVENT_CHANGED, "atto.pdf")]
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify solo su Linux")
+def test_inotify_reports_new_files_in_new_folders(tmp_path: Path):
+    root = _dossier(tmp_path)
+    watcher = DossierWatcher(root, PROFILE, debounce=0, backend=WATCH_INOTIFY)
+    try:
+        list(watcher.start())
+    except OSError as exc:  # pragma: no cover - kernel senza inotify o watch esaurite
+        pytest.skip(f"inotify non disponibile: {exc}")
+    assert watcher.source_name == WATCH_INOTIFY
+
+    (root / "nuova").mkdir()
+    (root / "nuova" / "memoria.pdf").write_bytes(b"%PDF-1.4\n%%EOF")
+    os.rename(root / "sub", tmp_path / "fuori")
+
+    seen: list[tuple[str, str]] = []
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline and len(seen) < 2:
+        seen.extend(_events(watcher.step(0.2)))
+    watcher.close()
+
+    assert sorted(seen) == [(EVENT_ADDED, "memoria.pdf"), (EVENT_REMOVED, "nota.txt")]
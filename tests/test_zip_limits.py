@@ -0,0 +1,92 @@
+import io
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from core.cache import AnalysisCache
+from core.config import ZipLimits
+from core.sanitizer import OUTCOME_IMPOSSIBLE, sanitize
+from core.validators import ZipGuard, ZipLimitExceeded, validate_path
+
+PROFILE = {"allowed_formats": ["pdf", "txt", "zip"], "warning_formats": [], "filename": {"max_length": 80}}
+
+
+def _zip_bytes(entries: dict[str, bytes], compression: int = zipfile.ZIP_DEFLATED) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=compression) as zf:
+        for name, data in entries.items():
+            zf.writestr(name, data)
+    return buffer.getvalue()
+
+
+def _codes(result) -> list[str]:
+    return [issue.code for issue in result.issues]
+
+
+def test_central_directory_limits(tmp_path: Path):
+    many = tmp_path / "molti.zip"
+    many.write_bytes(_zip_bytes({f"nota_{index}.txt": b"x" for index in range(10)}))
+    bomb = tmp_path / "bomba.zip"
+    bomb.write_bytes(_zip_bytes({"zeri.txt": bytes(4 * 1024 * 1024)}))
+
+    assert _codes(validate_path(many, {**PROFILE, "zip": {"max_entries": 5}})) == ["zip_bomb"]
+    assert validate_path(many, PROFILE).status == "ok"
+
+    result = validate_path(bomb, PROFILE)
+    assert result.status == "error"
+    assert _codes(result) == ["zip_bomb"]
+    assert "zeri.txt" in result.issues[0].message
+    assert validate_path(bomb, {**PROFILE, "zip": {"max_ratio": 100000}}).status == "ok"
+
+
+def test_total_bytes_are_cumulative_across_nested_archives(tmp_path: Path):
+    inner = _zip_bytes({"atto.txt": b"a" * 4000}, compression=zipfile.ZIP_STORED)
+    target = tmp_path / "annidato.zip"
+    target.write_bytes(_zip_bytes({"primo.zip": inner, "secondo.zip": inner}, compression=zipfile.ZIP_STORED))
+
+    limited = validate_path(target, {**PROFILE, "zip": {"max_total_bytes": 10000}})
+
+    assert _codes(limited) == ["zip_bomb"]
+    assert validate_path(target, PROFILE).status == "ok"
+
+
+def test_stream_rejects_entries_larger_than_declared():
+    info = zipfile.ZipInfo("bugiardo.txt")
+    info.file_size = 10
+    info.compress_size = 10
+    guard = ZipGuard(ZipLimits())
+
+    with pytest.raises(ZipLimitExceeded):
+        list(guard.stream(io.BytesIO(b"x" * 100), info, chunk_size=8))
+    assert guard.breached
+
+
+def test_sanitize_excludes_zip_bomb_without_output(tmp_path: Path):
+    root = tmp_path / "fascicolo"
+    root.mkdir()
+    (root / "bomba.zip").write_bytes(_zip_bytes({"zeri.txt": bytes(4 * 1024 * 1024)}, compression=zipfile.ZIP_BZIP2))
+    (root / "atto.pdf").write_bytes(b"%PDF-1.4\n%%EOF")
+
+    # senza cache l'analisi è solo su nome ed estensione: il limite scatta durante la ricostruzione
+    for index, cache in enumerate((None, AnalysisCache(tmp_path / "cache"))):
+        out, summary = sanitize(root, PROFILE, output_mode="custom", custom_output_dir=tmp_path / f"out_{index}", cache=cache)
+        bomb = next(item for item in summary.files if item.source.name == "bomba.zip")
+
+        assert bomb.correction_outcome == OUTCOME_IMPOSSIBLE
+        assert _codes(bomb).count("zip_bomb") == 1
+        assert not (out / "bomba.zip").exists()
+        assert (out / "atto.pdf").exists()
+
+
+def test_default_limits_accept_large_dossiers(tmp_path: Path):
+    root = tmp_path / "fascicolo"
+    root.mkdir()
+    (root / "allegati.zip").write_bytes(_zip_bytes({f"nota_{index:05d}.txt": b"notifica" for index in range(12_000)}))
+
+    assert validate_path(root / "allegati.zip", PROFILE).status == "ok"
+    out, summary = sanitize(root, PROFILE, output_mode="custom", custom_output_dir=tmp_path / "out", cache=AnalysisCache(tmp_path / "cache"))
+
+    assert summary.files[0].status == "ok"
+    with zipfile.ZipFile(out / "allegati.zip") as zf:
+        assert len(zf.infolist()) == 12_000
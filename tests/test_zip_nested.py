@@ -0,0 +1,88 @@
+import io
+import zipfile
+from pathlib import Path
+
+from core.sanitizer import analyze, sanitize
+from core.validators import validate_path
+
+PROFILE = {
+    "allowed_formats": ["pdf", "zip"],
+    "warning_formats": [],
+    "filename": {"max_length": 80},
+}
+
+
+def _zip_bytes(entries: dict[str, bytes], compression: int = zipfile.ZIP_DEFLATED) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=compression) as zf:
+        for name, data in entries.items():
+            zf.writestr(name, data)
+    return buffer.getvalue()
+
+
+def _codes(issues) -> list[tuple[str, str]]:
+    return [(issue.code, issue.message) for issue in issues]
+
+
+def test_nested_zip_contents_are_validated_with_full_path(tmp_path: Path):
+    inner = _zip_bytes({"atto.pdf": b"%PDF-1.4\n%%EOF", "virus.exe": b"MZ", "__MACOSX/._atto.pdf": b"x"})
+    middle = _zip_bytes({"interno.zip": inner}, compression=zipfile.ZIP_STORED)
+    outer = tmp_path / "fascicolo.zip"
+    outer.write_bytes(_zip_bytes({"medio.zip": middle, "memoria.pdf": b"%PDF-1.4\n%%EOF"}))
+
+    result = validate_path(outer, PROFILE)
+
+    assert result.status == "error"
+    assert ("zip_ext_forbidden", "Formato non ammesso nello ZIP: medio.zip/interno.zip/virus.exe") in _codes(result.issues)
+    assert ("zip_junk", "Elemento non ammesso nello ZIP: medio.zip/interno.zip/__MACOSX/._atto.pdf") in _codes(result.issues)
+    assert not list(tmp_path.glob("*.exe"))
+
+
+def test_depth_limit_and_spool_cap(tmp_path: Path):
+    level = _zip_bytes({"fondo.pdf": b"%PDF-1.4\n%%EOF"})
+    for index in range(3):
+        level = _zip_bytes({f"livello{index}.zip": level})
+    target = tmp_path / "profondo.zip"
+    target.write_bytes(level)
+
+    limited = validate_path(target, {**PROFILE, "zip": {"max_depth": 1}})
+    assert [issue.code for issue in limited.issues] == ["zip_depth_limit"]
+    assert "livello2.zip/livello1.zip" in limited.issues[0].message
+
+    capped = validate_path(target, {**PROFILE, "zip": {"max_inner_bytes": 10}})
+    assert [issue.code for issue in capped.issues] == ["zip_inner_too_large"]
+
+    assert validate_path(target, PROFILE).status == "ok"
+
+
+def test_corrupt_nested_zip_is_reported(tmp_path: Path):
+    target = tmp_path / "rotto.zip"
+    target.write_bytes(_zip_bytes({"interno.zip": b"non uno zip"}))
+
+    result = validate_path(target, PROFILE)
+
+    assert _codes(result.issues) == [("zip_corrupt", "Archivio ZIP annidato corrotto o illeggibile: interno.zip")]
+
+
+def test_corrupt_deflate_stream_in_nested_zip_does_not_abort_the_run(tmp_path: Path):
+    root = tmp_path / "fascicolo"
+    root.mkdir()
+    target = root / "rotto.zip"
+    target.write_bytes(_zip_bytes({"interno.zip": _zip_bytes({"atto.pdf": b"%PDF-1.4\n%%EOF" * 50})}))
+    with zipfile.ZipFile(target) as zf:
+        info = zf.getinfo("interno.zip")
+    data = bytearray(target.read_bytes())
+    # primo byte del flusso deflate: blocco di tipo riservato, zlib.error alla decompressione
+    data[info.header_offset + 30 + len("interno.zip")] = 0xFF
+    target.write_bytes(bytes(data))
+    (root / "atto.pdf").write_bytes(b"%PDF-1.4\n%%EOF")
+    expected = [("zip_corrupt", "Archivio ZIP annidato corrotto o illeggibile: interno.zip")]
+
+    assert _codes(validate_path(target, PROFILE).issues) == expected
+    summary = analyze(root, PROFILE)
+    assert [_codes(item.issues) for item in summary.files if item.source == target] == [expected]
+
+    out, summary = sanitize(root, PROFILE, output_mode="custom", custom_output_dir=tmp_path / "out")
+    assert {item.source.name for item in summary.files} == {"atto.pdf", "rotto.zip"}
+    assert (out / "atto.pdf").is_file()
+    assert (out / ".gdlex" / "REPORT.json").is_file()
@@ -0,0 +1,72 @@
+import random
+import zipfile
+from pathlib import Path
+
+import pytest
+
+import core.sanitizer as sanitizer
+from core.config import ConfigError, compile_profile
+from core.sanitizer import _sanitize_zip
+
+PROFILE = {"allowed_formats": ["pdf", "txt", "xml", "jpg"], "warning_formats": [], "filename": {"max_length": 80}}
+
+
+def _mixed_zip(path: Path, compression: int) -> dict[str, bytes]:
+    rng = random.Random(7)
+    entries = {}
+    for index in range(24):
+        entries[f"foto {index}.jpg"] = rng.randbytes(rng.randint(1000, 40000))
+        entries[f"atto_{index}.txt"] = b"ricorso per decreto ingiuntivo " * rng.randint(10, 2000)
+        entries[f"cartella/dati_{index}.xml"] = b"<atto><parte>Rossi</parte></atto>" * rng.randint(1, 500)
+    with zipfile.ZipFile(path, "w", compression=compression) as zf:
+        for name, data in entries.items():
+            zf.writestr(name, data)
+    return entries
+
+
+def _read(path: Path) -> list[tuple[str, int, bytes]]:
+    with zipfile.ZipFile(path) as zf:
+        assert zf.testzip() is None
+        return [(info.filename, info.compress_type, zf.read(info)) for info in zf.infolist()]
+
+
+@pytest.mark.parametrize("compression", [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED, zipfile.ZIP_BZIP2])
+def test_parallel_rebuild_matches_sequential(tmp_path: Path, compression: int):
+    src = tmp_path / "misto.zip"
+    entries = _mixed_zip(src, compression)
+
+    _sanitize_zip(src, tmp_path / "seq.zip", PROFILE)
+    _sanitize_zip(src, tmp_path / "par.zip", PROFILE, jobs=4)
+
+    sequential = _read(tmp_path / "seq.zip")
+    assert _read(tmp_path / "par.zip") == sequential
+    assert sorted(data for _, _, data in sequential) == sorted(entries.values())
+    methods = {name.rsplit(".", 1)[1]: method for name, method, _ in sequential}
+    assert methods == {"jpg": zipfile.ZIP_STORED, "txt": zipfile.ZIP_DEFLATED, "xml": zipfile.ZIP_DEFLATED}
+
+
+def test_profile_compression_policy(tmp_path: Path):
+    src = tmp_path / "misto.zip"
+    _mixed_zip(src, zipfile.ZIP_DEFLATED)
+    profile = {**PROFILE, "zip": {"compression": {"default": "store", "jpg": 9}}}
+
+    _sanitize_zip(src, tmp_path / "out.zip", profile, jobs=2)
+
+    methods = {name.rsplit(".", 1)[1]: method for name, method, _ in _read(tmp_path / "out.zip")}
+    assert methods == {"jpg": zipfile.ZIP_DEFLATED, "txt": zipfile.ZIP_STORED, "xml": zipfile.ZIP_STORED}
+    assert compile_profile(profile).zip_compression.policy()["pdf"] == 1
+    with pytest.raises(ConfigError):
+        compile_profile({**PROFILE, "zip": {"compression": {"txt": "veloce"}}})
+
+
+def test_public_api_fallback_without_zipfile_internals(tmp_path: Path, monkeypatch):
+    src = tmp_path / "misto.zip"
+    _mixed_zip(src, zipfile.ZIP_DEFLATED)
+    _sanitize_zip(src, tmp_path / "raw.zip", PROFILE, jobs=2)
+
+    # come se una futura versione di zipfile non avesse più uno degli interni usati dalla copia raw
+    monkeypatch.setattr(sanitizer, "_ZIP_INTERNALS", (*sanitizer._ZIP_INTERNALS, "_interno_rimosso"))
+    monkeypatch.setattr(sanitizer, "_write_zip_entry", lambda *_args: pytest.fail("interni di zipfile usati"))
+    _sanitize_zip(src, tmp_path / "public.zip", PROFILE, jobs=2)
+
+    assert _read(tmp_path / "public.zip") == _read(tmp_path / "raw.zip")
@@ -0,0 +1,93 @@
+import io
+import zipfile
+from pathlib import Path
+
+import pytest
+
+import core.sanitizer as sanitizer
+from core.sanitizer import OUTCOME_ERROR, _sanitize_zip, sanitize
+
+PROFILE = {
+    "allowed_formats": ["pdf", "txt"],
+    "warning_formats": [],
+    "filename": {"max_length": 80},
+}
+
+
+class _NonSeekable(io.RawIOBase):
+    def __init__(self, target):
+        self.target = target
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        return self.target.write(data)
+
+
+def test_deflated_entries_are_copied_raw(tmp_path: Path, monkeypatch):
+    src = tmp_path / "in.zip"
+    dst = tmp_path / "out.zip"
+    payload = b"%PDF-1.4\n" + b"x" * 50_000 + b"\n%%EOF"
+    with zipfile.ZipFile(src, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("a/b/atto uno.pdf", payload)
+        zf.writestr("nota.txt", b"ciao")
+
+    def _fail(*_args, **_kwargs):
+        raise AssertionError("entry ricompressa invece di copia raw")
+
+    monkeypatch.setattr(sanitizer, "_copy_zip_entry_stream", _fail)
+    _, impossible = _sanitize_zip(src, dst, PROFILE)
+
+    with zipfile.ZipFile(src) as zin, zipfile.ZipFile(dst) as zout:
+        assert zout.testzip() is None
+        assert zout.namelist() == ["atto_uno.pdf", "nota.txt"]
+        assert zout.read("atto_uno.pdf") == payload
+        assert zout.getinfo("atto_uno.pdf").compress_size == zin.getinfo("a/b/atto uno.pdf").compress_size
+    assert impossible is False
+
+
+def test_stored_and_data_descriptor_entries(tmp_path: Path):
+    src = tmp_path / "in.zip"
+    dst = tmp_path / "out.zip"
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(_NonSeekable(buffer), "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("streamed.pdf", b"%PDF-1.4\n%%EOF" * 100)
+    src.write_bytes(buffer.getvalue())
+    with zipfile.ZipFile(src, "a", compression=zipfile.ZIP_STORED) as zf:
+        zf.writestr("dir/stored.txt", b"testo " * 1000)
+
+    with zipfile.ZipFile(src) as zin:
+        assert zin.getinfo("streamed.pdf").flag_bits & 0x08
+
+    _sanitize_zip(src, dst, PROFILE)
+
+    with zipfile.ZipFile(dst) as zout:
+        assert zout.testzip() is None
+        assert zout.read("streamed.pdf") == b"%PDF-1.4\n%%EOF" * 100
+        assert zout.read("stored.txt") == b"testo " * 1000
+        assert zout.getinfo("stored.txt").compress_type == zipfile.ZIP_DEFLATED
+
+
+@pytest.mark.parametrize(("name", "compression"), [("foto.jpg", zipfile.ZIP_STORED), ("atto.pdf", zipfile.ZIP_DEFLATED)])
+def test_raw_copy_rejects_corrupt_entries(tmp_path: Path, name: str, compression: int):
+    root = tmp_path / "fascicolo"
+    root.mkdir()
+    src = root / "allegati.zip"
+    with zipfile.ZipFile(src, "w", compression=compression) as zf:
+        zf.writestr(name, b"%PDF-1.4\n" + bytes(range(256)) * 200 + b"\n%%EOF")
+    with zipfile.ZipFile(src) as zf:
+        info = zf.getinfo(name)
+    data = bytearray(src.read_bytes())
+    # un byte a metà dei dati compressi: header locale di 30 byte + nome, nessun extra
+    data[info.header_offset + 30 + len(name) + info.compress_size // 2] ^= 0xFF
+    src.write_bytes(bytes(data))
+    profile = {**PROFILE, "allowed_formats": ["pdf", "jpg", "zip"]}
+
+    with pytest.raises(zipfile.BadZipFile):
+        _sanitize_zip(src, tmp_path / "out.zip", profile)
+    assert not list(tmp_path.glob("*out.zip*"))
+    out, summary = sanitize(root, profile, output_mode="custom", custom_output_dir=tmp_path / "out")
+    assert summary.files[0].correction_outcome == OUTCOME_ERROR
+    assert summary.files[0].output_path is None
+    assert [path.name for path in out.iterdir()] == [".gdlex"]